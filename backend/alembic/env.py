@@ -25,6 +25,9 @@ if config.config_file_name is not None:
 # Import models (IMPORTANT)
 from review_analyzer.models.meta import Base
 from review_analyzer.models.review import Review
+from review_analyzer.models.analysis_cache import AnalysisCache
+from review_analyzer.models.job import AnalysisJob
+from review_analyzer.models.aggregates import ProductStats, ProductDailyVolume, ProductKeyPoint
 
 # This tells Alembic what tables to detect for autogenerate
 target_metadata = Base.metadata
@@ -0,0 +1,35 @@
+"""create analysis cache table
+
+Revision ID: 3c1f5e8a2d47
+Revises: 9b70acf755c3
+Create Date: 2026-10-17 09:12:40.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f5e8a2d47'
+down_revision: Union[str, None] = '9b70acf755c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('analysis_cache',
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('product_name', sa.String(length=200), nullable=False),
+    sa.Column('model_id', sa.String(length=200), nullable=False),
+    sa.Column('sentiment', sa.String(length=20), nullable=False),
+    sa.Column('sentiment_score', sa.Float(), nullable=False),
+    sa.Column('key_points', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('cache_key', name=op.f('pk_analysis_cache'))
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('analysis_cache')
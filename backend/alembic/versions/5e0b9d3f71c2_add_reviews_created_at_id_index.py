@@ -0,0 +1,41 @@
+"""add reviews created_at id index
+
+Revision ID: 5e0b9d3f71c2
+Revises: a7d2c4e9b130
+Create Date: 2026-10-17 11:20:05.731904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b9d3f71c2'
+down_revision: Union[str, None] = 'a7d2c4e9b130'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY: tidak mengunci tabel reviews selama index dibuat
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_reviews_created_at_id',
+            'reviews',
+            [sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_reviews_created_at_id',
+            table_name='reviews',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
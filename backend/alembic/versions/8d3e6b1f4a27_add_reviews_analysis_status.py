@@ -0,0 +1,47 @@
+"""add reviews analysis_status
+
+Revision ID: 8d3e6b1f4a27
+Revises: e2f7a9c05b18
+Create Date: 2026-10-17 15:12:36.904127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3e6b1f4a27'
+down_revision: Union[str, None] = 'e2f7a9c05b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Default konstan: di PostgreSQL 11+ tidak perlu rewrite tabel.
+    # Review lama dianggap complete (dulu tidak tercatat).
+    op.add_column('reviews', sa.Column('analysis_status', sa.String(length=20),
+                                       server_default='complete', nullable=False))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_reviews_degraded',
+            'reviews',
+            ['id'],
+            unique=False,
+            postgresql_where=sa.text("analysis_status = 'degraded'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_reviews_degraded',
+            table_name='reviews',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('reviews', 'analysis_status')
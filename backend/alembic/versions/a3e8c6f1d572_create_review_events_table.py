@@ -0,0 +1,34 @@
+"""create review events table
+
+Revision ID: a3e8c6f1d572
+Revises: d1f4b7a2c9e6
+Create Date: 2026-10-17 16:12:40.517304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e8c6f1d572'
+down_revision: Union[str, None] = 'd1f4b7a2c9e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('review_events',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('type', sa.String(length=20), nullable=False),
+    sa.Column('review_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_review_events'))
+    )
+    op.create_index('ix_review_events_created_at', 'review_events', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_review_events_created_at', table_name='review_events')
+    op.drop_table('review_events')
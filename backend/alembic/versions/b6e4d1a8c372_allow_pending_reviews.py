@@ -0,0 +1,39 @@
+"""allow pending (not yet analyzed) reviews
+
+Revision ID: b6e4d1a8c372
+Revises: f5a1c7d2e934
+Create Date: 2026-10-17 17:20:13.518904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e4d1a8c372'
+down_revision: Union[str, None] = 'f5a1c7d2e934'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # DROP NOT NULL hanya mengubah katalog, tidak rewrite/scan tabel
+    op.alter_column('reviews', 'sentiment', existing_type=sa.String(length=20), nullable=True)
+    op.alter_column('reviews', 'sentiment_score', existing_type=sa.Float(), nullable=True)
+    op.alter_column('reviews', 'key_points', existing_type=postgresql.JSON(), nullable=True)
+    op.alter_column('analysis_jobs', 'product_name', existing_type=sa.String(length=200), nullable=True)
+    op.alter_column('analysis_jobs', 'review_text', existing_type=sa.Text(), nullable=True)
+
+
+def downgrade() -> None:
+    # Review yang belum dianalisis tidak punya hasil; dibuang sebelum NOT NULL dipasang lagi
+    op.execute("DELETE FROM analysis_jobs WHERE review_text IS NULL")
+    op.execute("DELETE FROM reviews WHERE analysis_status = 'pending'")
+    op.alter_column('analysis_jobs', 'review_text', existing_type=sa.Text(), nullable=False)
+    op.alter_column('analysis_jobs', 'product_name', existing_type=sa.String(length=200), nullable=False)
+    op.alter_column('reviews', 'key_points', existing_type=postgresql.JSON(), nullable=False)
+    op.alter_column('reviews', 'sentiment_score', existing_type=sa.Float(), nullable=False)
+    op.alter_column('reviews', 'sentiment', existing_type=sa.String(length=20), nullable=False)
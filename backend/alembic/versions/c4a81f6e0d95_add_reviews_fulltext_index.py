@@ -0,0 +1,43 @@
+"""add reviews fulltext index
+
+Revision ID: c4a81f6e0d95
+Revises: 5e0b9d3f71c2
+Create Date: 2026-10-17 12:02:47.550318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a81f6e0d95'
+down_revision: Union[str, None] = '5e0b9d3f71c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Config 'simple' (tanpa stemming) karena review campur Indonesia & Inggris.
+    # Ekspresi harus sama dengan Review.search_vector() agar index dipakai.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_reviews_review_text_fts',
+            'reviews',
+            [sa.text("to_tsvector('simple', review_text)")],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_reviews_review_text_fts',
+            table_name='reviews',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
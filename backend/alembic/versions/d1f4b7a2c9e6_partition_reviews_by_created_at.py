@@ -0,0 +1,122 @@
+"""partition reviews by created_at (monthly ranges)
+
+Revision ID: d1f4b7a2c9e6
+Revises: b6e4d1a8c372
+Create Date: 2026-10-17 23:05:41.207316
+
+"""
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1f4b7a2c9e6'
+down_revision: Union[str, None] = 'b6e4d1a8c372'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partisi bulan ke depan yang dibuat sekarang; selanjutnya oleh review_analyzer_partitions
+PREMAKE_MONTHS = 3
+
+COLUMNS = ('id, product_name, review_text, sentiment, sentiment_score, key_points, '
+           'created_at, analysis_status, model_version')
+
+CREATE_TABLE_SQL = """
+CREATE TABLE reviews (
+    id integer NOT NULL DEFAULT nextval('reviews_id_seq'),
+    product_name varchar(200) NOT NULL,
+    review_text text NOT NULL,
+    sentiment varchar(20),
+    sentiment_score double precision,
+    key_points json,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    analysis_status varchar(20) NOT NULL DEFAULT 'complete',
+    model_version varchar(200),
+    CONSTRAINT pk_reviews PRIMARY KEY (id, created_at)
+) {partition}
+"""
+
+INDEXES_SQL = [
+    "CREATE INDEX ix_reviews_id ON reviews (id)",
+    "CREATE INDEX ix_reviews_product_name ON reviews (product_name)",
+    "CREATE INDEX ix_reviews_created_at_id ON reviews (created_at DESC, id DESC)",
+    "CREATE INDEX ix_reviews_review_text_fts ON reviews USING gin (to_tsvector('simple', review_text))",
+    "CREATE INDEX ix_reviews_degraded ON reviews (id) WHERE analysis_status = 'degraded'",
+]
+
+
+def _month(value: datetime.datetime) -> datetime.date:
+    return datetime.date(value.year, value.month, 1)
+
+
+def _next_month(month: datetime.date) -> datetime.date:
+    return datetime.date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _swap_out_old_table(new_name):
+    # Nama constraint/index harus bebas untuk tabel baru; sequence tetap dipakai
+    op.execute(f"ALTER TABLE reviews RENAME TO {new_name}")
+    op.execute(f"ALTER TABLE {new_name} RENAME CONSTRAINT pk_reviews TO pk_{new_name}")
+    for statement in INDEXES_SQL:
+        op.execute(f"DROP INDEX IF EXISTS {statement.split()[2]}")
+
+
+def upgrade() -> None:
+    # Partisi bulanan (UTC) pada created_at: query dengan rentang waktu hanya membaca
+    # partisi yang relevan, dan data lama bisa diarsip per partisi (detach + drop).
+    # Primary key harus memuat kolom partisi: (id, created_at); id tetap unik lewat sequence.
+    # Tabel ditulis ulang: jalankan saat maintenance window.
+    bind = op.get_bind()
+    op.execute("LOCK TABLE reviews IN ACCESS EXCLUSIVE MODE")
+    op.execute("UPDATE reviews SET created_at = now() WHERE created_at IS NULL")
+    oldest = bind.execute(sa.text(
+        "SELECT min(created_at AT TIME ZONE 'UTC') FROM reviews")).scalar()
+
+    _swap_out_old_table('reviews_unpartitioned')
+    op.execute(CREATE_TABLE_SQL.format(partition='PARTITION BY RANGE (created_at)'))
+    op.execute("ALTER SEQUENCE reviews_id_seq OWNED BY reviews.id")
+
+    today = datetime.datetime.now(datetime.timezone.utc)
+    month = _month(oldest or today)
+    last = _month(today)
+    for _ in range(PREMAKE_MONTHS):
+        last = _next_month(last)
+    while month <= last:
+        upper = _next_month(month)
+        op.execute(
+            f"CREATE TABLE reviews_p{month:%Y_%m} PARTITION OF reviews "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+        )
+        month = upper
+    # Baris di luar semua partisi (mis. import data lama) masuk ke sini;
+    # review_analyzer_partitions memindahkannya ke partisi bulannya sendiri
+    op.execute("CREATE TABLE reviews_default PARTITION OF reviews DEFAULT")
+
+    op.execute(f"INSERT INTO reviews ({COLUMNS}) SELECT {COLUMNS} FROM reviews_unpartitioned")
+    op.execute("DROP TABLE reviews_unpartitioned")
+
+    # Index di tabel induk otomatis dibuat di setiap partisi (dan partisi baru)
+    for statement in INDEXES_SQL:
+        op.execute(statement)
+    op.execute("ANALYZE reviews")
+
+
+def downgrade() -> None:
+    # Semua partisi yang masih ter-attach digabung lagi ke satu tabel biasa;
+    # partisi yang sudah diarsip tidak ikut kembali.
+    op.execute("LOCK TABLE reviews IN ACCESS EXCLUSIVE MODE")
+    _swap_out_old_table('reviews_partitioned')
+    op.execute(CREATE_TABLE_SQL.format(partition='').replace(
+        'PRIMARY KEY (id, created_at)', 'PRIMARY KEY (id)'))
+    op.execute("ALTER SEQUENCE reviews_id_seq OWNED BY reviews.id")
+    op.execute("ALTER TABLE reviews ALTER COLUMN created_at DROP NOT NULL")
+
+    op.execute(f"INSERT INTO reviews ({COLUMNS}) SELECT {COLUMNS} FROM reviews_partitioned")
+    op.execute("DROP TABLE reviews_partitioned CASCADE")
+
+    for statement in INDEXES_SQL:
+        op.execute(statement)
+    op.execute("ANALYZE reviews")
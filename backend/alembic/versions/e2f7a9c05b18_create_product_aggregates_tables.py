@@ -0,0 +1,92 @@
+"""create product aggregates tables
+
+Revision ID: e2f7a9c05b18
+Revises: c4a81f6e0d95
+Create Date: 2026-10-17 13:41:09.218405
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2f7a9c05b18'
+down_revision: Union[str, None] = 'c4a81f6e0d95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('product_stats',
+    sa.Column('product_name', sa.String(length=200), nullable=False),
+    sa.Column('review_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('positive_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('negative_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('neutral_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('score_sum', sa.Float(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('product_name', name=op.f('pk_product_stats'))
+    )
+    op.create_index('ix_product_stats_review_count', 'product_stats',
+                    [sa.text('review_count DESC'), 'product_name'], unique=False)
+
+    op.create_table('product_daily_volume',
+    sa.Column('product_name', sa.String(length=200), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('review_count', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('product_name', 'day', name=op.f('pk_product_daily_volume'))
+    )
+
+    op.create_table('product_key_points',
+    sa.Column('product_name', sa.String(length=200), nullable=False),
+    sa.Column('key_point', sa.String(length=500), nullable=False),
+    sa.Column('occurrences', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('product_name', 'key_point', name=op.f('pk_product_key_points'))
+    )
+    op.create_index('ix_product_key_points_top', 'product_key_points',
+                    ['product_name', sa.text('occurrences DESC')], unique=False)
+
+    # Isi rollup dari data yang sudah ada (sama dengan services.aggregates.rebuild)
+    op.execute("""
+        INSERT INTO product_stats
+            (product_name, review_count, positive_count, negative_count, neutral_count, score_sum, updated_at)
+        SELECT product_name,
+               count(*),
+               count(*) FILTER (WHERE sentiment = 'positive'),
+               count(*) FILTER (WHERE sentiment = 'negative'),
+               count(*) FILTER (WHERE sentiment = 'neutral'),
+               coalesce(sum(sentiment_score), 0),
+               now()
+        FROM reviews
+        GROUP BY product_name
+    """)
+    op.execute("""
+        INSERT INTO product_daily_volume (product_name, day, review_count)
+        SELECT product_name, (coalesce(created_at, now()) AT TIME ZONE 'UTC')::date, count(*)
+        FROM reviews
+        GROUP BY 1, 2
+    """)
+    op.execute("""
+        INSERT INTO product_key_points (product_name, key_point, occurrences)
+        SELECT product_name, key_point, count(*)
+        FROM (
+            SELECT DISTINCT r.id, r.product_name,
+                   left(lower(regexp_replace(btrim(kp.value), '\\s+', ' ', 'g')), 500) AS key_point
+            FROM reviews r
+            CROSS JOIN LATERAL json_array_elements_text(
+                CASE WHEN json_typeof(r.key_points) = 'array' THEN r.key_points ELSE '[]'::json END
+            ) AS kp(value)
+        ) points
+        WHERE key_point <> ''
+        GROUP BY product_name, key_point
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_product_key_points_top', table_name='product_key_points')
+    op.drop_table('product_key_points')
+    op.drop_table('product_daily_volume')
+    op.drop_index('ix_product_stats_review_count', table_name='product_stats')
+    op.drop_table('product_stats')
@@ -0,0 +1,27 @@
+"""add reviews model_version
+
+Revision ID: f5a1c7d2e934
+Revises: 8d3e6b1f4a27
+Create Date: 2026-10-17 16:05:51.377218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a1c7d2e934'
+down_revision: Union[str, None] = '8d3e6b1f4a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable tanpa default: tidak perlu rewrite tabel; review lama = NULL (tidak diketahui)
+    op.add_column('reviews', sa.Column('model_version', sa.String(length=200), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('reviews', 'model_version')
@@ -0,0 +1,42 @@
+"""Helpers shared by the benchmark scripts."""
+import json
+import math
+from typing import Dict, List, Sequence
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list (q in 0..100)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """count, mean, p50/p90/p95/p99, max; latencies in milliseconds."""
+    values = sorted(samples)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean_ms': round(sum(values) / len(values) * 1000, 3),
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p90_ms': round(percentile(values, 90) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3),
+    }
+
+
+def print_table(rows: List[Dict], columns: Sequence[str]):
+    widths = {c: max(len(c), *(len(str(row.get(c, ''))) for row in rows)) for c in columns}
+    print('  '.join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print('  '.join(str(row.get(c, '')).ljust(widths[c]) for c in columns))
+
+
+def write_json(path: str, data):
+    """Write results so two runs can be diffed (e.g. before/after a change)."""
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+    print(f"Results written to {path}")
@@ -0,0 +1,224 @@
+"""
+Load test of the real app over HTTP: analyze, list, get and delete at a
+fixed concurrency, reporting throughput and latency percentiles per route.
+
+Against a running app (providers should point at the mock server)::
+
+    python -m benchmarks.mock_providers --mock-port 8765 &
+    python -m benchmarks.load --url http://127.0.0.1:6544 --concurrency 32 --requests 5000
+
+Or let it start the mock providers and the app (pserve) itself::
+
+    DATABASE_URL=postgresql://.../review_analyzer_bench \\
+        python -m benchmarks.load --serve benchmarks/benchmark.ini --concurrency 32 --requests 5000
+
+Only reviews created by the run are fetched and deleted, but use a scratch
+database all the same.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import aiohttp
+
+from . import mock_providers
+from .common import print_table, summarize, write_json
+
+OPERATIONS = ('analyze', 'list', 'get', 'delete')
+WORDS = ('bagus', 'jelek', 'baterai', 'awet', 'layar', 'retak', 'cepat', 'lambat', 'murah', 'mahal',
+         'kamera', 'jernih', 'pengiriman', 'lama', 'kemasan', 'rapi', 'suara', 'keras', 'panas', 'dingin')
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Load test analyze / list / get / delete.')
+    parser.add_argument('--url', default='http://127.0.0.1:6544', help='Base URL of the app')
+    parser.add_argument('--serve', metavar='INI', default=None,
+                        help='Start the mock providers and "pserve INI" for the run')
+    parser.add_argument('--no-mocks', action='store_true', help='With --serve: do not start the mock providers')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=2000, help='Measured requests (after warm-up)')
+    parser.add_argument('--warmup', type=int, default=100, help='Unmeasured requests first')
+    parser.add_argument('--mix', default='analyze=2,list=5,get=2,delete=1',
+                        help='Operation weights (default: analyze=2,list=5,get=2,delete=1)')
+    parser.add_argument('--repeat-ratio', type=float, default=0.0,
+                        help='Fraction of analyze requests that repeat an earlier text (cache hits)')
+    parser.add_argument('--list-query', default='limit=20', help='Query string for list requests')
+    parser.add_argument('--json', default=None, help='Also write the results to this JSON file')
+    parser.add_argument('--seed', type=int, default=1)
+    mock_providers.add_arguments(parser)
+    return parser.parse_args(argv[1:])
+
+
+def parse_mix(value):
+    weights = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise SystemExit(f'Unknown operation in --mix: {name}')
+        weights[name] = float(weight or 1)
+    return weights
+
+
+class LoadTest:
+    def __init__(self, args):
+        self.args = args
+        self.random = random.Random(args.seed)
+        weights = parse_mix(args.mix)
+        self.operations = list(weights)
+        self.weights = [weights[name] for name in self.operations]
+        self.ids = []
+        self.texts = []
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.counter = 0
+
+    def review_text(self):
+        if self.texts and self.random.random() < self.args.repeat_ratio:
+            return self.random.choice(self.texts)
+        text = ' '.join(self.random.choice(WORDS) for _ in range(12)) + f' #{self.random.getrandbits(48)}'
+        self.texts.append(text)
+        return text
+
+    async def request(self, session, operation, measured):
+        base = self.args.url
+        if operation in ('get', 'delete') and not self.ids:
+            operation = 'analyze'
+
+        if operation == 'analyze':
+            method, url = 'POST', f'{base}/api/analyze-review'
+            body = {'product_name': f'Bench Product {self.random.randrange(20)}', 'review_text': self.review_text()}
+        elif operation == 'list':
+            method, url, body = 'GET', f'{base}/api/reviews?{self.args.list_query}', None
+        elif operation == 'get':
+            method, url, body = 'GET', f'{base}/api/reviews/{self.random.choice(self.ids)}', None
+        else:
+            review_id = self.ids.pop(self.random.randrange(len(self.ids)))
+            method, url, body = 'DELETE', f'{base}/api/reviews/{review_id}', None
+
+        started = time.perf_counter()
+        try:
+            async with session.request(method, url, json=body) as response:
+                data = await response.read()
+                status = response.status
+        except aiohttp.ClientError:
+            status, data = 0, b''
+        elapsed = time.perf_counter() - started
+
+        if operation == 'analyze' and status == 201:
+            self.ids.append(json.loads(data)['id'])
+        if measured:
+            self.latencies[operation].append(elapsed)
+            self.statuses[operation][status] += 1
+            if not 200 <= status < 300:
+                self.errors[operation] += 1
+
+    async def worker(self, session, total, measured):
+        while self.counter < total:
+            self.counter += 1
+            operation = self.random.choices(self.operations, self.weights)[0]
+            await self.request(session, operation, measured)
+
+    async def phase(self, session, total, measured):
+        self.counter = 0
+        started = time.perf_counter()
+        await asyncio.gather(*[self.worker(session, total, measured) for _ in range(self.args.concurrency)])
+        return time.perf_counter() - started
+
+    async def run(self):
+        connector = aiohttp.TCPConnector(limit=self.args.concurrency)
+        timeout = aiohttp.ClientTimeout(total=120)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            if self.args.warmup:
+                await self.phase(session, self.args.warmup, measured=False)
+            return await self.phase(session, self.args.requests, measured=True)
+
+    def report(self, elapsed):
+        rows = []
+        for operation in OPERATIONS:
+            samples = self.latencies.get(operation)
+            if not samples:
+                continue
+            row = {'operation': operation, 'errors': self.errors[operation],
+                   'rps': round(len(samples) / elapsed, 1)}
+            row.update(summarize(samples))
+            row['statuses'] = dict(self.statuses[operation])
+            rows.append(row)
+        total = sum(len(samples) for samples in self.latencies.values())
+        all_samples = [s for samples in self.latencies.values() for s in samples]
+        overall = {'operation': 'all', 'errors': sum(self.errors.values()), 'rps': round(total / elapsed, 1)}
+        overall.update(summarize(all_samples))
+        rows.append(overall)
+
+        print(f"\n{total} requests in {elapsed:.2f}s at concurrency {self.args.concurrency}")
+        print_table(rows, ('operation', 'count', 'errors', 'rps', 'mean_ms', 'p50_ms', 'p90_ms',
+                           'p95_ms', 'p99_ms', 'max_ms'))
+        return rows
+
+
+def wait_until_up(url, process, timeout=60.0):
+    async def _poll():
+        deadline = time.monotonic() + timeout
+        async with aiohttp.ClientSession() as session:
+            while time.monotonic() < deadline:
+                if process.poll() is not None:
+                    raise SystemExit(f'App exited with code {process.returncode}')
+                try:
+                    async with session.get(f'{url}/api/health') as response:
+                        if response.status == 200:
+                            return
+                except aiohttp.ClientError:
+                    pass
+                await asyncio.sleep(0.5)
+        raise SystemExit(f'App not up at {url} after {timeout:.0f}s')
+    return _poll()
+
+
+async def main_async(args):
+    test = LoadTest(args)
+    mocks = runner = None
+    process = None
+    try:
+        if args.serve:
+            if not args.no_mocks:
+                mocks = mock_providers.from_args(args)
+                runner = await mocks.start(args.mock_host, args.mock_port)
+            env = dict(os.environ)
+            # Tanpa key, ai_services tidak memanggil provider sama sekali
+            env.setdefault('GEMINI_API_KEY', 'benchmark')
+            env.setdefault('HUGGINGFACE_TOKEN', 'benchmark')
+            process = subprocess.Popen([sys.executable, '-m', 'pyramid.scripts.pserve', args.serve], env=env)
+            await wait_until_up(args.url, process)
+
+        elapsed = await test.run()
+        rows = test.report(elapsed)
+        if mocks is not None:
+            print(f"Mock providers: {dict(mocks.counts)}")
+        if args.json:
+            write_json(args.json, {
+                'config': vars(args),
+                'elapsed_s': round(elapsed, 3),
+                'results': rows,
+                'mock_providers': dict(mocks.counts) if mocks is not None else None,
+            })
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        if runner is not None:
+            await runner.cleanup()
+
+
+def main(argv=sys.argv):
+    asyncio.run(main_async(parse_args(argv)))
+
+
+if __name__ == '__main__':
+    main()
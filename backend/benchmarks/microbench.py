@@ -0,0 +1,320 @@
+"""
+Microbenchmarks:
+
+- ``to_dict``: Review.to_dict() (and json.dumps of the result) per row, the
+  same work the list/get views do for every review they return.
+- ``listing``: listing.fetch_page for the listing scenarios at growing table
+  sizes (default 10k, 1M and 10M rows).
+- ``read_path``: one page read + serialized, the old way (ORM Review objects,
+  to_dict(), stdlib json) against the column-tuple path with the stdlib and
+  the orjson serializer.
+- ``startup``: worker start-up cost, each run in a fresh interpreter:
+  importing review_analyzer.services.ai_services, then (with --config)
+  building the app including the provider warm-up; plus the slowest
+  imports reported by ``python -X importtime``.
+
+The listing benchmark seeds the ``reviews`` table of a *scratch* database
+(already migrated with ``alembic upgrade head``) with generated rows, growing
+it to each size in turn. It refuses to touch a table that holds rows it did
+not generate. Seeding 10M rows (with the full-text index) takes a while;
+later runs reuse the rows.
+
+    python -m benchmarks.microbench to_dict --rows 10000
+    DATABASE_URL=postgresql://.../review_analyzer_bench \\
+        python -m benchmarks.microbench listing --sizes 10000,1000000,10000000 --json listing.json
+    DATABASE_URL=... python -m benchmarks.microbench read_path --limits 50,200
+    python -m benchmarks.microbench startup --config benchmarks/benchmark.ini --runs 10
+"""
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import sys
+import time
+
+from .common import print_table, summarize, write_json
+
+BENCH_MODEL_VERSION = 'benchmark'
+SEED_BATCH = 500000
+
+SEED_SQL = """
+INSERT INTO reviews (product_name, review_text, sentiment, sentiment_score, key_points,
+                     analysis_status, model_version, created_at)
+SELECT 'Bench Product ' || (g % 500),
+       w[1 + g % 20] || ' ' || w[1 + (g / 20) % 20] || ' ' || w[1 + (g / 400) % 20] || ' '
+           || w[1 + (g / 8000) % 20] || ' review #' || g,
+       (ARRAY['positive', 'negative', 'neutral'])[1 + g % 3],
+       (g % 1000) / 1000.0,
+       json_build_array(w[1 + g % 20], w[1 + (g / 20) % 20]),
+       'complete',
+       :model_version,
+       timestamptz '2024-01-01 00:00:00+00' + g * interval '1 second'
+FROM generate_series(:start, :stop) AS g,
+     (SELECT ARRAY['bagus', 'jelek', 'baterai', 'awet', 'layar', 'retak', 'cepat', 'lambat', 'murah',
+                   'mahal', 'kamera', 'jernih', 'pengiriman', 'lama', 'kemasan', 'rapi', 'suara',
+                   'keras', 'panas', 'dingin'] AS w) words
+"""
+
+# Dijalankan di interpreter baru per run; mencetak durasi tiap fase (detik) sebagai JSON
+STARTUP_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from review_analyzer.services import ai_services
+result = {'import': time.perf_counter() - started}
+if sys.argv[1:]:
+    from pyramid.paster import get_app, setup_logging
+    setup_logging(sys.argv[1])
+    started = time.perf_counter()
+    get_app(sys.argv[1])
+    result['app'] = time.perf_counter() - started
+    result['warmup'] = ai_services.WARMUP_STATE['seconds']
+print(json.dumps(result))
+"""
+
+# (nama, parameter query GET /api/reviews); '{cursor}' diisi cursor di tengah tabel
+SCENARIOS = (
+    ('first_page', {'limit': '50', 'total': 'none'}),
+    ('first_page_total_exact', {'limit': '50', 'total': 'exact'}),
+    ('first_page_total_estimate', {'limit': '50', 'total': 'estimate'}),
+    ('fields_projection', {'limit': '50', 'total': 'none', 'fields': 'id,product_name,sentiment,sentiment_score'}),
+    ('deep_offset', {'limit': '50', 'total': 'none', 'offset': '{middle}'}),
+    ('deep_cursor', {'limit': '50', 'total': 'none', 'cursor': '{cursor}'}),
+    ('filter_product', {'limit': '50', 'total': 'none', 'product_name': 'Bench Product 7'}),
+    ('filter_sentiment_score', {'limit': '50', 'total': 'none', 'sentiment': 'negative', 'min_score': '0.9'}),
+    ('search', {'limit': '50', 'total': 'none', 'q': 'baterai retak'}),
+    ('search_total_exact', {'limit': '50', 'total': 'exact', 'q': 'baterai retak'}),
+)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Serialization and listing-query microbenchmarks.')
+    sub = parser.add_subparsers(dest='benchmark', required=True)
+
+    to_dict = sub.add_parser('to_dict', help='Review.to_dict() + json.dumps per row')
+    to_dict.add_argument('--rows', type=int, default=10000)
+    to_dict.add_argument('--repeat', type=int, default=20)
+    to_dict.add_argument('--json', default=None)
+
+    listing = sub.add_parser('listing', help='listing.fetch_page at several table sizes')
+    listing.add_argument('--database-url', default=os.getenv('DATABASE_URL'),
+                         help='Scratch database (default: DATABASE_URL)')
+    listing.add_argument('--sizes', default='10000,1000000,10000000')
+    listing.add_argument('--repeat', type=int, default=20)
+    listing.add_argument('--json', default=None)
+
+    read_path = sub.add_parser('read_path', help='ORM + to_dict + json vs column rows + fast JSON')
+    read_path.add_argument('--database-url', default=os.getenv('DATABASE_URL'),
+                           help='Scratch database (default: DATABASE_URL)')
+    read_path.add_argument('--rows', type=int, default=10000, help='Seed the table up to this many rows')
+    read_path.add_argument('--limits', default='50,200', help='Page sizes')
+    read_path.add_argument('--repeat', type=int, default=200)
+    read_path.add_argument('--json', default=None)
+
+    startup = sub.add_parser('startup', help='Import and app start-up time, fresh interpreter per run')
+    startup.add_argument('--config', default=None,
+                         help='Also build the app (with warm-up) from this ini file, e.g. benchmarks/benchmark.ini')
+    startup.add_argument('--runs', type=int, default=10)
+    startup.add_argument('--top', type=int, default=10, help='Slowest imports to list (python -X importtime)')
+    startup.add_argument('--json', default=None)
+    return parser.parse_args(argv[1:])
+
+
+def bench_to_dict(args):
+    from review_analyzer.models import Review
+
+    created_at = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    reviews = [
+        Review(id=i, product_name=f'Bench Product {i % 500}', review_text='baterai awet layar jernih ' * 4,
+               sentiment='positive', sentiment_score=0.91, key_points=['Baterai awet', 'Layar jernih'],
+               analysis_status='complete', model_version=BENCH_MODEL_VERSION,
+               created_at=created_at + datetime.timedelta(seconds=i))
+        for i in range(args.rows)
+    ]
+
+    timings = {'to_dict': [], 'to_dict+json': []}
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        dicts = [review.to_dict() for review in reviews]
+        middle = time.perf_counter()
+        json.dumps(dicts)
+        finished = time.perf_counter()
+        timings['to_dict'].append((middle - started) / args.rows)
+        timings['to_dict+json'].append((finished - started) / args.rows)
+
+    rows = []
+    for name, samples in timings.items():
+        # summarize() menghitung dalam ms; sampel per baris dikali 1000 -> hasil dalam us
+        stats = summarize([sample * 1000 for sample in samples])
+        rows.append({
+            'benchmark': name,
+            'rows': args.rows,
+            'us_per_row_p50': stats['p50_ms'],
+            'us_per_row_p95': stats['p95_ms'],
+            'rows_per_s': round(1e6 / stats['p50_ms']) if stats['p50_ms'] else None,
+        })
+    print_table(rows, ('benchmark', 'rows', 'us_per_row_p50', 'us_per_row_p95', 'rows_per_s'))
+    return rows
+
+
+def seed(engine, size):
+    """Grow the generated rows to ``size`` (never shrinks); returns the row count."""
+    from sqlalchemy import text
+
+    with engine.begin() as conn:
+        foreign = conn.execute(text(
+            "SELECT count(*) FROM reviews WHERE model_version IS DISTINCT FROM :v"), {'v': BENCH_MODEL_VERSION}
+        ).scalar()
+        if foreign:
+            raise SystemExit(f'reviews holds {foreign} row(s) not generated by this benchmark; '
+                             f'use a scratch database')
+        current = conn.execute(text("SELECT count(*) FROM reviews")).scalar()
+
+    if current >= size:
+        return current
+
+    print(f"Seeding reviews {current} -> {size} rows ...")
+    started = time.monotonic()
+    for start in range(current + 1, size + 1, SEED_BATCH):
+        stop = min(size, start + SEED_BATCH - 1)
+        with engine.begin() as conn:
+            conn.execute(text(SEED_SQL), {'start': start, 'stop': stop, 'model_version': BENCH_MODEL_VERSION})
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        conn.execute(text("VACUUM ANALYZE reviews"))
+    print(f"Seeded in {time.monotonic() - started:.1f}s")
+    return size
+
+
+def bench_listing(args):
+    from review_analyzer.models import Review, get_engine, get_session_factory
+    from review_analyzer.services import listing
+
+    if not args.database_url:
+        raise SystemExit('Set --database-url or DATABASE_URL to a scratch database')
+    engine = get_engine({'sqlalchemy.url': args.database_url})
+    session_factory = get_session_factory(engine)
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    rows = []
+    for size in sizes:
+        seed(engine, size)
+        dbsession = session_factory()
+        try:
+            # Cursor di tengah tabel: baris ke-middle dalam urutan listing (tidak diukur)
+            middle = size // 2
+            row = dbsession.query(Review.created_at, Review.id)\
+                .order_by(Review.created_at.desc(), Review.id.desc())\
+                .offset(middle).limit(1).one()
+            cursor = listing.encode_cursor(row.created_at, row.id)
+            dbsession.rollback()
+
+            for name, template in SCENARIOS:
+                params = {k: v.format(middle=middle, cursor=cursor) for k, v in template.items()}
+                limit, offset, page_cursor, total_mode = listing.page_params(params)
+                samples = []
+                for _ in range(args.repeat + 1):
+                    started = time.perf_counter()
+                    listing.fetch_page(dbsession, params, limit, offset, page_cursor, total_mode)
+                    samples.append(time.perf_counter() - started)
+                    dbsession.rollback()
+                stats = summarize(samples[1:])  # run pertama = warm-up
+                rows.append(dict({'rows': size, 'scenario': name}, **stats))
+        finally:
+            dbsession.close()
+
+    print_table(rows, ('rows', 'scenario', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'))
+    return rows
+
+
+def bench_read_path(args):
+    from review_analyzer.models import Review, get_engine, get_session_factory
+    from review_analyzer.services import listing, serialization
+
+    if not args.database_url:
+        raise SystemExit('Set --database-url or DATABASE_URL to a scratch database')
+    engine = get_engine({'sqlalchemy.url': args.database_url})
+    session_factory = get_session_factory(engine)
+    seed(engine, args.rows)
+    order = (Review.created_at.desc(), Review.id.desc())
+
+    def orm_path(dbsession, limit):
+        # Jalur lama: ORM object + to_dict() + json stdlib
+        reviews = dbsession.query(Review).order_by(*order).limit(limit).all()
+        return json.dumps([review.to_dict() for review in reviews]).encode('utf-8')
+
+    def lean_path(dbsession, limit):
+        rows = listing.projected_query(dbsession, Review.FIELDS).order_by(*order).limit(limit).all()
+        return serialization.dumps(listing.rows_to_dicts(rows, Review.FIELDS))
+
+    paths = [('orm+to_dict+json', orm_path, 'stdlib'), ('columns+json', lean_path, 'stdlib')]
+    if serialization.orjson is not None:
+        paths.append(('columns+orjson', lean_path, 'orjson'))
+    else:
+        print('orjson not installed: skipping columns+orjson (pip install -e ".[json]")')
+
+    rows = []
+    for limit in [int(limit) for limit in args.limits.split(',')]:
+        for name, path, json_backend in paths:
+            serialization.configure({'json.backend': json_backend})
+            samples = []
+            for _ in range(args.repeat + 1):
+                # Session baru tiap kali: ORM object tidak bisa dipakai ulang dari identity map
+                dbsession = session_factory()
+                try:
+                    started = time.perf_counter()
+                    path(dbsession, limit)
+                    samples.append(time.perf_counter() - started)
+                finally:
+                    dbsession.close()
+            rows.append(dict({'limit': limit, 'path': name}, **summarize(samples[1:])))
+
+    print_table(rows, ('limit', 'path', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'))
+    return rows
+
+
+def bench_startup(args):
+    command = [sys.executable, '-c', STARTUP_SCRIPT]
+    if args.config:
+        command.append(os.path.abspath(args.config))
+
+    samples = {}
+    for _ in range(args.runs):
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        for phase, seconds in json.loads(output.splitlines()[-1]).items():
+            if seconds is not None:
+                samples.setdefault(phase, []).append(seconds)
+
+    rows = [dict({'phase': phase}, **summarize(values)) for phase, values in samples.items()]
+    print_table(rows, ('phase', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms'))
+
+    # Import paling lambat (kumulatif, termasuk sub-import), dari satu run -X importtime
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import review_analyzer.services.ai_services'],
+                            check=True, capture_output=True, text=True).stderr
+    imports = []
+    for line in stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            imports.append({'module': fields[2].strip(), 'self_ms': round(int(fields[0].split(':')[1]) / 1000, 1),
+                            'cumulative_ms': round(int(fields[1]) / 1000, 1)})
+    imports.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+    print()
+    print_table(imports[:args.top], ('module', 'cumulative_ms', 'self_ms'))
+    return rows + imports[:args.top]
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    if args.benchmark == 'to_dict':
+        rows = bench_to_dict(args)
+    elif args.benchmark == 'listing':
+        rows = bench_listing(args)
+    elif args.benchmark == 'startup':
+        rows = bench_startup(args)
+    else:
+        rows = bench_read_path(args)
+    if args.json:
+        write_json(args.json, {'benchmark': args.benchmark, 'config': vars(args), 'results': rows})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Local stand-ins for the HuggingFace router and the Gemini REST API.
+
+Both are served from one aiohttp server:
+
+- POST /hf-inference/models/{model}        HF text classification
+- POST /v1beta/models/{model}:generateContent   Gemini (REST transport)
+- GET  /_stats                             request / error counters
+
+Point the app at it with (see benchmarks/benchmark.ini)::
+
+    sentiment.hf_api_url = http://127.0.0.1:8765/hf-inference/models/cardiffnlp/twitter-xlm-roberta-base-sentiment
+    gemini.mode = thread
+    gemini.transport = rest
+    gemini.api_endpoint = http://127.0.0.1:8765
+
+Run standalone::
+
+    python -m benchmarks.mock_providers --mock-port 8765 --hf-latency-ms 80 --gemini-latency-ms 600 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import random
+from collections import Counter
+
+from aiohttp import web
+
+LABELS = ('positive', 'negative', 'neutral')
+
+
+class MockProviders:
+    """Latency is ``latency_ms`` +/- ``jitter`` (fraction); a request fails with
+    503 at ``error_rate`` and is throttled with 429 at ``throttle_rate``."""
+
+    def __init__(self, hf_latency_ms=80.0, gemini_latency_ms=600.0, jitter=0.25,
+                 error_rate=0.0, throttle_rate=0.0, seed=None):
+        self.latency = {'huggingface': hf_latency_ms / 1000, 'gemini': gemini_latency_ms / 1000}
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.random = random.Random(seed)
+        self.counts = Counter()
+
+    async def _simulate(self, provider):
+        """Sleep for the provider latency; return an error response or None."""
+        self.counts[f'{provider}.requests'] += 1
+        base = self.latency[provider]
+        await asyncio.sleep(max(0.0, self.random.uniform(base * (1 - self.jitter), base * (1 + self.jitter))))
+
+        roll = self.random.random()
+        if roll < self.error_rate:
+            self.counts[f'{provider}.errors'] += 1
+            return web.json_response({'error': 'mock: service unavailable'}, status=503)
+        if roll < self.error_rate + self.throttle_rate:
+            self.counts[f'{provider}.throttled'] += 1
+            return web.json_response({'error': 'mock: rate limited'}, status=429, headers={'Retry-After': '1'})
+        return None
+
+    def _predictions(self, text):
+        # Deterministik per teks, supaya hasil antar run bisa dibandingkan
+        rng = random.Random(text)
+        scores = [rng.random() for _ in LABELS]
+        total = sum(scores)
+        return [{'label': label, 'score': score / total} for label, score in zip(LABELS, scores)]
+
+    async def huggingface(self, request):
+        error = await self._simulate('huggingface')
+        if error is not None:
+            return error
+        inputs = (await request.json())['inputs']
+        if isinstance(inputs, str):
+            return web.json_response([self._predictions(inputs)])
+        return web.json_response([self._predictions(text) for text in inputs])
+
+    async def gemini(self, request):
+        error = await self._simulate('gemini')
+        if error is not None:
+            return error
+        body = await request.json()
+        # Payload dari ai_services._extract_group: {"product": ..., "reviews": [{"index", "text"}]}
+        payload = json.loads(body['contents'][-1]['parts'][0]['text'])
+        result = [
+            {
+                'index': review['index'],
+                'key_points': [f"{payload['product']}: {word}" for word in review['text'].split()[:3]] or ['ok'],
+            }
+            for review in payload['reviews']
+        ]
+        return web.json_response({
+            'candidates': [{
+                'content': {'role': 'model', 'parts': [{'text': json.dumps(result, ensure_ascii=False)}]},
+                'finishReason': 1,
+                'index': 0,
+            }],
+        })
+
+    async def stats(self, request):
+        return web.json_response(dict(self.counts))
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        app.router.add_post('/hf-inference/models/{model:.+}', self.huggingface)
+        app.router.add_post('/v1beta/models/{model}:generateContent', self.gemini)
+        app.router.add_get('/_stats', self.stats)
+        return app
+
+    async def start(self, host='127.0.0.1', port=8765) -> web.AppRunner:
+        runner = web.AppRunner(self.app(), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        return runner
+
+
+def add_arguments(parser):
+    parser.add_argument('--mock-host', default='127.0.0.1')
+    parser.add_argument('--mock-port', type=int, default=8765)
+    parser.add_argument('--hf-latency-ms', type=float, default=80.0)
+    parser.add_argument('--gemini-latency-ms', type=float, default=600.0)
+    parser.add_argument('--jitter', type=float, default=0.25,
+                        help='Latency spread as a fraction of the mean (default: 0.25)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction answered with 503')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction answered with 429')
+    parser.add_argument('--mock-seed', type=int, default=None)
+
+
+def from_args(args) -> MockProviders:
+    return MockProviders(
+        hf_latency_ms=args.hf_latency_ms,
+        gemini_latency_ms=args.gemini_latency_ms,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        seed=args.mock_seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock HF router + Gemini REST server for benchmarks.')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    async def serve():
+        await from_args(args).start(args.mock_host, args.mock_port)
+        print(f"Mock providers on http://{args.mock_host}:{args.mock_port}")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
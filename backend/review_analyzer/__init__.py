@@ -6,23 +6,27 @@ from dotenv import load_dotenv
 # Load env vars
 load_dotenv()
 
+def cors_headers():
+    """CORS headers added to every response (WSGI and ASGI)."""
+    # Ambil origin dari env, atau default '*' (allow all)
+    origin = os.getenv('CORS_ORIGINS', '*')
+    
+    return {
+        'Access-Control-Allow-Origin': origin,
+        'Access-Control-Allow-Methods': 'POST,GET,DELETE,PUT,OPTIONS,PATCH',
+        'Access-Control-Allow-Headers': 'Origin, Content-Type, Accept, Authorization',
+        'Access-Control-Allow-Credentials': 'true',
+        'Access-Control-Max-Age': '1728000',
+    }
+
 def add_cors_headers_response_callback(event):
     """
     Fungsi ini dipanggil SETIAP kali ada request masuk.
     Dia menempelkan header CORS ke response sebelum dikirim balik.
     """
-    def cors_headers(request, response):
-        # Ambil origin dari env, atau default '*' (allow all)
-        origin = os.getenv('CORS_ORIGINS', '*')
-        
-        response.headers.update({
-            'Access-Control-Allow-Origin': origin,
-            'Access-Control-Allow-Methods': 'POST,GET,DELETE,PUT,OPTIONS,PATCH',
-            'Access-Control-Allow-Headers': 'Origin, Content-Type, Accept, Authorization',
-            'Access-Control-Allow-Credentials': 'true',
-            'Access-Control-Max-Age': '1728000',
-        })
-    event.request.add_response_callback(cors_headers)
+    def add_headers(request, response):
+        response.headers.update(cors_headers())
+    event.request.add_response_callback(add_headers)
 
 def main(global_config, **settings):
     """ This function returns a Pyramid WSGI application. """
@@ -36,8 +40,9 @@ def main(global_config, **settings):
         config.include('pyramid_tm')
         config.include('pyramid_retry')
         
-        # --- MODEL & ROUTE ---
+        # --- MODEL, SERVICES & ROUTE ---
         config.include('.models')
+        config.include('.services')
         config.include('.routes')
 
         # --- MANUAL CORS SETUP (PASTI JALAN) ---
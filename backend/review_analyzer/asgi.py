@@ -0,0 +1,430 @@
+"""
+ASGI entry point.
+
+Analyze, list and get are served by native async handlers: the database is
+reached through SQLAlchemy's asyncio extension (asyncpg) and the AI calls are
+awaited on the shared service loop, so a request waiting on the network does
+not hold a thread. GET /api/reviews/events streams live review events
+(services.events) to any number of idle clients. Every other route falls
+through to the Pyramid WSGI app, run in a bounded thread pool.
+
+Run with e.g.::
+
+    REVIEW_ANALYZER_INI=development.ini \\
+        uvicorn --factory review_analyzer.asgi:create_app --workers 4 --port 6543
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from urllib.parse import parse_qsl
+
+from a2wsgi import WSGIMiddleware
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_engine_from_config, async_sessionmaker
+
+from . import cors_headers, main as wsgi_main
+from .models import replicas
+from .services import events, jobs, listing, metrics, response_cache, serialization
+from .services.pipeline import analyze_async
+from .views.api import save_review, validate_review_payload
+
+log = logging.getLogger(__name__)
+
+# Default ASGI, bisa di-override dari development.ini (prefix "asgi.")
+ASGI_SETTINGS = {
+    'wsgi_threads': 16,    # thread untuk route yang jatuh ke aplikasi WSGI
+    'max_inflight': 500,   # analisis bersamaan per proses; sisanya antri
+}
+
+
+def async_url(url):
+    """``url`` with the asyncpg driver when it points at PostgreSQL."""
+    url = make_url(url)
+    if url.get_backend_name() == 'postgresql':
+        url = url.set(drivername='postgresql+asyncpg')
+    return url
+
+
+def async_database_url(settings):
+    """sqlalchemy.url with the asyncpg driver (or asgi.database_url if set)."""
+    return async_url(settings.get('asgi.database_url') or settings['sqlalchemy.url'])
+
+
+def get_async_engine(settings, url, connect_timeout=None):
+    """
+    Async engine for ``url`` with the pool settings of the WSGI engines
+    (sqlalchemy.pool_*); statement_timeout and the connect timeout go
+    through asyncpg's connect arguments.
+    """
+    engine_settings = dict(settings)
+    engine_settings['sqlalchemy.url'] = url
+    connect_args = {}
+    if url.get_backend_name() == 'postgresql':
+        statement_timeout = int(settings.get('db.statement_timeout', 0))
+        if statement_timeout:
+            connect_args['server_settings'] = {'statement_timeout': str(statement_timeout)}
+        if connect_timeout:
+            connect_args['timeout'] = connect_timeout
+    return async_engine_from_config(engine_settings, prefix='sqlalchemy.', connect_args=connect_args)
+
+
+async def read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+def query_params(scope):
+    """Query string as a dict; like WebOb, the last value of a repeated key wins."""
+    query = scope.get('query_string', b'').decode('latin-1')
+    return dict(parse_qsl(query, keep_blank_values=True))
+
+
+def request_url(scope, path):
+    headers = dict(scope.get('headers') or [])
+    host = headers.get(b'host', b'localhost').decode('latin-1')
+    return f"{scope.get('scheme', 'http')}://{host}{path}"
+
+
+async def send_json(send, data, status=200, headers=None):
+    with metrics.span('json_serialize'):
+        body = serialization.dumps(data)
+    response_headers = {'Content-Type': 'application/json', 'Content-Length': str(len(body))}
+    response_headers.update(cors_headers())
+    response_headers.update(headers or {})
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in response_headers.items()],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def wait_disconnect(receive):
+    """Return once the client has gone away."""
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def send_chunk(send, body: bytes, more_body: bool = True):
+    await send({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+
+
+async def send_cached(send, scope, entry):
+    """Cached JSON body (see services.response_cache), or 304 when the client's copy is current."""
+    headers = dict(scope.get('headers') or [])
+    if_none_match = headers.get(b'if-none-match', b'').decode('latin-1')
+    if_modified_since = headers.get(b'if-modified-since', b'').decode('latin-1')
+    if response_cache.not_modified(entry, if_none_match, if_modified_since):
+        status, body = 304, b''
+    else:
+        status, body = 200, entry.body
+    response_headers = {'Content-Type': 'application/json', 'Content-Length': str(len(body))}
+    response_headers.update(cors_headers())
+    response_headers.update(response_cache.headers(entry))
+    if status == 304:
+        del response_headers['Content-Length'], response_headers['Content-Type']
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in response_headers.items()],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+class AsyncApp:
+    """Async handlers for the hot routes, WSGI fallthrough for the rest."""
+
+    def __init__(self, wsgi_app, settings):
+        for key, default in list(ASGI_SETTINGS.items()):
+            value = settings.get(f'asgi.{key}')
+            if value is not None:
+                ASGI_SETTINGS[key] = type(default)(value)
+
+        # Engine async: koneksi asyncpg dibuat di loop server saat pertama dipakai
+        self.engine = get_async_engine(settings, async_database_url(settings))
+        self.session_factory = async_sessionmaker(self.engine, expire_on_commit=False)
+
+        # Read replica: status sehat/lag diambil dari ReplicaSet milik aplikasi WSGI,
+        # tiap replica dapat engine async sendiri
+        self.replica_set = wsgi_app.registry.get('replica_set')
+        self.replica_factories = {}
+        self.replica_engines = []
+        for replica in (self.replica_set.replicas if self.replica_set is not None else []):
+            engine = get_async_engine(settings, async_url(replica.engine.url),
+                                      connect_timeout=replicas.DB_SETTINGS['replica_connect_timeout'])
+            self.replica_factories[replica] = async_sessionmaker(engine, expire_on_commit=False)
+            self.replica_engines.append(engine)
+
+        self.wsgi = WSGIMiddleware(wsgi_app, workers=ASGI_SETTINGS['wsgi_threads'])
+        self._inflight = None
+
+        # Live review events: satu koneksi LISTEN per proses, fan-out ke semua klien SSE
+        self.broker = None
+        url = self.engine.url
+        if events.EVENTS_SETTINGS['enabled'] and url.get_backend_name() == 'postgresql':
+            dsn = url.set(drivername='postgresql').render_as_string(hide_password=False)
+            self.broker = events.BROKER = events.EventBroker(dsn, self.session_factory)
+
+        self.routes = [
+            ('POST', re.compile(r'^/api/analyze-review$'), self.analyze_review),
+            ('GET', re.compile(r'^/api/reviews$'), self.get_reviews),
+            # Hanya ID angka: /api/reviews/export, /api/reviews/events, dll. diteruskan ke WSGI
+            ('GET', re.compile(r'^/api/reviews/(?P<id>\d+)$'), self.get_review),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+
+        if scope['type'] == 'http':
+            # Stream panjang: tidak diukur sebagai durasi request
+            if scope['path'] == '/api/reviews/events' and scope['method'] == 'GET' and self.broker is not None:
+                return await self.stream_events(scope, receive, send)
+            for method, pattern, handler in self.routes:
+                match = pattern.match(scope['path'])
+                if match and scope['method'] == method:
+                    return await self.timed(handler, scope, receive, send, **match.groupdict())
+
+        return await self.wsgi(scope, receive, send)
+
+    async def timed(self, handler, scope, receive, send, **kwargs):
+        """Run a native handler, recording the request like the Pyramid metrics tween."""
+        started = time.perf_counter()
+        status = [500]
+
+        async def _send(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        try:
+            return await handler(scope, receive, _send, **kwargs)
+        finally:
+            metrics.observe_request(handler.__name__, scope['method'], status[0], time.perf_counter() - started)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                if self.broker is not None:
+                    self.broker.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.broker is not None:
+                    await self.broker.stop()
+                await self.engine.dispose()
+                for engine in self.replica_engines:
+                    await engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read(self, fn, *args):
+        """
+        Async version of models.read_with_fallback: run ``fn(dbsession, *args)``
+        on a healthy read replica, or on the primary when there is none. If
+        the replica fails at the connection level it is taken out of
+        rotation and ``fn`` runs again on the primary.
+        """
+        replica = None
+        if self.replica_set is not None:
+            # choose() sesekali mengecek lag replica secara sinkron: jalankan di thread
+            replica = await asyncio.get_running_loop().run_in_executor(None, self.replica_set.choose)
+        if replica is not None:
+            try:
+                async with self.replica_factories[replica]() as dbsession:
+                    return await dbsession.run_sync(fn, *args)
+            except Exception as e:
+                if not replicas.is_replica_failure(e):
+                    raise
+                self.replica_set.mark_down(replica, e)
+        async with self.session_factory() as dbsession:
+            return await dbsession.run_sync(fn, *args)
+
+    async def analyze_review(self, scope, receive, send):
+        """Async version of views.api.analyze_review (same body and responses)."""
+        try:
+            try:
+                json_data = json.loads(await read_body(receive))
+            except ValueError:
+                return await send_json(send, {'error': 'Invalid JSON body'}, status=400)
+
+            product_name, review_text, error = validate_review_payload(json_data)
+            if error:
+                return await send_json(send, {'error': error}, status=400)
+
+            params = query_params(scope)
+            prefer = dict(scope.get('headers') or []).get(b'prefer', b'').decode('latin-1')
+            if params.get('mode') == 'async' or 'respond-async' in prefer:
+                def _enqueue(dbsession):
+                    job = jobs.enqueue(dbsession, product_name, review_text)
+                    return job.id, job.status or 'queued'
+
+                async with self.session_factory() as dbsession, dbsession.begin():
+                    job_id, status = await dbsession.run_sync(_enqueue)
+                log.info("📥 Review queued as job %s", job_id)
+                status_url = request_url(scope, f'/api/jobs/{job_id}')
+                return await send_json(
+                    send,
+                    {'job_id': job_id, 'status': status, 'status_url': status_url},
+                    status=202,
+                    headers={'Location': status_url}
+                )
+
+            if self._inflight is None:
+                self._inflight = asyncio.Semaphore(ASGI_SETTINGS['max_inflight'])
+
+            # Tidak ada koneksi DB yang dipegang selama menunggu AI
+            log.info("🔍 Analyzing review for: %s", product_name)
+            async with self._inflight:
+                result = await analyze_async(self.session_factory, review_text, product_name)
+            if result['cached']:
+                log.info("⚡ Cache hit (%s)", result['cached'])
+
+            def _save(dbsession):
+                return save_review(dbsession, product_name, review_text, result).to_dict()
+
+            async with self.session_factory() as dbsession, dbsession.begin():
+                review = await dbsession.run_sync(_save)
+
+            log.info("✅ Review saved with ID: %s", review['id'])
+            return await send_json(send, review, status=201)
+
+        except Exception as e:
+            log.error("❌ Error analyzing review: %s", e)
+            return await send_json(send, {'error': f'Failed to analyze review: {str(e)}'}, status=500)
+
+    async def get_reviews(self, scope, receive, send):
+        """Async version of views.api.get_reviews (same parameters)."""
+        params = query_params(scope)
+        try:
+            try:
+                limit, offset, cursor, total_mode = listing.page_params(params)
+            except ValueError as e:
+                return await send_json(send, {'error': str(e)}, status=400)
+
+            key = response_cache.cache_key('reviews', params)
+            entry = response_cache.RESPONSE_CACHE.lookup(key)
+            if entry is None:
+                generation = response_cache.RESPONSE_CACHE.generation
+                response_data = await self.read(listing.fetch_page, params, limit, offset, cursor, total_mode)
+                entry = response_cache.RESPONSE_CACHE.store(key, response_data, generation)
+            return await send_cached(send, scope, entry)
+
+        except ValueError as e:
+            return await send_json(send, {'error': f'Invalid query parameter: {str(e)}'}, status=400)
+        except Exception as e:
+            log.error("❌ Error fetching reviews: %s", e)
+            return await send_json(send, {'error': f'Failed to fetch reviews: {str(e)}'}, status=500)
+
+    async def get_review(self, scope, receive, send, id):
+        """Async version of views.api.get_review."""
+        review_id = int(id)
+        try:
+            key = f'review:{review_id}'
+            entry = response_cache.RESPONSE_CACHE.lookup(key)
+            if entry is None:
+                generation = response_cache.RESPONSE_CACHE.generation
+                response_data = await self.read(listing.fetch_review, review_id)
+                if response_data is None:
+                    return await send_json(send, {'error': 'Review not found'}, status=404)
+                entry = response_cache.RESPONSE_CACHE.store(key, response_data, generation)
+            return await send_cached(send, scope, entry)
+
+        except Exception as e:
+            log.error("❌ Error fetching review: %s", e)
+            return await send_json(send, {'error': f'Failed to fetch review: {str(e)}'}, status=500)
+
+
+    async def stream_events(self, scope, receive, send):
+        """
+        GET /api/reviews/events: new, updated and deleted reviews as
+        Server-Sent Events. With Last-Event-ID (header, or ?last_event_id=
+        on the first connect) the missed events are replayed first.
+        """
+        last_event_id = (dict(scope.get('headers') or []).get(b'last-event-id', b'').decode('latin-1')
+                         or query_params(scope).get('last_event_id', ''))
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            return await send_json(send, {'error': 'Invalid Last-Event-ID'}, status=400)
+
+        # Subscribe sebelum replay: event yang masuk selama replay tetap antri
+        self.broker.start()
+        subscriber = self.broker.subscribe()
+        if subscriber is None:
+            return await send_json(send, {'error': 'Too many live event clients'}, status=503,
+                                   headers={'Retry-After': '30'})
+
+        disconnected = asyncio.ensure_future(wait_disconnect(receive))
+        try:
+            response_headers = {'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache',
+                                'X-Accel-Buffering': 'no'}
+            response_headers.update(cors_headers())
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in response_headers.items()],
+            })
+            await send_chunk(send, events.RETRY)
+
+            if last_event_id is not None:
+                messages = await self.broker.replay(last_event_id)
+                if messages is None:
+                    # Terlalu banyak yang terlewat: klien memuat ulang daftar
+                    await send_chunk(send, events.format_event(None, 'reset', {}))
+                else:
+                    subscriber.sent_id = last_event_id
+                    for event_id, message in messages:
+                        await send_chunk(send, message)
+                        subscriber.sent_id = max(subscriber.sent_id, event_id)
+
+            heartbeat = events.EVENTS_SETTINGS['heartbeat']
+            while True:
+                get = asyncio.ensure_future(subscriber.queue.get())
+                done, _ = await asyncio.wait({get, disconnected}, timeout=heartbeat,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if get not in done:
+                    get.cancel()
+                    if disconnected in done:
+                        return
+                    await send_chunk(send, events.HEARTBEAT)
+                    continue
+
+                item = get.result()
+                if item is None:
+                    # Klien terlalu lambat (atau server berhenti): tutup, EventSource reconnect & resume
+                    return await send_chunk(send, b'', more_body=False)
+                event_id, message = item
+                if event_id is not None and event_id <= subscriber.sent_id:
+                    continue
+                await send_chunk(send, message)
+
+        except Exception as e:
+            log.info("Live event stream closed: %s", e)
+        finally:
+            self.broker.unsubscribe(subscriber)
+            disconnected.cancel()
+
+
+def main(global_config, **settings):
+    """ This function returns the ASGI application (WSGI app included). """
+    if os.getenv('DATABASE_URL'):
+        settings['sqlalchemy.url'] = os.getenv('DATABASE_URL')
+    return AsyncApp(wsgi_main(global_config, **settings), settings)
+
+
+def create_app():
+    """Factory for ``uvicorn --factory``; reads REVIEW_ANALYZER_INI (default development.ini)."""
+    from pyramid.paster import get_appsettings, setup_logging
+
+    config_uri = os.getenv('REVIEW_ANALYZER_INI', 'development.ini')
+    setup_logging(config_uri)
+    settings = dict(get_appsettings(config_uri))
+    return main({'__file__': config_uri}, **settings)
@@ -0,0 +1,82 @@
+"""
+Structured, non-blocking logging.
+
+``JsonFormatter`` writes one JSON object per line (used by the console
+handler in development.ini). ``configure`` moves the root handlers behind a
+``QueueHandler``: request threads and the event loop only put the record on
+a queue, and a ``QueueListener`` thread does the formatting and the write.
+"""
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+
+# Atribut bawaan LogRecord; sisanya (dari extra=...) ikut ditulis sebagai field
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, thread, msg, extra fields."""
+
+    def format(self, record):
+        data = {
+            'ts': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def _as_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def configure(settings):
+    """
+    With ``logging.queue`` (default true), route every root handler through
+    a queue drained by a background thread. Safe to call more than once.
+    """
+    global _listener
+    if not _as_bool(settings.get('logging.queue', True)):
+        return
+
+    with _lock:
+        if _listener is not None:
+            return
+        root = logging.getLogger()
+        handlers = [h for h in root.handlers if not isinstance(h, logging.handlers.QueueHandler)]
+        if not handlers:
+            return
+
+        records = queue.SimpleQueue()
+        for handler in handlers:
+            root.removeHandler(handler)
+        root.addHandler(logging.handlers.QueueHandler(records))
+        # respect_handler_level: level per handler dari ini tetap berlaku
+        _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop)
+
+
+def stop():
+    """Flush the queue and stop the listener thread."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
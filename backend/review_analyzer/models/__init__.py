@@ -1,4 +1,5 @@
 from sqlalchemy import engine_from_config
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import configure_mappers
 import zope.sqlalchemy
@@ -6,15 +7,54 @@ import zope.sqlalchemy
 # Import model agar ter-register di metadata
 from .meta import Base
 from .review import Review  # Penting: import model di sini
+from .analysis_cache import AnalysisCache
+from .job import AnalysisJob
+from .event import ReviewEvent
+from .aggregates import ProductStats, ProductDailyVolume, ProductKeyPoint
+from .changes import on_reviews_changed
+from . import replicas
 
-def get_engine(settings, prefix='sqlalchemy.'):
-    return engine_from_config(settings, prefix)
+def get_engine(settings, prefix='sqlalchemy.', url=None, statement_timeout=0, connect_timeout=None):
+    """
+    Engine from the ``sqlalchemy.*`` settings, including the pool options
+    (pool_size, max_overflow, pool_recycle, pool_pre_ping, pool_timeout).
+    ``url`` overrides sqlalchemy.url (replicas); ``statement_timeout`` (ms)
+    and ``connect_timeout`` (s) apply to PostgreSQL connections only.
+    """
+    if url is not None:
+        settings = dict(settings)
+        settings[prefix + 'url'] = url
+    kwargs = {}
+    if make_url(settings[prefix + 'url']).get_backend_name() == 'postgresql':
+        connect_args = {}
+        if statement_timeout:
+            connect_args['options'] = f'-c statement_timeout={int(statement_timeout)}'
+        if connect_timeout:
+            connect_args['connect_timeout'] = int(connect_timeout)
+        if connect_args:
+            kwargs['connect_args'] = connect_args
+    return engine_from_config(settings, prefix, **kwargs)
 
 def get_session_factory(engine):
     factory = sessionmaker()
     factory.configure(bind=engine)
     return factory
 
+def get_replica_set(settings):
+    """ReplicaSet for ``db.replica_urls`` (same pool settings as the primary), or None."""
+    urls = replicas.replica_urls()
+    if not urls:
+        return None
+    members = []
+    for url in urls:
+        engine = get_engine(
+            settings, url=url,
+            statement_timeout=replicas.DB_SETTINGS['statement_timeout'],
+            connect_timeout=replicas.DB_SETTINGS['replica_connect_timeout'],
+        )
+        members.append(replicas.Replica(engine, get_session_factory(engine)))
+    return replicas.ReplicaSet(members)
+
 def get_tm_session(session_factory, transaction_manager):
     """
     Membuat session SQLA yang terikat dengan Zope Transaction Manager.
@@ -36,11 +76,15 @@ def includeme(config):
     configure_mappers()
 
     # Buat Engine & Session Factory
-    engine = get_engine(settings)
+    replicas.configure(settings)
+    engine = get_engine(settings, statement_timeout=replicas.DB_SETTINGS['statement_timeout'])
     session_factory = get_session_factory(engine)
+    replica_set = get_replica_set(settings)
 
     # Simpan di registry agar bisa diakses global jika perlu
     config.registry['dbsession_factory'] = session_factory
+    config.registry['dbengine'] = engine
+    config.registry['replica_set'] = replica_set
 
     # Buat request method: request.dbsession
     # Setiap kali kamu panggil request.dbsession di view, fungsi ini jalan.
@@ -48,4 +92,54 @@ def includeme(config):
         lambda r: get_tm_session(session_factory, r.tm),
         'dbsession',
         reify=True
-    )
\ No newline at end of file
+    )
+
+    # request.read_dbsession: session ke read replica untuk route read-only
+    # (sama dengan request.dbsession kalau tidak ada replica yang sehat)
+    config.add_request_method(get_read_session, 'read_dbsession', reify=True)
+
+
+def get_read_session(request):
+    """
+    Session on a healthy read replica, closed when the request finishes.
+    Falls back to ``request.dbsession`` (primary) when no replica is
+    configured or every replica is down or lagging.
+    """
+    replica_set = request.registry.get('replica_set')
+    replica = replica_set.choose() if replica_set is not None else None
+    if replica is None:
+        return request.dbsession
+
+    dbsession = replica.session_factory()
+    dbsession.info['replica'] = replica
+    request.add_finished_callback(lambda r: dbsession.close())
+    return dbsession
+
+
+def read_session_factory(request):
+    """Session factory for reads that outlive the request (export streams)."""
+    replica_set = request.registry.get('replica_set')
+    replica = replica_set.choose() if replica_set is not None else None
+    return replica.session_factory if replica is not None else request.registry['dbsession_factory']
+
+
+def read_with_fallback(request, fn, *args, **kwargs):
+    """
+    Run ``fn(dbsession, *args, **kwargs)`` on ``request.read_dbsession``.
+    If the replica fails at the connection level, it is taken out of
+    rotation and ``fn`` runs again on the primary.
+    """
+    dbsession = request.read_dbsession
+    replica = dbsession.info.get('replica')
+    if replica is None:
+        return fn(dbsession, *args, **kwargs)
+    try:
+        return fn(dbsession, *args, **kwargs)
+    except Exception as e:
+        if not replicas.is_replica_failure(e):
+            raise
+        dbsession.close()
+        request.registry['replica_set'].mark_down(replica, e)
+        # Sisa request ini juga membaca dari primary
+        request.read_dbsession = request.dbsession
+        return fn(request.dbsession, *args, **kwargs)
@@ -0,0 +1,57 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Index
+from sqlalchemy.sql import func
+from .meta import Base
+
+# Tabel rollup per produk. Di-update incremental saat review ditambah/dihapus
+# (lihat services/aggregates.py), jadi endpoint statistik tidak perlu scan reviews.
+
+class ProductStats(Base):
+    __tablename__ = 'product_stats'
+
+    product_name = Column(String(200), primary_key=True)
+    review_count = Column(Integer, nullable=False, server_default='0')
+    positive_count = Column(Integer, nullable=False, server_default='0')
+    negative_count = Column(Integer, nullable=False, server_default='0')
+    neutral_count = Column(Integer, nullable=False, server_default='0')
+    score_sum = Column(Float, nullable=False, server_default='0')
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Listing produk: ORDER BY review_count DESC
+        Index('ix_product_stats_review_count', review_count.desc(), product_name),
+    )
+
+    def to_dict(self):
+        """Helper untuk convert object ke dictionary (untuk JSON response)"""
+        return {
+            'product_name': self.product_name,
+            'total': self.review_count,
+            'distribution': {
+                'positive': self.positive_count,
+                'negative': self.negative_count,
+                'neutral': self.neutral_count,
+            },
+            'mean_score': round(self.score_sum / self.review_count, 4) if self.review_count else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
+class ProductDailyVolume(Base):
+    __tablename__ = 'product_daily_volume'
+
+    product_name = Column(String(200), primary_key=True)
+    day = Column(Date, primary_key=True)
+    review_count = Column(Integer, nullable=False, server_default='0')
+
+
+class ProductKeyPoint(Base):
+    __tablename__ = 'product_key_points'
+
+    product_name = Column(String(200), primary_key=True)
+    key_point = Column(String(500), primary_key=True)  # lowercase, trimmed
+    occurrences = Column(Integer, nullable=False, server_default='0')
+
+    __table_args__ = (
+        # Top key points per produk: WHERE product_name = ? ORDER BY occurrences DESC
+        Index('ix_product_key_points_top', product_name, occurrences.desc()),
+    )
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, Float, DateTime
+from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy.sql import func
+from .meta import Base
+
+class AnalysisCache(Base):
+    """Hasil analisis yang di-cache, key = hash(model, produk, teks ternormalisasi)"""
+    __tablename__ = 'analysis_cache'
+
+    cache_key = Column(String(64), primary_key=True)  # sha256 hex
+    product_name = Column(String(200), nullable=False)
+    model_id = Column(String(200), nullable=False)
+    sentiment = Column(String(20), nullable=False)
+    sentiment_score = Column(Float, nullable=False)
+    key_points = Column(JSON, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def to_result(self):
+        """Convert ke format hasil pipeline analisis"""
+        return {
+            'sentiment': self.sentiment,
+            'score': self.sentiment_score,
+            'key_points': self.key_points,
+        }
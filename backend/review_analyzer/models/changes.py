@@ -0,0 +1,47 @@
+from typing import Callable, List
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .review import Review
+
+# Callback yang dipanggil setelah transaksi yang mengubah tabel reviews di-commit
+_listeners: List[Callable[[], None]] = []
+
+_FLAG = 'reviews_changed'
+
+
+def on_reviews_changed(callback: Callable[[], None]):
+    """Register a callback to run after any commit that inserted, updated or
+    deleted reviews (ORM objects or ORM-enabled bulk statements)."""
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_flush(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Review):
+            session.info[_FLAG] = True
+            return
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_statement(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is Review:
+        orm_execute_state.session.info[_FLAG] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _notify(session):
+    if session.info.pop(_FLAG, False):
+        for callback in _listeners:
+            callback()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _reset(session):
+    session.info.pop(_FLAG, None)
@@ -0,0 +1,22 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String
+from sqlalchemy.sql import func
+from .meta import Base
+
+class ReviewEvent(Base):
+    """
+    Perubahan reviews untuk GET /api/reviews/events (SSE). Ditulis bersama
+    NOTIFY di transaksi yang sama; dibaca ulang saat klien resume dengan
+    Last-Event-ID. Baris lama dihapus setelah events.retention detik.
+    """
+    __tablename__ = 'review_events'
+
+    id = Column(BigInteger, primary_key=True)
+    type = Column(String(20), nullable=False)  # created, updated, deleted
+    # Tanpa FK: event 'deleted' menunjuk review yang sudah tidak ada
+    review_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        # Dipakai penghapusan event lama: WHERE created_at < now() - retention
+        Index('ix_review_events_created_at', 'created_at'),
+    )
@@ -0,0 +1,48 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from sqlalchemy.sql import func
+from .meta import Base
+
+class AnalysisJob(Base):
+    """Antrian analisis: diisi oleh POST async, dikerjakan oleh worker process"""
+    __tablename__ = 'analysis_jobs'
+
+    id = Column(Integer, primary_key=True)
+    status = Column(String(20), nullable=False, server_default='queued')  # queued, running, done, failed
+
+    # Input analisis (NULL untuk job analisis review 'pending' yang sudah ada: teks dibaca dari reviews)
+    product_name = Column(String(200), nullable=True)
+    review_text = Column(Text, nullable=True)
+
+    # Review yang dibuat worker, atau review 'pending' yang dianalisis
+    # (tanpa FK agar tabel reviews bebas diubah)
+    review_id = Column(Integer, nullable=True)
+
+    attempts = Column(Integer, nullable=False, server_default='0')
+    max_attempts = Column(Integer, nullable=False, server_default='5')
+    last_error = Column(Text, nullable=True)
+
+    run_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Dipakai query claim: WHERE status = 'queued' AND run_after <= now()
+        Index('ix_analysis_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+    def to_dict(self):
+        """Helper untuk convert object ke dictionary (untuk JSON response)"""
+        return {
+            'id': self.id,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'last_error': self.last_error,
+            'review_id': self.review_id,
+            'run_after': self.run_after.isoformat() if self.run_after else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,158 @@
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import InterfaceError, OperationalError
+
+log = logging.getLogger(__name__)
+
+# Default koneksi database, bisa di-override dari development.ini (prefix "db.").
+# Ukuran pool dsb. memakai key bawaan SQLAlchemy (sqlalchemy.pool_size, ...).
+DB_SETTINGS = {
+    'statement_timeout': 0,          # ms per statement untuk request web (PostgreSQL); 0 = tanpa batas
+    'replica_urls': '',              # read replica, dipisah spasi / baris baru
+    'replica_max_lag': 5.0,          # detik; replica yang tertinggal lebih dari ini tidak dipakai
+    'replica_check_interval': 5.0,   # detik antar pengecekan lag / koneksi per replica
+    'replica_connect_timeout': 2,    # detik; replica yang mati cepat ketahuan
+}
+
+# Lag replica PostgreSQL dalam detik. Kalau semua WAL yang diterima sudah di-replay,
+# lag 0 (primary yang sepi tidak membuat replica terlihat tertinggal).
+LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+# SQLSTATE query_canceled (statement_timeout): bukan kesalahan replica
+QUERY_CANCELED = '57014'
+
+
+def configure(settings):
+    """Read database settings (``db.*``) from the app settings."""
+    for key, default in list(DB_SETTINGS.items()):
+        value = settings.get(f'db.{key}')
+        if value is not None:
+            DB_SETTINGS[key] = type(default)(value)
+
+
+def replica_urls() -> List[str]:
+    return DB_SETTINGS['replica_urls'].split()
+
+
+def _describe(error: Exception) -> str:
+    # Mis. asyncio.TimeoutError tidak punya pesan
+    return (str(error).splitlines() or [type(error).__name__])[0][:200]
+
+
+class Replica:
+    """One read replica: its engine and session factory plus the last health check."""
+
+    def __init__(self, engine, session_factory):
+        self.engine = engine
+        self.session_factory = session_factory
+        self.healthy = True
+        self.lag: Optional[float] = None
+        self.error: Optional[str] = None
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+    def check(self, max_lag: float):
+        """Measure the replication lag; unreachable or lagging replicas are unhealthy."""
+        try:
+            with self.engine.connect() as conn:
+                if self.engine.dialect.name == 'postgresql':
+                    lag = float(conn.execute(text(LAG_SQL)).scalar() or 0)
+                else:
+                    # Pengganti replica untuk test lokal (mis. SQLite): cukup cek koneksi
+                    conn.execute(text('SELECT 1'))
+                    lag = 0.0
+            self.set_state(lag <= max_lag, lag=lag,
+                           error=None if lag <= max_lag else f'lag {lag:.1f}s > {max_lag:.1f}s')
+        except Exception as e:
+            self.set_state(False, error=_describe(e))
+        self.checked_at = time.monotonic()
+
+    def set_state(self, healthy: bool, lag: Optional[float] = None, error: Optional[str] = None):
+        if healthy != self.healthy:
+            if healthy:
+                log.info("Replica %s back in rotation (lag %.1fs)", self.name, lag or 0.0)
+            else:
+                log.warning("Replica %s out of rotation: %s", self.name, error)
+        self.healthy = healthy
+        self.lag = lag
+        self.error = error
+
+    def refresh(self, max_lag: float, interval: float):
+        """Re-check when the last check is older than ``interval``; one thread checks,
+        the others keep using the previous state."""
+        if time.monotonic() - self.checked_at < interval:
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() - self.checked_at >= interval:
+                self.check(max_lag)
+        finally:
+            self._lock.release()
+
+
+class ReplicaSet:
+    """
+    Read replicas used round-robin. A replica is skipped while its last
+    check found it down or lagging more than ``replica_max_lag``; with no
+    healthy replica, reads go to the primary.
+    """
+
+    def __init__(self, replicas: List[Replica]):
+        self.replicas = replicas
+        self._next = itertools.count()
+        self.fallbacks = 0
+
+    def choose(self) -> Optional[Replica]:
+        max_lag = DB_SETTINGS['replica_max_lag']
+        interval = DB_SETTINGS['replica_check_interval']
+        for replica in self.replicas:
+            replica.refresh(max_lag, interval)
+
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            self.fallbacks += 1
+            return None
+        return healthy[next(self._next) % len(healthy)]
+
+    def mark_down(self, replica: Replica, error: Exception):
+        """Take a replica out of rotation until its next check succeeds."""
+        replica.set_state(False, error=_describe(error))
+        replica.checked_at = time.monotonic()
+        self.fallbacks += 1
+
+    def stats(self):
+        return {
+            'replicas': [
+                {'url': replica.name, 'healthy': replica.healthy, 'lag': replica.lag, 'error': replica.error}
+                for replica in self.replicas
+            ],
+            'primary_fallbacks': self.fallbacks,
+        }
+
+
+def is_replica_failure(error: Exception) -> bool:
+    """Connection-level errors (replica down, restarted, unreachable); a
+    statement timeout is the query's fault, not the replica's."""
+    # asyncpg (ASGI) melempar error koneksi apa adanya, tidak dibungkus SQLAlchemy
+    if isinstance(error, (OSError, asyncio.TimeoutError)):
+        return True
+    if not isinstance(error, (OperationalError, InterfaceError)):
+        return False
+    return getattr(error.orig, 'pgcode', None) != QUERY_CANCELED
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Index
 from sqlalchemy.dialects.postgresql import JSON  # Gunakan dialect PG jika pakai Postgres
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, literal_column
 from .meta import Base
 
 class Review(Base):
@@ -9,12 +9,44 @@ class Review(Base):
     id = Column(Integer, primary_key=True, index=True)
     product_name = Column(String(200), nullable=False, index=True)
     review_text = Column(Text, nullable=False)
-    sentiment = Column(String(20), nullable=False)  # positive, negative, neutral
-    sentiment_score = Column(Float, nullable=False)  # 0.0 to 1.0
+    # NULL hanya untuk review 'pending' (hasil import yang belum dianalisis)
+    sentiment = Column(String(20), nullable=True)  # positive, negative, neutral
+    sentiment_score = Column(Float, nullable=True)  # 0.0 to 1.0
     
-    key_points = Column(JSON, nullable=False) 
+    key_points = Column(JSON, nullable=True) 
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # complete | degraded (provider gagal/timeout, hasil fallback; perlu dianalisis ulang)
+    # | pending (di-import tanpa analisis; menunggu job di analysis_jobs)
+    analysis_status = Column(String(20), nullable=False, server_default='complete')
+    # pipeline.model_id() yang menghasilkan analisis ini (NULL: sebelum dicatat)
+    model_version = Column(String(200), nullable=True)
+    
+    # Kolom partisi (RANGE per bulan, lihat services/partitions.py). Primary key di
+    # database adalah (id, created_at); di ORM cukup id (unik lewat sequence).
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        # Keyset pagination: ORDER BY created_at DESC, id DESC
+        Index('ix_reviews_created_at_id', created_at.desc(), id.desc()),
+        # Full-text search: harus sama persis dengan ekspresi di search_vector()
+        Index(
+            'ix_reviews_review_text_fts',
+            func.to_tsvector(literal_column("'simple'"), review_text),
+            postgresql_using='gin',
+        ),
+        # Partial index: mencari review degraded untuk dianalisis ulang
+        Index('ix_reviews_degraded', id, postgresql_where=analysis_status == 'degraded'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
+
+    # Kolom yang boleh dipilih lewat ?fields= di listing
+    FIELDS = ('id', 'product_name', 'review_text', 'sentiment',
+              'sentiment_score', 'key_points', 'analysis_status', 'model_version', 'created_at')
+
+    @classmethod
+    def search_vector(cls):
+        """tsvector expression used for full-text search over review_text"""
+        return func.to_tsvector(literal_column("'simple'"), cls.review_text)
 
     def to_dict(self):
         """Helper untuk convert object ke dictionary (untuk JSON response)"""
@@ -25,5 +57,7 @@ class Review(Base):
             'sentiment': self.sentiment,
             'sentiment_score': self.sentiment_score,
             'key_points': self.key_points,
+            'analysis_status': self.analysis_status,
+            'model_version': self.model_version,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
\ No newline at end of file
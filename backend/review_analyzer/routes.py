@@ -7,8 +7,25 @@ def includeme(config):
     # Health check endpoint
     config.add_route('health', '/api/health')
     
+    # Runtime statistics (HTTP client timings, etc.)
+    config.add_route('stats', '/api/stats', request_method='GET')
+    
+    # Prometheus metrics (services.metrics)
+    config.add_route('metrics', '/metrics', request_method='GET')
+    
     # Review API endpoints
     config.add_route('analyze_review', '/api/analyze-review', request_method='POST')
+    config.add_route('analyze_reviews_bulk', '/api/analyze-reviews/bulk', request_method='POST')
     config.add_route('get_reviews', '/api/reviews', request_method='GET')
+    # Harus sebelum /api/reviews/{id}
+    config.add_route('export_reviews', '/api/reviews/export', request_method='GET')
+    config.add_route('review_events', '/api/reviews/events', request_method='GET')
     config.add_route('get_review', '/api/reviews/{id}', request_method='GET')
     config.add_route('delete_review', '/api/reviews/{id}', request_method='DELETE')
+    
+    # Per-product aggregates (rollup tables)
+    config.add_route('product_stats', '/api/products/stats', request_method='GET')
+    config.add_route('product_detail_stats', '/api/products/stats/{product_name:.+}', request_method='GET')
+    
+    # Analysis job status (async mode)
+    config.add_route('get_job', '/api/jobs/{id}', request_method='GET')
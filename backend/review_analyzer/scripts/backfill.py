@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+from .worker import load_settings
+
+SCOPES = ('outdated', 'degraded', 'all')
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Re-analyze stored reviews (new model/prompt, or degraded fallback results).'
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    parser.add_argument(
+        '--scope', choices=SCOPES, default='outdated',
+        help='outdated: model_version differs from the current one, or degraded (default); '
+             'degraded: only degraded rows; all: every row',
+    )
+    parser.add_argument(
+        '--batch-size', type=int, default=200,
+        help='Rows per fetch, analysis round and UPDATE transaction (default: 200)',
+    )
+    parser.add_argument(
+        '--concurrency', type=int, default=16,
+        help='Concurrent AI calls per batch (default: 16)',
+    )
+    parser.add_argument(
+        '--checkpoint', default='backfill.checkpoint.json',
+        help='Progress file; an interrupted run resumes from it (default: backfill.checkpoint.json)',
+    )
+    parser.add_argument(
+        '--restart', action='store_true',
+        help='Ignore an existing checkpoint and start from the first row',
+    )
+    parser.add_argument(
+        '--limit', type=int, default=None,
+        help='Stop after this many rows (default: no limit)',
+    )
+    args = parser.parse_args(argv[1:])
+    if args.limit is not None and args.limit < 0:
+        parser.error('--limit must be 0 or more')
+    return args
+
+
+def load_checkpoint(path, scope, restart):
+    if restart or not os.path.exists(path):
+        return {'scope': scope, 'last_id': 0, 'processed': 0, 'updated': 0, 'failed': 0}
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get('scope') != scope:
+        raise SystemExit(
+            f"Checkpoint {path} is for scope '{checkpoint.get('scope')}'; use --restart or another --checkpoint")
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    # Tulis ke file sementara lalu rename, supaya checkpoint tidak pernah setengah jadi
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def select_rows(scope, model_version, after_id):
+    from sqlalchemy import or_, select
+
+    from ..models import Review
+
+    # Nilai rollup tidak diambil di sini: dibaca ulang (dan dikunci) saat batch ditulis
+    query = select(Review.id, Review.review_text, Review.product_name)\
+        .where(Review.id > after_id)\
+        .order_by(Review.id)
+    if scope == 'degraded':
+        query = query.where(Review.analysis_status == 'degraded')
+    elif scope == 'outdated':
+        query = query.where(or_(
+            Review.model_version.is_distinct_from(model_version),
+            Review.analysis_status == 'degraded',
+        ))
+    return query
+
+
+def reanalyze_batch(session_factory, rows, concurrency):
+    """
+    Analyze one batch and write it back in one transaction: one
+    executemany UPDATE for the reviews plus the rollup corrections.
+    Rows whose new result is still degraded are left untouched, and so
+    are rows deleted since they were read. Returns (updated, failed).
+    """
+    from sqlalchemy import select, update
+
+    from ..models import Review
+    from ..services import aggregates
+    from ..services.pipeline import analysis_status, analyze_many, model_id
+
+    dbsession = session_factory()
+    try:
+        results = analyze_many(
+            dbsession,
+            [(row.review_text, row.product_name) for row in rows],
+            concurrency=concurrency
+        )
+        fresh = {row.id: result for row, result in zip(rows, results) if not result['degraded']}
+
+        # Baris dari cursor bisa sudah basi (diselesaikan job worker, atau dihapus):
+        # rollup dikoreksi dari nilai terkini yang dikunci sampai commit
+        current = {}
+        if fresh:
+            current = {row.id: row for row in dbsession.execute(
+                select(Review.id, *aggregates.ROLLUP_COLUMNS)
+                .where(Review.id.in_(list(fresh)))
+                .with_for_update()
+            )}
+
+        old_rows, new_rows, params = [], [], []
+        for review_id, result in fresh.items():
+            row = current.get(review_id)
+            if row is None:
+                continue
+            values = {
+                'sentiment': result['sentiment'],
+                'sentiment_score': result['score'],
+                'key_points': result['key_points'],
+                'analysis_status': analysis_status(result),
+                'model_version': model_id(),
+            }
+            params.append(dict(values, id=review_id))
+            old_rows.append(row)
+            new_rows.append(SimpleNamespace(product_name=row.product_name, created_at=row.created_at, **values))
+
+        if params:
+            dbsession.execute(update(Review), params)
+            aggregates.record_removed(dbsession, old_rows)
+            aggregates.record_added(dbsession, new_rows)
+        dbsession.commit()
+        return len(params), len(rows) - len(fresh)
+    except Exception:
+        dbsession.rollback()
+        raise
+    finally:
+        dbsession.close()
+
+
+def main(argv=sys.argv):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from .. import services
+    from ..models import get_engine, get_session_factory
+    from ..services.pipeline import model_id
+
+    args = parse_args(argv)
+    settings = load_settings(args.config_uri)
+    services.setup(settings)
+    engine = get_engine(settings)
+    session_factory = get_session_factory(engine)
+
+    checkpoint = load_checkpoint(args.checkpoint, args.scope, args.restart)
+    checkpoint['model_version'] = model_id()
+    print(f"Backfill scope={args.scope} model_version={checkpoint['model_version']} "
+          f"starting after id {checkpoint['last_id']}")
+
+    started = time.monotonic()
+    processed_this_run = 0
+    # Server-side cursor: baris dibaca bertahap sesuai urutan ID, tidak dimuat semua ke memori.
+    # Koneksi baca terpisah dari transaksi UPDATE, yang di-commit per batch.
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=args.batch_size).execute(
+            select_rows(args.scope, checkpoint['model_version'], checkpoint['last_id'])
+        )
+        for rows in result.partitions():
+            if args.limit is not None:
+                rows = rows[:args.limit - processed_this_run]
+            # --limit 0, atau limit habis tepat di batas batch
+            if not rows:
+                break
+            batch_started = time.monotonic()
+            updated, failed = reanalyze_batch(session_factory, rows, args.concurrency)
+
+            processed_this_run += len(rows)
+            checkpoint['last_id'] = rows[-1].id
+            checkpoint['processed'] += len(rows)
+            checkpoint['updated'] += updated
+            checkpoint['failed'] += failed
+            save_checkpoint(args.checkpoint, checkpoint)
+
+            elapsed = time.monotonic() - started
+            print(f"id<={checkpoint['last_id']} processed={checkpoint['processed']} "
+                  f"updated={checkpoint['updated']} still_degraded={checkpoint['failed']} | "
+                  f"batch {len(rows) / max(time.monotonic() - batch_started, 1e-6):.1f} rows/s, "
+                  f"run {processed_this_run / max(elapsed, 1e-6):.1f} rows/s")
+
+            if args.limit is not None and processed_this_run >= args.limit:
+                break
+
+    print(f"Done: {processed_this_run} row(s) in {time.monotonic() - started:.1f}s "
+          f"(checkpoint: {args.checkpoint})")
+
+
+if __name__ == '__main__':
+    main()
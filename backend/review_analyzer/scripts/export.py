@@ -0,0 +1,85 @@
+import argparse
+import contextlib
+import sys
+import time
+
+from .worker import load_settings
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Export reviews as CSV, NDJSON or Parquet (streamed, constant memory).'
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    parser.add_argument(
+        '--format', default='csv',
+        help='csv | ndjson | parquet (default: csv)',
+    )
+    parser.add_argument(
+        '-o', '--output', default='-',
+        help='Output file (default: stdout)',
+    )
+    parser.add_argument(
+        '--fields', default=None,
+        help='Comma separated columns (default: all)',
+    )
+    parser.add_argument(
+        '--filter', action='append', default=[], metavar='NAME=VALUE',
+        help='Listing filter, e.g. --filter sentiment=negative --filter q=baterai '
+             '(product_name, sentiment, min_score, max_score, created_from, created_to, q, analysis_status)',
+    )
+    parser.add_argument(
+        '--chunk-size', type=int, default=None,
+        help='Rows per fetch from the server-side cursor (default: export.chunk_size setting)',
+    )
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    # Import services mencetak log ke stdout; jangan sampai tercampur dengan data export
+    with contextlib.redirect_stdout(sys.stderr):
+        from ..models import get_engine, get_session_factory
+        from ..services import export
+
+    args = parse_args(argv)
+    params = {}
+    for item in args.filter:
+        name, sep, value = item.partition('=')
+        if not sep:
+            raise SystemExit(f'Invalid --filter {item!r}, expected NAME=VALUE')
+        params[name.strip()] = value
+    if args.fields:
+        params['fields'] = args.fields
+
+    try:
+        fmt = export.check_format(args.format)
+        query, fields = export.export_query(params)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    settings = load_settings(args.config_uri)
+    session_factory = get_session_factory(get_engine(settings))
+    chunk_size = args.chunk_size or int(settings.get('export.chunk_size', export.CHUNK_SIZE))
+
+    started = time.monotonic()
+    written = 0
+    output = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+    try:
+        for data in export.stream(session_factory, query, fields, fmt, chunk_size):
+            output.write(data)
+            written += len(data)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+    print(f"Exported {written} bytes as {fmt} in {time.monotonic() - started:.1f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+import argparse
+import csv
+import datetime
+import io
+import json
+import sys
+import time
+from collections import Counter
+
+from .worker import load_settings
+
+FORMATS = ('csv', 'ndjson')
+PRODUCT_NAME_MAX_LENGTH = 200  # reviews.product_name VARCHAR(200)
+
+# Baris valid di-COPY ke tabel sementara dulu, lalu dipindah ke reviews dengan satu
+# INSERT ... SELECT; RETURNING id dari situ dipakai untuk membuat job-nya.
+STAGING_SQL = """
+CREATE TEMP TABLE import_staging (
+    product_name varchar(200) NOT NULL,
+    review_text text NOT NULL,
+    created_at timestamptz
+) ON COMMIT DELETE ROWS
+"""
+COPY_SQL = "COPY import_staging (product_name, review_text, created_at) FROM STDIN WITH (FORMAT csv)"
+INSERT_SQL = """
+INSERT INTO reviews (product_name, review_text, analysis_status, created_at)
+SELECT product_name, review_text, 'pending', coalesce(created_at, now())
+FROM import_staging
+"""
+INSERT_AND_ENQUEUE_SQL = f"""
+WITH inserted AS (
+    {INSERT_SQL}
+    RETURNING id
+)
+INSERT INTO analysis_jobs (review_id, max_attempts)
+SELECT id, %(max_attempts)s FROM inserted
+"""
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Bulk-load raw reviews (CSV or NDJSON) with COPY; they are stored as '
+                    'pending and analyzed later by the job workers.'
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    parser.add_argument(
+        'input',
+        help='CSV (header with product_name, review_text and optional created_at) '
+             'or NDJSON file; "-" reads stdin',
+    )
+    parser.add_argument(
+        '--format', choices=FORMATS, default=None,
+        help='Input format (default: from the file extension)',
+    )
+    parser.add_argument(
+        '--rejects', default=None,
+        help='Report of rejected rows, one JSON object per line (default: <input>.rejected.ndjson)',
+    )
+    parser.add_argument(
+        '--chunk-size', type=int, default=50000,
+        help='Rows per COPY and commit (default: 50000)',
+    )
+    parser.add_argument(
+        '--skip', type=int, default=0,
+        help='Skip the first N records, e.g. to resume after the last committed chunk',
+    )
+    parser.add_argument(
+        '--no-enqueue', action='store_true',
+        help='Only store the reviews as pending; analyze them later with review_analyzer_backfill',
+    )
+    return parser.parse_args(argv[1:])
+
+
+def detect_format(path, fmt):
+    if fmt:
+        return fmt
+    if path.endswith('.csv'):
+        return 'csv'
+    if path.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    raise SystemExit(f'Cannot tell the format of {path!r}; use --format')
+
+
+def iter_records(lines, fmt):
+    """Yield (line number, record, error) for each input record."""
+    if fmt == 'csv':
+        csv.field_size_limit(16 * 1024 * 1024)
+        reader = csv.DictReader(lines)
+        if not {'product_name', 'review_text'} <= set(reader.fieldnames or ()):
+            raise SystemExit('CSV header must contain product_name and review_text')
+        for record in reader:
+            yield reader.line_num, record, None
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except ValueError:
+            yield line_number, line.rstrip('\n'), 'Invalid JSON'
+
+
+def validate_record(record):
+    """
+    Same rules as POST /api/analyze-review (validate_review_payload), plus
+    the limits the table enforces, so one bad row cannot fail a whole COPY.
+    Returns ((product_name, review_text, created_at), error).
+    """
+    from ..views.api import validate_review_payload
+
+    product_name, review_text, error = validate_review_payload(record)
+    if error:
+        return None, error
+    if len(product_name) > PRODUCT_NAME_MAX_LENGTH:
+        return None, f'product_name must be at most {PRODUCT_NAME_MAX_LENGTH} characters'
+    if '\x00' in product_name or '\x00' in review_text:
+        return None, 'product_name and review_text cannot contain NUL characters'
+
+    created_at = record.get('created_at') or None
+    if created_at is not None:
+        try:
+            parsed = datetime.datetime.fromisoformat(str(created_at).strip())
+        except ValueError:
+            return None, 'created_at must be an ISO date or datetime'
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+        created_at = parsed.isoformat()
+    return (product_name, review_text, created_at), None
+
+
+def copy_chunk(conn, rows, enqueue, max_attempts):
+    """COPY one chunk into staging, move it to reviews (+ jobs) and commit."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+
+    cursor = conn.cursor()
+    try:
+        cursor.copy_expert(COPY_SQL, buffer)
+        if enqueue:
+            cursor.execute(INSERT_AND_ENQUEUE_SQL, {'max_attempts': max_attempts})
+        else:
+            cursor.execute(INSERT_SQL)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def main(argv=sys.argv):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from ..models import get_engine
+    from ..services import jobs
+
+    args = parse_args(argv)
+    fmt = detect_format(args.input, args.format)
+    settings = load_settings(args.config_uri)
+    jobs.configure(settings)
+    engine = get_engine(settings)
+
+    rejects_path = args.rejects or (
+        'import.rejected.ndjson' if args.input == '-' else f'{args.input}.rejected.ndjson')
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8', newline='')
+    rejects = open(rejects_path, 'w', encoding='utf-8')
+
+    # Koneksi DBAPI (psycopg2) langsung: COPY tidak lewat ORM
+    conn = engine.raw_connection()
+    cursor = conn.cursor()
+    cursor.execute(STAGING_SQL)
+    cursor.close()
+    conn.commit()
+
+    started = time.monotonic()
+    counts = Counter()
+    reasons = Counter()
+    rows = []
+    last_line = 0
+    try:
+        for line_number, record, error in iter_records(source, fmt):
+            counts['read'] += 1
+            if counts['read'] <= args.skip:
+                continue
+            if error is None:
+                row, error = validate_record(record)
+            if error:
+                counts['rejected'] += 1
+                reasons[error] += 1
+                rejects.write(json.dumps(
+                    {'line': line_number, 'error': error, 'record': record}, ensure_ascii=False) + '\n')
+                continue
+
+            rows.append(row)
+            last_line = line_number
+            if len(rows) >= args.chunk_size:
+                copy_chunk(conn, rows, not args.no_enqueue, jobs.JOB_SETTINGS['max_attempts'])
+                counts['imported'] += len(rows)
+                rows = []
+                elapsed = time.monotonic() - started
+                print(f"records<={counts['read']} (line {last_line}) imported={counts['imported']} "
+                      f"rejected={counts['rejected']} | {counts['imported'] / max(elapsed, 1e-6):.0f} rows/s")
+
+        if rows:
+            copy_chunk(conn, rows, not args.no_enqueue, jobs.JOB_SETTINGS['max_attempts'])
+            counts['imported'] += len(rows)
+    finally:
+        conn.close()
+        rejects.close()
+        if source is not sys.stdin:
+            source.close()
+
+    print(f"Done: {counts['imported']} imported as pending, {counts['rejected']} rejected "
+          f"in {time.monotonic() - started:.1f}s")
+    if args.no_enqueue:
+        print("No jobs enqueued; run review_analyzer_backfill to analyze the pending reviews")
+    for reason, count in reasons.most_common():
+        print(f"  {count:>8}  {reason}")
+    if counts['rejected']:
+        print(f"Rejected rows: {rejects_path}")
+
+
+if __name__ == '__main__':
+    main()
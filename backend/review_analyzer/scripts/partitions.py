@@ -0,0 +1,126 @@
+import argparse
+import sys
+import time
+
+from .worker import load_settings
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Maintain the monthly partitions of the reviews table: create upcoming '
+                    'partitions and archive (gzip CSV) then drop those past the retention period. '
+                    'Run it daily, e.g. from cron.'
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    parser.add_argument(
+        '--premake', type=int, default=None,
+        help='Months ahead to create partitions for (default: partitions.premake setting)',
+    )
+    parser.add_argument(
+        '--retention-months', type=int, default=None,
+        help='Archive and drop partitions older than this many months; 0 keeps everything '
+             '(default: partitions.retention_months setting)',
+    )
+    parser.add_argument(
+        '--archive-dir', default=None,
+        help='Directory for the <partition>.csv.gz archives (default: partitions.archive_dir setting)',
+    )
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='Only print what would be created and archived',
+    )
+    parser.add_argument(
+        '--list', action='store_true',
+        help='Print the partitions with their row estimates and exit',
+    )
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from sqlalchemy import text
+
+    from ..models import get_engine, get_session_factory
+    from ..services import partitions
+
+    args = parse_args(argv)
+    settings = load_settings(args.config_uri)
+    partitions.configure(settings)
+    if args.premake is not None:
+        partitions.PARTITION_SETTINGS['premake'] = args.premake
+    if args.retention_months is not None:
+        partitions.PARTITION_SETTINGS['retention_months'] = args.retention_months
+    archive_dir = args.archive_dir or partitions.PARTITION_SETTINGS['archive_dir']
+    session_factory = get_session_factory(get_engine(settings))
+
+    if args.list:
+        dbsession = session_factory()
+        try:
+            for partition in partitions.list_partitions(dbsession):
+                rows = dbsession.execute(text(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:name AS regclass)"
+                ), {'name': partition.name}).scalar()
+                bounds = (f'{partition.lower:%Y-%m-%d} .. {partition.upper:%Y-%m-%d}'
+                          if partition.lower else 'DEFAULT')
+                print(f"{partition.name:<20} {bounds:<24} ~{max(rows, 0)} rows")
+        finally:
+            dbsession.close()
+        return
+
+    started = time.monotonic()
+
+    # 1. Partisi baru (dan pindahkan isi DEFAULT): satu transaksi
+    dbsession = session_factory()
+    try:
+        created = partitions.ensure_partitions(dbsession)
+        if args.dry_run:
+            dbsession.rollback()
+        else:
+            dbsession.commit()
+    except Exception:
+        dbsession.rollback()
+        raise
+    finally:
+        dbsession.close()
+    verb = 'Would create' if args.dry_run else 'Created'
+    for partition in created:
+        print(f"{verb} {partition.name} [{partition.lower:%Y-%m-%d}, {partition.upper:%Y-%m-%d})")
+
+    # 2. Arsip partisi lama: satu transaksi per partisi, supaya yang sudah selesai tetap tersimpan
+    dbsession = session_factory()
+    try:
+        expired = partitions.expired_partitions(dbsession)
+    finally:
+        dbsession.close()
+
+    archived = 0
+    for partition in expired:
+        if args.dry_run:
+            print(f"Would archive {partition.name} to {archive_dir}/{partition.name}.csv.gz and drop it")
+            continue
+        dbsession = session_factory()
+        try:
+            path, rows = partitions.archive_partition(dbsession, partition, archive_dir)
+            dbsession.commit()
+        except Exception:
+            dbsession.rollback()
+            raise
+        finally:
+            dbsession.close()
+        archived += 1
+        print(f"Archived {partition.name}: {rows} review(s) -> {path}, partition dropped")
+
+    if args.dry_run:
+        print("Dry run: nothing changed")
+    else:
+        print(f"Done in {time.monotonic() - started:.2f}s: {len(created)} partition(s) created, "
+              f"{archived} archived")
+
+
+if __name__ == '__main__':
+    main()
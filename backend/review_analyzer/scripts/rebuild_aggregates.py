@@ -0,0 +1,47 @@
+import argparse
+import sys
+import time
+
+from .worker import load_settings
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Rebuild the per-product aggregate tables from the reviews table.'
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from ..models import ProductStats, get_engine, get_session_factory
+    from ..services import aggregates
+
+    args = parse_args(argv)
+    settings = load_settings(args.config_uri)
+    session_factory = get_session_factory(get_engine(settings))
+
+    started = time.monotonic()
+    dbsession = session_factory()
+    try:
+        # Satu transaksi: pembaca melihat rollup lama sampai commit
+        aggregates.rebuild(dbsession)
+        products = dbsession.query(ProductStats).count()
+        dbsession.commit()
+    except Exception:
+        dbsession.rollback()
+        raise
+    finally:
+        dbsession.close()
+
+    print(f"Rebuilt aggregates for {products} product(s) in {time.monotonic() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+from pyramid.paster import get_appsettings, setup_logging
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Run analysis job workers (consumes the analysis_jobs queue).'
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help='Number of worker processes (default: jobs.workers setting)',
+    )
+    return parser.parse_args(argv[1:])
+
+
+def load_settings(config_uri):
+    setup_logging(config_uri)
+    settings = dict(get_appsettings(config_uri))
+    # Sama seperti main(): DATABASE_URL dari .env menang
+    if os.getenv('DATABASE_URL'):
+        settings['sqlalchemy.url'] = os.getenv('DATABASE_URL')
+    return settings
+
+
+def run_worker(config_uri, stop_event):
+    """Entry point of one worker process."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    # Import di dalam process anak supaya event loop & koneksi dibuat di sini
+    from .. import services
+    from ..models import get_engine, get_session_factory
+    from ..services import jobs
+    from ..services.ai_services import sys_log
+
+    settings = load_settings(config_uri)
+    services.setup(settings)
+    session_factory = get_session_factory(get_engine(settings))
+
+    # SIGINT/SIGTERM ditangani oleh process induk
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    sys_log("INFO", "WORKER", f"Worker {os.getpid()} started")
+    while not stop_event.is_set():
+        try:
+            claimed = jobs.process_batch(session_factory)
+        except Exception as e:
+            sys_log("ERROR", "WORKER", f"Queue error: {str(e)[:100]}")
+            claimed = 0
+        if not claimed:
+            stop_event.wait(jobs.JOB_SETTINGS['poll_interval'])
+    sys_log("INFO", "WORKER", f"Worker {os.getpid()} stopped")
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    settings = load_settings(args.config_uri)
+    workers = args.workers or int(settings.get('jobs.workers', 2))
+
+    context = multiprocessing.get_context('spawn')
+    stop_event = context.Event()
+    processes = [
+        context.Process(target=run_worker, args=(args.config_uri, stop_event), name=f'analysis-worker-{i}')
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    def stop(signum, frame):
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    print(f"Started {workers} analysis worker(s). Press Ctrl+C to stop.")
+    while not stop_event.is_set() and any(p.is_alive() for p in processes):
+        time.sleep(0.5)
+
+    stop_event.set()
+    for process in processes:
+        process.join(timeout=30)
+        if process.is_alive():
+            process.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+import atexit
+
+from .. import logs
+from . import (ai_services, cache, events, http_client, jobs, listing, metrics, pipeline, resilience,
+               response_cache, runtime, serialization)
+
+
+def setup(settings):
+    """
+    Configure the AI service layer from app settings, start the shared
+    HTTP client and warm the providers up (warmup.*). Used by the web app
+    (includeme) and by the CLI workers.
+    """
+    logs.configure(settings)
+    metrics.configure(settings)
+    pipeline.configure(settings)
+    cache.configure(settings)
+    resilience.configure(settings)
+    ai_services.configure(settings)
+    jobs.configure(settings)
+    listing.configure(settings)
+    response_cache.configure(settings)
+    serialization.configure(settings)
+    events.configure(settings)
+    http_client.configure(settings)
+
+    # HTTP client hidup selama proses: dibuat sekarang di loop bersama,
+    # dan ditutup rapi saat proses berhenti
+    runtime.run_sync(http_client.get_session())
+    runtime.add_shutdown_hook(http_client.close)
+    runtime.add_shutdown_hook(ai_services.close)
+    atexit.register(runtime.shutdown)
+
+    # Model, klien & koneksi provider disiapkan sebelum worker menerima request
+    if ai_services.WARMUP_SETTINGS['enabled']:
+        runtime.run_sync(ai_services.warm_up())
+
+
+def includeme(config):
+    """
+    Fungsi ini dipanggil oleh config.include('.services') di __init__.py utama
+    """
+    setup(config.get_settings())
+    # Renderer 'json' memakai serializer cepat (orjson) kalau tersedia
+    config.add_renderer('json', serialization.renderer_factory)
+    if metrics.METRICS_SETTINGS['enabled']:
+        config.add_tween('review_analyzer.services.metrics.tween_factory')
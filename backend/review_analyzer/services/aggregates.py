@@ -0,0 +1,236 @@
+import datetime
+from collections import Counter, defaultdict
+from typing import Iterable
+
+from sqlalchemy import delete, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from ..models import ProductDailyVolume, ProductKeyPoint, ProductStats, Review
+
+KEY_POINT_MAX_LENGTH = 500
+
+# Kolom reviews yang dibutuhkan rollup (untuk RETURNING / SELECT)
+ROLLUP_COLUMNS = (Review.product_name, Review.sentiment, Review.sentiment_score,
+                  Review.key_points, Review.analysis_status, Review.created_at)
+
+
+def normalize_key_point(point) -> str:
+    return ' '.join(str(point).split()).lower()[:KEY_POINT_MAX_LENGTH]
+
+
+def _day(created_at) -> datetime.date:
+    # Hari dihitung dalam UTC, sama dengan rebuild di SQL
+    if created_at is None:
+        return datetime.datetime.now(datetime.timezone.utc).date()
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(datetime.timezone.utc)
+    return created_at.date()
+
+
+def _apply(dbsession, reviews: Iterable, sign: int):
+    stats = defaultdict(Counter)
+    daily = Counter()
+    key_points = Counter()
+
+    for review in reviews:
+        status = getattr(review, 'analysis_status', None)
+        # Review 'pending' belum punya hasil; masuk rollup saat job-nya selesai
+        if status == 'pending':
+            continue
+        product = review.product_name
+        daily[(product, _day(review.created_at))] += sign
+        # Hasil degraded adalah fallback (neutral/0.5, "Analysis unavailable"):
+        # hanya dihitung di volume harian, tidak di distribusi sentimen & key point
+        if status == 'degraded':
+            continue
+        stats[product]['review_count'] += sign
+        stats[product][f'{review.sentiment}_count'] += sign
+        stats[product]['score_sum'] += sign * float(review.sentiment_score)
+        for point in set(normalize_key_point(p) for p in (review.key_points or [])):
+            if point:
+                key_points[(product, point)] += sign
+
+    if not daily:
+        return
+
+    # Upsert dengan increment: aman dipanggil bersamaan dari beberapa request/worker
+    stats_rows = [
+        {
+            'product_name': product,
+            'review_count': counts['review_count'],
+            'positive_count': counts['positive_count'],
+            'negative_count': counts['negative_count'],
+            'neutral_count': counts['neutral_count'],
+            'score_sum': counts['score_sum'],
+        }
+        for product, counts in sorted(stats.items())
+    ]
+    if stats_rows:
+        stmt = insert(ProductStats)
+        dbsession.execute(
+            stmt.on_conflict_do_update(
+                index_elements=['product_name'],
+                set_={
+                    'review_count': ProductStats.review_count + stmt.excluded.review_count,
+                    'positive_count': ProductStats.positive_count + stmt.excluded.positive_count,
+                    'negative_count': ProductStats.negative_count + stmt.excluded.negative_count,
+                    'neutral_count': ProductStats.neutral_count + stmt.excluded.neutral_count,
+                    'score_sum': ProductStats.score_sum + stmt.excluded.score_sum,
+                    'updated_at': text('now()'),
+                }
+            ),
+            stats_rows
+        )
+
+    stmt = insert(ProductDailyVolume)
+    dbsession.execute(
+        stmt.on_conflict_do_update(
+            index_elements=['product_name', 'day'],
+            set_={'review_count': ProductDailyVolume.review_count + stmt.excluded.review_count}
+        ),
+        [{'product_name': p, 'day': d, 'review_count': c} for (p, d), c in sorted(daily.items())]
+    )
+
+    if key_points:
+        stmt = insert(ProductKeyPoint)
+        dbsession.execute(
+            stmt.on_conflict_do_update(
+                index_elements=['product_name', 'key_point'],
+                set_={'occurrences': ProductKeyPoint.occurrences + stmt.excluded.occurrences}
+            ),
+            [{'product_name': p, 'key_point': k, 'occurrences': c} for (p, k), c in sorted(key_points.items())]
+        )
+
+    if sign < 0:
+        # Buang baris yang sudah nol supaya tabel tetap kecil
+        if stats:
+            dbsession.execute(delete(ProductStats).where(
+                ProductStats.product_name.in_(list(stats)), ProductStats.review_count <= 0))
+        dbsession.execute(delete(ProductDailyVolume).where(
+            tuple_(ProductDailyVolume.product_name, ProductDailyVolume.day).in_(list(daily)),
+            ProductDailyVolume.review_count <= 0))
+        if key_points:
+            dbsession.execute(delete(ProductKeyPoint).where(
+                tuple_(ProductKeyPoint.product_name, ProductKeyPoint.key_point).in_(list(key_points)),
+                ProductKeyPoint.occurrences <= 0))
+
+
+def record_added(dbsession, reviews: Iterable):
+    """Add reviews (Review objects or rows with the same attributes) to the rollups,
+    inside the caller's transaction."""
+    _apply(dbsession, list(reviews), 1)
+
+
+def record_removed(dbsession, reviews: Iterable):
+    """Remove reviews from the rollups, inside the caller's transaction."""
+    _apply(dbsession, list(reviews), -1)
+
+
+# Key point ter-normalisasi (sama dengan normalize_key_point) per review dari {table};
+# seperti _apply, review pending & degraded tidak ikut
+KEY_POINTS_SQL = """
+        SELECT DISTINCT r.id, r.product_name,
+               left(lower(regexp_replace(btrim(kp.value), '\\s+', ' ', 'g')), 500) AS key_point
+        FROM {table} r
+        CROSS JOIN LATERAL json_array_elements_text(
+            CASE WHEN json_typeof(r.key_points) = 'array' THEN r.key_points ELSE '[]'::json END
+        ) AS kp(value)
+        WHERE r.analysis_status = 'complete'
+"""
+
+REBUILD_SQL = [
+    # Kunci reviews selama rebuild supaya tidak ada insert/delete yang terlewat
+    "LOCK TABLE reviews IN SHARE MODE",
+    "DELETE FROM product_key_points",
+    "DELETE FROM product_daily_volume",
+    "DELETE FROM product_stats",
+    """
+    INSERT INTO product_stats
+        (product_name, review_count, positive_count, negative_count, neutral_count, score_sum, updated_at)
+    SELECT product_name,
+           count(*),
+           count(*) FILTER (WHERE sentiment = 'positive'),
+           count(*) FILTER (WHERE sentiment = 'negative'),
+           count(*) FILTER (WHERE sentiment = 'neutral'),
+           coalesce(sum(sentiment_score), 0),
+           now()
+    FROM reviews
+    WHERE analysis_status = 'complete'
+    GROUP BY product_name
+    """,
+    """
+    INSERT INTO product_daily_volume (product_name, day, review_count)
+    SELECT product_name, (coalesce(created_at, now()) AT TIME ZONE 'UTC')::date, count(*)
+    FROM reviews
+    WHERE analysis_status <> 'pending'
+    GROUP BY 1, 2
+    """,
+    f"""
+    INSERT INTO product_key_points (product_name, key_point, occurrences)
+    SELECT product_name, key_point, count(*)
+    FROM ({KEY_POINTS_SQL.format(table='reviews')}) points
+    WHERE key_point <> ''
+    GROUP BY product_name, key_point
+    """,
+]
+
+
+def rebuild(dbsession):
+    """Recompute all rollups from the reviews table (inside the caller's transaction)."""
+    for statement in REBUILD_SQL:
+        dbsession.execute(text(statement))
+
+
+# Mengurangi rollup dengan semua review di satu tabel ({table}: partisi yang diarsip).
+# Partisi selalu satu bulan penuh (UTC), jadi volume harian cukup dihapus per rentang hari.
+REMOVE_TABLE_SQL = [
+    """
+    UPDATE product_stats s
+    SET review_count = s.review_count - t.review_count,
+        positive_count = s.positive_count - t.positive_count,
+        negative_count = s.negative_count - t.negative_count,
+        neutral_count = s.neutral_count - t.neutral_count,
+        score_sum = s.score_sum - t.score_sum,
+        updated_at = now()
+    FROM (
+        SELECT product_name,
+               count(*) AS review_count,
+               count(*) FILTER (WHERE sentiment = 'positive') AS positive_count,
+               count(*) FILTER (WHERE sentiment = 'negative') AS negative_count,
+               count(*) FILTER (WHERE sentiment = 'neutral') AS neutral_count,
+               coalesce(sum(sentiment_score), 0) AS score_sum
+        FROM {table}
+        WHERE analysis_status = 'complete'
+        GROUP BY product_name
+    ) t
+    WHERE s.product_name = t.product_name
+    """,
+    "DELETE FROM product_stats WHERE review_count <= 0",
+    """
+    DELETE FROM product_daily_volume
+    WHERE day >= (:lower AT TIME ZONE 'UTC')::date AND day < (:upper AT TIME ZONE 'UTC')::date
+    """,
+    """
+    UPDATE product_key_points k
+    SET occurrences = k.occurrences - t.occurrences
+    FROM (
+        SELECT product_name, key_point, count(*) AS occurrences
+        FROM ({points}) points
+        WHERE key_point <> ''
+        GROUP BY product_name, key_point
+    ) t
+    WHERE k.product_name = t.product_name AND k.key_point = t.key_point
+    """,
+    "DELETE FROM product_key_points WHERE occurrences <= 0",
+]
+
+
+def remove_table(dbsession, table: str, lower: datetime.datetime, upper: datetime.datetime):
+    """
+    Subtract every review in ``table`` (a reviews partition covering
+    [lower, upper)) from the rollups, inside the caller's transaction.
+    ``table`` must be a trusted, already quoted identifier.
+    """
+    points = KEY_POINTS_SQL.format(table=table)
+    for statement in REMOVE_TABLE_SQL:
+        dbsession.execute(text(statement.format(table=table, points=points)), {'lower': lower, 'upper': upper})
@@ -1,154 +1,503 @@
 import os
 import json
-import aiohttp
+import asyncio
+import functools
+import logging
+import threading
 import time
-from datetime import datetime
-from typing import Dict, List
-from dotenv import load_dotenv
-import google.generativeai as genai
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from . import http_client, metrics, resilience, sentiment_backends
+from .batcher import MicroBatcher
+
+# google.generativeai TIDAK diimport di sini: import-nya sendiri makan ~1 detik
+# per worker (dan per --reload). Diimport & di-configure saat pertama dipakai,
+# lihat get_gemini_model() / warm_up().
 
 # --- SYSTEM LOGGER CONFIGURATION ---
-def sys_log(level: str, source: str, message: str):
-    """Custom logger for cleaner, tech-style output"""
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    
-    # Design symbols
-    indicators = {
-        "INFO":  "ii", 
-        "SUCCESS": "OK", 
-        "WARN":  "!!", 
-        "ERROR": "XX", 
-        "PROCESS": ">>"
-    }
-    
-    tag = indicators.get(level, "..")
-    print(f"[{timestamp}] {tag} | {source.ljust(10)} : {message}")
+_LOG_LEVELS = {
+    "INFO": logging.INFO,
+    "SUCCESS": logging.INFO,
+    "WARN": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "PROCESS": logging.DEBUG,
+}
 
-# Load environment variables
-load_dotenv()
-sys_log("INFO", "SYSTEM", "Initializing AI Services...")
 
-# --- STEP 1: LOAD KEYS ---
+def sys_log(level: str, source: str, message: str):
+    """
+    Log through the ``review_analyzer.<source>`` logger, with ``source``
+    and ``event`` (the level name, e.g. "success") as structured fields. Non-blocking once
+    logs.configure has put the handlers behind a queue.
+    """
+    logging.getLogger(f"review_analyzer.{source.lower()}").log(
+        _LOG_LEVELS.get(level, logging.INFO), message,
+        extra={'source': source, 'event': level.lower()}
+    )
+
+# --- KEYS ---
+# .env sudah dimuat oleh review_analyzer/__init__.py (dan oleh setiap script CLI)
 HUGGINGFACE_TOKEN = os.getenv("HUGGINGFACE_TOKEN")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-# Check Keys
-if GEMINI_API_KEY:
-    sys_log("SUCCESS", "AUTH", "Gemini API Key loaded.")
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
-    sys_log("ERROR", "AUTH", "Gemini API Key MISSING in .env")
-
-if HUGGINGFACE_TOKEN:
-    sys_log("SUCCESS", "AUTH", "HuggingFace Token loaded.")
-else:
-    sys_log("ERROR", "AUTH", "HuggingFace Token MISSING in .env")
-
 
 # --- CONFIGURATION ---
+HF_MODEL_ID = "cardiffnlp/twitter-xlm-roberta-base-sentiment"
+GEMINI_MODEL_ID = "gemini-2.5-flash"
+# Naikkan setiap kali instruksi/schema key points diubah: masuk ke cache key
+# dan Review.model_version, jadi backfill tahu review mana yang perlu diulang
+KEY_POINTS_PROMPT_VERSION = "batch-v1"
+
 # Menggunakan URL router baru (Stable)
-HF_API_URL = "https://router.huggingface.co/hf-inference/models/cardiffnlp/twitter-xlm-roberta-base-sentiment"
+HF_API_URL = f"https://router.huggingface.co/hf-inference/models/{HF_MODEL_ID}"
 HF_HEADERS = {"Authorization": f"Bearer {HUGGINGFACE_TOKEN}"}
 
+# Nilai fallback yang dikembalikan kalau provider gagal
+SENTIMENT_FALLBACK = {"sentiment": "neutral", "score": 0.5}
+KEY_POINTS_FALLBACK = ["Gagal melakukan analisis"]
+MISSING_KEY_FALLBACK = ["Analysis unavailable (Missing API Key)"]
+
+
+class SentimentFallback(dict):
+    """SENTIMENT_FALLBACK returned in place of a sentiment result."""
+
+
+class KeyPointsFallback(list):
+    """A key point fallback returned in place of extracted key points."""
+
+
+def is_fallback(value) -> bool:
+    """True when ``value`` stands in for a provider result that failed or was
+    unavailable; a real result that happens to equal the fallback is not."""
+    return isinstance(value, (SentimentFallback, KeyPointsFallback))
+
+# Instruksi & schema dikirim sekali per request Gemini, bukan sekali per review
+KEY_POINTS_INSTRUCTION = """
+Role: Expert Product Analyst.
+
+Input: a JSON object with a "product" name and a list of "reviews" of that
+product, each with an "index" and a "text".
+
+Instruction:
+For EVERY review, generate 3-5 key points based on that review, and return
+them with the same "index".
+
+CRITICAL RULES FOR SHORT REVIEWS:
+If a review is VERY SHORT or VAGUE (e.g., "Biasa saja", "Just okay", "Bad", "Good"):
+1. Do NOT just repeat the review.
+2. You MUST use your external knowledge about the product to deduce WHY the user might feel that way.
+   - Example Input: Product "iPhone 15", Review "Biasa saja".
+   - Your Inference: The user likely means "Lack of major design changes", "Screen still 60Hz", "Price to performance ratio".
+3. If a review is DETAILED, stick strictly to the text provided.
+
+LANGUAGE RULES:
+- If the review is Indonesian -> Output its points in INDONESIAN.
+- If the review is English -> Output its points in ENGLISH.
+"""
+
+KEY_POINTS_SCHEMA = {
+    'type': 'array',
+    'items': {
+        'type': 'object',
+        'properties': {
+            'index': {'type': 'integer'},
+            'key_points': {'type': 'array', 'items': {'type': 'string'}},
+        },
+        'required': ['index', 'key_points'],
+    },
+}
+
+# Cara memanggil Gemini, bisa di-override dari development.ini (prefix "gemini.")
+GEMINI_SETTINGS = {
+    'mode': 'async',          # async (generate_content_async) | thread (SDK sync di thread pool)
+    'thread_pool_size': 8,    # untuk mode thread: panggilan Gemini paralel maksimal
+    'timeout': 25.0,          # detik per panggilan; lewat dari ini dibatalkan
+    'transport': 'grpc',      # grpc | rest (rest hanya bisa dengan mode thread)
+    'api_endpoint': '',       # kosong = endpoint Google; mis. mock server benchmark
+}
+GEMINI_MODES = ('async', 'thread')
+GEMINI_TRANSPORTS = ('grpc', 'rest')
+GEMINI_HOST = 'generativelanguage.googleapis.com'
+
+# Pemanasan worker sebelum menerima traffic, bisa di-override dari development.ini (prefix "warmup.")
+WARMUP_SETTINGS = {
+    'enabled': True,
+    'load_models': True,   # muat model lokal (backend onnx) sekarang, bukan saat request pertama
+    'connect': True,       # resolve DNS provider & buka koneksi pool ke HuggingFace
+    'timeout': 15.0,       # detik untuk seluruh warm-up; lewat dari ini worker tetap jalan
+}
+# Hasil warm-up terakhir, dilaporkan oleh GET /api/health?mode=ready
+WARMUP_STATE = {'done': False, 'seconds': None, 'steps': {}}
+
+_sentiment_batcher: Optional[MicroBatcher] = None
+_key_points_batcher: Optional[MicroBatcher] = None
+_gemini_model = None  # google.generativeai.GenerativeModel, dibuat saat pertama dipakai
+_gemini_lock = threading.Lock()
+_gemini_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _enabled(value) -> bool:
+    return str(value).lower() in ('1', 'true', 'yes', 'on')
+
+
+def configure(settings):
+    """Pick the sentiment backend from ``sentiment.backend`` and set up the
+    sentiment / key-point batchers. Nothing is loaded or connected here;
+    that is warm_up()'s job (or the first request's)."""
+    if not GEMINI_API_KEY:
+        sys_log("ERROR", "AUTH", "Gemini API Key MISSING in .env")
+    if not HUGGINGFACE_TOKEN:
+        sys_log("ERROR", "AUTH", "HuggingFace Token MISSING in .env")
+
+    backend = sentiment_backends.build_backend(
+        settings,
+        hf_api_url=settings.get('sentiment.hf_api_url', HF_API_URL),
+        hf_headers=HF_HEADERS,
+        hf_model_id=HF_MODEL_ID,
+    )
+    sentiment_backends.set_backend(backend)
+    sys_log("INFO", "SENTIMENT", f"Backend: {backend.name} ({backend.model_id})")
+
+    # Micro-batching: request sentiment yang datang bersamaan digabung jadi satu inferensi
+    global _sentiment_batcher, _key_points_batcher
+    if _enabled(settings.get('sentiment.batch.enabled', 'true')):
+        _sentiment_batcher = MicroBatcher(
+            backend.analyze_batch,
+            max_batch_size=int(settings.get('sentiment.batch.max_size', 16)),
+            max_wait_ms=float(settings.get('sentiment.batch.max_wait_ms', 10)),
+            name='sentiment',
+        )
+    else:
+        _sentiment_batcher = None
+
+    for key, default in list(GEMINI_SETTINGS.items()):
+        value = settings.get(f'gemini.{key}')
+        if value is not None:
+            GEMINI_SETTINGS[key] = type(default)(value)
+    if GEMINI_SETTINGS['mode'] not in GEMINI_MODES:
+        raise ValueError(f"Unknown gemini.mode: {GEMINI_SETTINGS['mode']}")
+    if GEMINI_SETTINGS['transport'] not in GEMINI_TRANSPORTS:
+        raise ValueError(f"Unknown gemini.transport: {GEMINI_SETTINGS['transport']}")
+    if GEMINI_SETTINGS['transport'] == 'rest' and GEMINI_SETTINGS['mode'] != 'thread':
+        raise ValueError("gemini.transport = rest needs gemini.mode = thread")
+
+    for key, default in list(WARMUP_SETTINGS.items()):
+        value = settings.get(f'warmup.{key}')
+        if value is not None:
+            WARMUP_SETTINGS[key] = _enabled(value) if isinstance(default, bool) else type(default)(value)
+
+    # Model/klien Gemini dibuat ulang (dengan setting baru) saat dipakai lagi
+    global _gemini_model, _gemini_executor
+    _gemini_model = None
+    if _gemini_executor is not None:
+        _gemini_executor.shutdown(wait=False)
+        _gemini_executor = None
+    if GEMINI_SETTINGS['mode'] == 'thread':
+        _gemini_executor = ThreadPoolExecutor(
+            max_workers=GEMINI_SETTINGS['thread_pool_size'], thread_name_prefix='gemini')
+
+    # Batch key points: beberapa review (per produk) dalam satu request Gemini
+    if _enabled(settings.get('gemini.batch.enabled', 'true')):
+        _key_points_batcher = MicroBatcher(
+            extract_key_points_batch,
+            max_batch_size=int(settings.get('gemini.batch.max_size', 8)),
+            max_wait_ms=float(settings.get('gemini.batch.max_wait_ms', 20)),
+            name='key_points',
+        )
+    else:
+        _key_points_batcher = None
+
+
+def batcher_stats():
+    return _sentiment_batcher.stats() if _sentiment_batcher is not None else None
+
+
+def key_points_batcher_stats():
+    return _key_points_batcher.stats() if _key_points_batcher is not None else None
+
+
+async def close():
+    """Release resources of the batchers and the sentiment backend."""
+    if _sentiment_batcher is not None:
+        await _sentiment_batcher.close()
+    if _key_points_batcher is not None:
+        await _key_points_batcher.close()
+    if _gemini_executor is not None:
+        _gemini_executor.shutdown(wait=False, cancel_futures=True)
+    backend = sentiment_backends.get_backend()
+    if backend is not None:
+        await backend.close()
+
+
+def get_sentiment_backend() -> sentiment_backends.SentimentBackend:
+    backend = sentiment_backends.get_backend()
+    if backend is None:
+        # Belum di-configure (mis. dipakai di luar app): pakai HF seperti semula
+        backend = sentiment_backends.HuggingFaceBackend(HF_API_URL, HF_HEADERS, HF_MODEL_ID)
+        sentiment_backends.set_backend(backend)
+    return backend
+
+
+def _gemini_address() -> Tuple[str, int]:
+    """Host and port the Gemini SDK connects to (gemini.api_endpoint or Google's)."""
+    endpoint = GEMINI_SETTINGS['api_endpoint'] or GEMINI_HOST
+    parts = urlsplit(endpoint if '://' in endpoint else f'//{endpoint}')
+    return parts.hostname, parts.port or (80 if parts.scheme == 'http' else 443)
+
+
+async def warm_up() -> Dict[str, any]:
+    """
+    Get the worker ready before it takes traffic: load the local sentiment
+    model, build the Gemini client, resolve the provider hosts and open a
+    pooled connection to HuggingFace. A failed step is logged and recorded
+    in WARMUP_STATE, never raised: the worker still starts, and the first
+    request pays for whatever is missing.
+    """
+    loop = asyncio.get_running_loop()
+    backend = get_sentiment_backend()
+    started = time.perf_counter()
+    steps = {}
+
+    async def _step(name, coro):
+        step_started = time.perf_counter()
+        try:
+            await coro
+            steps[name] = f'ok ({time.perf_counter() - step_started:.2f}s)'
+        except Exception as e:
+            steps[name] = f'failed: {(str(e) or type(e).__name__).splitlines()[0][:200]}'
+            sys_log("WARN", "WARMUP", f"{name} {steps[name]}")
+
+    async def _gemini_client():
+        # Import SDK (~1 detik) di thread supaya loop bersama tidak tertahan
+        await loop.run_in_executor(None, get_gemini_model)
+        from google.generativeai import client
+
+        if GEMINI_SETTINGS['mode'] == 'thread':
+            await loop.run_in_executor(None, client.get_default_generative_client)
+        else:
+            # Klien gRPC async terikat ke loop yang membuatnya: dibuat di loop bersama
+            client.get_default_generative_async_client()
+
+    async def _run():
+        if WARMUP_SETTINGS['load_models'] and not backend.loaded():
+            await _step('sentiment_model', loop.run_in_executor(None, backend.load))
+        connects = []
+        if GEMINI_API_KEY:
+            connects.append(_step('gemini_client', _gemini_client()))
+        if WARMUP_SETTINGS['connect']:
+            if isinstance(backend, sentiment_backends.HuggingFaceBackend):
+                connects.append(_step('huggingface_connect', http_client.preconnect(backend.api_url)))
+            if GEMINI_API_KEY:
+                connects.append(_step('gemini_dns', loop.getaddrinfo(*_gemini_address())))
+        await asyncio.gather(*connects)
+
+    try:
+        await asyncio.wait_for(_run(), WARMUP_SETTINGS['timeout'])
+    except asyncio.TimeoutError:
+        steps['timeout'] = f"failed: not finished after {WARMUP_SETTINGS['timeout']}s"
+        sys_log("WARN", "WARMUP", steps['timeout'])
+
+    WARMUP_STATE.update(done=True, seconds=round(time.perf_counter() - started, 3), steps=steps)
+    sys_log("INFO", "WARMUP", f"Done in {WARMUP_STATE['seconds']}s: "
+                              + (', '.join(f'{k} {v}' for k, v in steps.items()) or 'nothing to do'))
+    return WARMUP_STATE
+
+
+def readiness() -> Dict[str, any]:
+    """Provider status for GET /api/health?mode=ready: sentiment backend
+    loaded, Gemini client built, circuit breaker states, last warm-up."""
+    backend = get_sentiment_backend()
+    providers = resilience.stats()
+    sentiment = {'backend': backend.name, 'model_id': backend.model_id, 'loaded': backend.loaded()}
+    if isinstance(backend, sentiment_backends.HuggingFaceBackend):
+        sentiment['api_key'] = bool(HUGGINGFACE_TOKEN)
+        sentiment['circuit'] = providers.get('huggingface', {}).get('circuit')
+    return {
+        'sentiment': sentiment,
+        'gemini': {
+            'api_key': bool(GEMINI_API_KEY),
+            'client': _gemini_model is not None,
+            'circuit': providers.get('gemini', {}).get('circuit'),
+        },
+        'warmup': dict(WARMUP_STATE, enabled=WARMUP_SETTINGS['enabled']),
+    }
+
 
 async def analyze_sentiment(text: str) -> Dict[str, any]:
     """
-    Analyze sentiment using Hugging Face (Roberta Model).
+    Analyze sentiment with the configured backend (HF router by default).
     """
     sys_log("PROCESS", "SENTIMENT", f"Analyzing: {text[:30]}...")
     start_time = time.time()
     
     try:
-        async with aiohttp.ClientSession() as session:
-            payload = {"inputs": text}
-            
-            async with session.post(
-                HF_API_URL,
-                headers=HF_HEADERS,
-                json=payload
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    sys_log("WARN", "SENTIMENT", f"API Status {response.status}")
-                    raise Exception(f"HF Error: {error_text}")
-                
-                result = await response.json()
-                
-                # Handling structure difference
-                if isinstance(result, list) and len(result) > 0:
-                    predictions = result[0] if isinstance(result[0], list) else result
-                    
-                    # Cari score tertinggi
-                    top_prediction = max(predictions, key=lambda x: x['score'])
-                    
-                    label = top_prediction['label'].lower()
-                    score = top_prediction['score']
-                    
-                    elapsed = round(time.time() - start_time, 2)
-                    sys_log("SUCCESS", "SENTIMENT", f"Result: {label.upper()} ({score:.2f}) [{elapsed}s]")
-                    
-                    return {
-                        "sentiment": label,
-                        "score": round(score, 4)
-                    }
-                else:
-                    raise Exception("Invalid response format from HF")
+        if _sentiment_batcher is not None:
+            result = await _sentiment_batcher.submit(text)
+        else:
+            result = await get_sentiment_backend().analyze(text)
+        
+        elapsed = round(time.time() - start_time, 2)
+        sys_log("SUCCESS", "SENTIMENT", f"Result: {result['sentiment'].upper()} ({result['score']:.2f}) [{elapsed}s]")
+        return result
                     
     except Exception as e:
         sys_log("ERROR", "SENTIMENT", f"Analysis Failed: {str(e)[:50]}...")
-        return {"sentiment": "neutral", "score": 0.5}
+        metrics.ERRORS.inc(source='sentiment')
+        return SentimentFallback(SENTIMENT_FALLBACK)
 
 
-async def extract_key_points(review_text: str, product_name: str) -> List[str]:
+def get_gemini_model():
     """
-    Extract key points using Google Gemini.
+    One model instance for all calls (instruction + JSON schema set once).
+    The SDK is imported and configured here, on first use.
     """
-    if not GEMINI_API_KEY:
-        sys_log("ERROR", "GEMINI", "Aborting: No API Key.")
-        return ["Analysis unavailable (Missing API Key)"]
+    global _gemini_model
+    if _gemini_model is not None:
+        return _gemini_model
+    with _gemini_lock:
+        if _gemini_model is None:
+            import google.generativeai as genai
 
-    try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        prompt = f"""
-Role: Expert Product Analyst.
-Product: "{product_name}"
-User Review: "{review_text}"
+            if GEMINI_SETTINGS['transport'] != 'grpc' or GEMINI_SETTINGS['api_endpoint']:
+                client_options = ({'api_endpoint': GEMINI_SETTINGS['api_endpoint']}
+                                  if GEMINI_SETTINGS['api_endpoint'] else None)
+                genai.configure(api_key=GEMINI_API_KEY, transport=GEMINI_SETTINGS['transport'],
+                                client_options=client_options)
+            else:
+                genai.configure(api_key=GEMINI_API_KEY)
+            _gemini_model = genai.GenerativeModel(
+                GEMINI_MODEL_ID,
+                system_instruction=KEY_POINTS_INSTRUCTION,
+                generation_config=genai.GenerationConfig(
+                    response_mime_type='application/json',
+                    response_schema=KEY_POINTS_SCHEMA,
+                ),
+            )
+    return _gemini_model
 
-Instruction:
-Generate 3-5 key points based on the review.
 
-CRITICAL RULES FOR SHORT REVIEWS:
-If the review is VERY SHORT or VAGUE (e.g., "Biasa saja", "Just okay", "Bad", "Good"):
-1. Do NOT just repeat the review.
-2. You MUST use your external knowledge about {product_name} to deduce WHY the user might feel that way.
-   - Example Input: Product "iPhone 15", Review "Biasa saja".
-   - Your Inference: The user likely means "Lack of major design changes", "Screen still 60Hz", "Price to performance ratio".
-3. If the review is DETAILED, stick strictly to the text provided.
+def _gemini_error(error) -> resilience.ProviderError:
+    """Translate an SDK error into a ProviderError (status + retry delay if given)."""
+    retry_after = None
+    response = getattr(error, 'response', None)
+    if response is not None and getattr(response, 'headers', None):
+        retry_after = resilience.parse_retry_after(response.headers.get('Retry-After'))
+    for detail in getattr(error, 'details', None) or []:
+        # google.rpc.RetryInfo pada error 429 dari gRPC
+        delay = getattr(detail, 'retry_delay', None)
+        if delay is not None and retry_after is None:
+            retry_after = delay.seconds + delay.nanos / 1e9
+    return resilience.ProviderError('gemini', f"Gemini Error {error.code}: {error.message}",
+                                    status=error.code, retry_after=retry_after)
 
-LANGUAGE RULES:
-- If review is Indonesian -> Output points in INDONESIAN.
-- If review is English -> Output points in ENGLISH.
 
-Format: Return ONLY a raw JSON array of strings.
-Example Output: ["Poin 1", "Poin 2", "Poin 3"]"""
+async def _generate(payload: str):
+    """
+    Call Gemini without blocking the event loop, within GEMINI_SETTINGS['timeout']
+    per attempt, through the gemini rate limiter / retry / circuit breaker.
+
+    In async mode the SDK's own coroutine is awaited and cancelled at the
+    deadline. In thread mode the blocking call runs on the bounded gemini
+    pool; the caller is released at the deadline and the SDK's own request
+    timeout ends the thread's call.
+    """
+    from google.api_core import exceptions as google_exceptions
+
+    model = get_gemini_model()
+    timeout = GEMINI_SETTINGS['timeout']
+    request_options = {'timeout': timeout}
+
+    async def _once():
+        if _gemini_executor is None:
+            call = model.generate_content_async(payload, request_options=request_options)
+        else:
+            call = asyncio.get_running_loop().run_in_executor(
+                _gemini_executor,
+                functools.partial(model.generate_content, payload, request_options=request_options)
+            )
 
-        sys_log("PROCESS", "GEMINI", "Extracting points (Smart Context)...")
-        response = model.generate_content(prompt)
-        
-        # Cleaning response
-        text_resp = response.text.replace('```json', '').replace('```', '').strip()
-        
         try:
-            key_points = json.loads(text_resp)
-            if isinstance(key_points, list):
-                sys_log("SUCCESS", "GEMINI", f"Extracted {len(key_points)} points.")
-                return key_points[:5]
-            return [text_resp]
-        except:
-            sys_log("WARN", "GEMINI", "JSON parse failed, using fallback.")
-            return [line.strip("- *") for line in text_resp.split('\n') if line.strip()][:3]
-            
-    except Exception as e:
-        sys_log("ERROR", "GEMINI", f"Extraction Error: {str(e)[:50]}...")
-        return ["Gagal melakukan analisis"]
\ No newline at end of file
+            return await asyncio.wait_for(call, timeout=timeout)
+        except asyncio.TimeoutError:
+            sys_log("WARN", "GEMINI", f"Call cancelled after {timeout}s")
+            raise
+        except google_exceptions.GoogleAPICallError as e:
+            raise _gemini_error(e)
+
+    with metrics.span('gemini'):
+        return await resilience.get('gemini').call(_once)
+
+
+async def _extract_group(product_name: str, reviews: List[str]) -> List[List[str]]:
+    """One Gemini request for several reviews of the same product."""
+    payload = json.dumps({
+        'product': product_name,
+        'reviews': [{'index': i, 'text': text} for i, text in enumerate(reviews)],
+    }, ensure_ascii=False)
+
+    response = await _generate(payload)
+
+    # Output dijamin JSON oleh response_schema; hasil dipetakan balik lewat index
+    by_index = {}
+    for item in json.loads(response.text):
+        index = item.get('index')
+        points = [str(p).strip() for p in item.get('key_points') or [] if str(p).strip()]
+        if isinstance(index, int) and 0 <= index < len(reviews) and points:
+            by_index[index] = points[:5]
+
+    if len(by_index) < len(reviews):
+        sys_log("WARN", "GEMINI", f"{len(reviews) - len(by_index)} of {len(reviews)} review(s) missing in response.")
+    return [by_index.get(i, KeyPointsFallback(KEY_POINTS_FALLBACK)) for i in range(len(reviews))]
+
+
+async def extract_key_points_batch(items: List[Tuple[str, str]]) -> List[List[str]]:
+    """
+    Extract key points for many (review_text, product_name) pairs.
+    Reviews are grouped by product, one request per product; results keep
+    the input order. A failed request gives its reviews the fallback value.
+    """
+    if not GEMINI_API_KEY:
+        return [KeyPointsFallback(MISSING_KEY_FALLBACK) for _ in items]
+
+    groups: Dict[str, List[int]] = {}
+    for position, (_, product_name) in enumerate(items):
+        groups.setdefault(product_name, []).append(position)
+
+    results: List[List[str]] = [KeyPointsFallback(KEY_POINTS_FALLBACK) for _ in items]
+
+    async def _run(product_name: str, positions: List[int]):
+        try:
+            points = await _extract_group(product_name, [items[p][0] for p in positions])
+        except Exception as e:
+            sys_log("ERROR", "GEMINI", f"Extraction Error: {str(e)[:50]}...")
+            metrics.ERRORS.inc(source='gemini')
+            return
+        for position, key_points in zip(positions, points):
+            results[position] = key_points
+
+    await asyncio.gather(*[_run(product, positions) for product, positions in groups.items()])
+    return results
+
+
+async def extract_key_points(review_text: str, product_name: str) -> List[str]:
+    """
+    Extract key points using Google Gemini.
+    """
+    if not GEMINI_API_KEY:
+        sys_log("ERROR", "GEMINI", "Aborting: No API Key.")
+        return KeyPointsFallback(MISSING_KEY_FALLBACK)
+
+    sys_log("PROCESS", "GEMINI", "Extracting points (Smart Context)...")
+    start_time = time.time()
+
+    if _key_points_batcher is not None:
+        key_points = await _key_points_batcher.submit((review_text, product_name))
+    else:
+        key_points = (await extract_key_points_batch([(review_text, product_name)]))[0]
+
+    if not is_fallback(key_points):
+        elapsed = round(time.time() - start_time, 2)
+        sys_log("SUCCESS", "GEMINI", f"Extracted {len(key_points)} points. [{elapsed}s]")
+    return key_points
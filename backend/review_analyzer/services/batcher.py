@@ -0,0 +1,128 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+
+class MicroBatcher:
+    """
+    Collect concurrent single-item requests into batches.
+
+    Callers ``await submit(item)``. Items are grouped until either
+    ``max_batch_size`` items are waiting or the first item has waited
+    ``max_wait_ms``, then ``handler(items)`` is called once and each caller
+    receives its own result (or the batch's exception).
+
+    The batcher binds to the event loop it is first used on; in this app that
+    is the shared runtime loop.
+    """
+
+    def __init__(self, handler: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_batch_size: int = 16, max_wait_ms: float = 10.0, name: str = 'batcher'):
+        self.handler = handler
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight = set()
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._fill_total = 0.0
+        self._max_queue_depth = 0
+        self._failed_batches = 0
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future))
+
+        depth = self._queue.qsize()
+        if depth > self._max_queue_depth:
+            with self._stats_lock:
+                self._max_queue_depth = max(self._max_queue_depth, depth)
+
+        return await future
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # Ambil yang sudah antri tanpa menunggu
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Caller yang sudah timeout/cancel tidak perlu ikut dikirim
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+            # Batch berikutnya boleh dikumpulkan selagi batch ini diproses
+            task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        with self._stats_lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._fill_total += len(batch) / self.max_batch_size
+
+        try:
+            results = await self.handler([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"{self.name}: handler returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            with self._stats_lock:
+                self._failed_batches += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        for task in list(self._inflight):
+            task.cancel()
+
+    def stats(self):
+        with self._stats_lock:
+            batches = self._batches or 1
+            return {
+                'name': self.name,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': round(self.max_wait * 1000, 2),
+                'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+                'max_queue_depth': self._max_queue_depth,
+                'batches': self._batches,
+                'items': self._items,
+                'failed_batches': self._failed_batches,
+                'avg_batch_size': round(self._items / batches, 2),
+                'avg_fill_ratio': round(self._fill_total / batches, 4),
+            }
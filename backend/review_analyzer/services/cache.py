@@ -0,0 +1,123 @@
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Optional
+
+# Default ukuran & TTL cache in-process, bisa di-override dari development.ini
+CACHE_SETTINGS = {
+    'enabled': True,
+    'max_entries': 10000,
+    'ttl': 86400.0,      # detik (in-process)
+    'persistent': True,  # simpan juga di tabel analysis_cache
+}
+
+_WHITESPACE = re.compile(r'\s+')
+_TRAILING_PUNCT = re.compile(r'[\s.!?,;:~]+$')
+
+
+def configure(settings):
+    """Read cache settings (``cache.*``) from the app settings."""
+    CACHE_SETTINGS['enabled'] = _as_bool(settings.get('cache.enabled', CACHE_SETTINGS['enabled']))
+    CACHE_SETTINGS['persistent'] = _as_bool(settings.get('cache.persistent', CACHE_SETTINGS['persistent']))
+    CACHE_SETTINGS['max_entries'] = int(settings.get('cache.max_entries', CACHE_SETTINGS['max_entries']))
+    CACHE_SETTINGS['ttl'] = float(settings.get('cache.ttl', CACHE_SETTINGS['ttl']))
+    ANALYSIS_CACHE.resize(CACHE_SETTINGS['max_entries'], CACHE_SETTINGS['ttl'])
+
+
+def _as_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize review text so trivially different duplicates share a key:
+    unicode NFKC, lowercase, collapsed whitespace, no trailing punctuation.
+    "Biasa saja!!", " biasa  SAJA" and "Biasa saja." all map to "biasa saja".
+    """
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    text = _WHITESPACE.sub(' ', text).strip()
+    return _TRAILING_PUNCT.sub('', text)
+
+
+def make_key(product_name: str, review_text: str, model_id: str) -> str:
+    """SHA-256 over (model id, product name, normalized review text)."""
+    raw = '\x1f'.join([
+        model_id,
+        normalize_text(product_name),
+        normalize_text(review_text),
+    ])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe LRU cache with a per-entry TTL and hit/miss/eviction counters."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._data: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def resize(self, max_entries: int, ttl: float):
+        with self._lock:
+            self.max_entries = max_entries
+            self.ttl = ttl
+            self._evict()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _evict(self):
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+ANALYSIS_CACHE = LRUCache(CACHE_SETTINGS['max_entries'], CACHE_SETTINGS['ttl'])
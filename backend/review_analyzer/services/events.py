@@ -0,0 +1,332 @@
+"""
+Live review events for GET /api/reviews/events (Server-Sent Events).
+
+Writers call publish() in their transaction: the change is recorded in
+review_events and sent with PostgreSQL NOTIFY, both only if the
+transaction commits. In the ASGI app one EventBroker per process LISTENs
+on its own asyncpg connection and fans each event out to the connected
+clients:
+
+- every client has a bounded queue; a client that falls ``queue_size``
+  events behind is disconnected rather than buffered without limit, and
+  its EventSource reconnects with Last-Event-ID;
+- Last-Event-ID (header, or ``?last_event_id=``) replays the missed events
+  from review_events. When too many were missed, or they were already
+  pruned, the client gets a ``reset`` event and reloads the list instead.
+"""
+import asyncio
+import collections
+import json
+import logging
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import text
+
+from ..models import Review, ReviewEvent
+from . import listing, metrics, serialization
+from .cache import _as_bool
+
+log = logging.getLogger(__name__)
+
+# Default live events, bisa di-override dari development.ini (prefix "events.")
+EVENTS_SETTINGS = {
+    'enabled': True,
+    'channel': 'review_events',
+    'queue_size': 256,         # event per klien yang boleh tertunda; lebih dari ini klien diputus
+    'max_subscribers': 10000,  # klien SSE per proses
+    'heartbeat': 15.0,         # detik antar komentar keep-alive, supaya proxy tidak memutus koneksi idle
+    'replay_limit': 1000,      # event maksimal yang diputar ulang untuk Last-Event-ID; lebih = reset
+    'retention': 3600,         # detik event disimpan untuk resume
+    'reconnect_delay': 2.0,    # detik sebelum LISTEN dicoba lagi setelah koneksi putus
+}
+
+# Satu INSERT + satu NOTIFY per review; NOTIFY baru terkirim saat commit
+PUBLISH_SQL = """
+WITH e AS (
+    INSERT INTO review_events (type, review_id)
+    SELECT :type, unnest(CAST(:review_ids AS integer[]))
+    RETURNING id, type, review_id
+)
+SELECT pg_notify(:channel, json_build_object('id', id, 'type', type, 'review_id', review_id)::text)
+FROM e
+"""
+
+PRUNE_SQL = "DELETE FROM review_events WHERE created_at < now() - make_interval(secs => $1)"
+PRUNE_INTERVAL = 60.0
+
+# Dikirim sekali di awal stream: jeda reconnect EventSource (ms)
+RETRY = b'retry: 3000\n\n'
+HEARTBEAT = b': keep-alive\n\n'
+
+# Broker proses ini (dibuat oleh AsyncApp), untuk /api/stats
+BROKER: Optional['EventBroker'] = None
+
+
+def configure(settings):
+    """Read live event settings (``events.*``) from the app settings."""
+    for key, default in list(EVENTS_SETTINGS.items()):
+        value = settings.get(f'events.{key}')
+        if value is not None:
+            EVENTS_SETTINGS[key] = _as_bool(value) if isinstance(default, bool) else type(default)(value)
+
+
+def publish(dbsession, event_type: str, review_ids: List[int]):
+    """
+    Record ``event_type`` (created, updated, deleted) for ``review_ids`` and
+    NOTIFY the listeners, in the caller's transaction: nothing is sent if it
+    rolls back. Does nothing off PostgreSQL or with events disabled.
+    """
+    if not review_ids or not EVENTS_SETTINGS['enabled']:
+        return
+    if dbsession.get_bind().dialect.name != 'postgresql':
+        return
+    dbsession.execute(text(PUBLISH_SQL), {
+        'type': event_type, 'review_ids': list(review_ids), 'channel': EVENTS_SETTINGS['channel'],
+    })
+
+
+def fetch_reviews(dbsession, review_ids: List[int]) -> Dict[int, dict]:
+    """Review dicts by ID (one query for a whole batch of events)."""
+    if not review_ids:
+        return {}
+    rows = listing.projected_query(dbsession, Review.FIELDS).filter(Review.id.in_(set(review_ids))).all()
+    return {review['id']: review for review in listing.rows_to_dicts(rows, Review.FIELDS)}
+
+
+def fetch_events(dbsession, after_id: int, limit: int):
+    """Events after ``after_id`` (at most ``limit``), plus the oldest ID still kept."""
+    oldest = dbsession.query(ReviewEvent.id).order_by(ReviewEvent.id).limit(1).scalar()
+    events = dbsession.query(ReviewEvent.id, ReviewEvent.type, ReviewEvent.review_id)\
+        .filter(ReviewEvent.id > after_id).order_by(ReviewEvent.id).limit(limit).all()
+    return events, oldest
+
+
+def format_event(event_id: Optional[int], name: str, data) -> bytes:
+    """One SSE message; the JSON body is a single line."""
+    head = b'id: %d\n' % event_id if event_id is not None else b''
+    return head + b'event: %s\ndata: %s\n\n' % (name.encode('ascii'), serialization.dumps(data))
+
+
+def build_messages(events, reviews: Dict[int, dict]) -> List[Tuple[int, bytes]]:
+    """
+    (event ID, message) per event. A created/updated event whose review is
+    gone by now is skipped: its 'deleted' event follows.
+    """
+    messages = []
+    for event_id, event_type, review_id in events:
+        if event_type == 'deleted':
+            data = {'id': review_id}
+        else:
+            data = reviews.get(review_id)
+            if data is None:
+                continue
+        messages.append((event_id, format_event(event_id, f'review_{event_type}', data)))
+    return messages
+
+
+class CatchUp(NamedTuple):
+    """Queued after a reconnect: dispatch the events after ``after_id`` missed meanwhile."""
+    after_id: int
+
+
+class Subscriber:
+    """One connected client: a bounded queue of (event ID, message); None ends the stream."""
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.overflowed = False
+        # Event sampai ID ini sudah dikirim (lewat replay): yang sama dari antrian dilewati
+        self.sent_id = 0
+
+    def push(self, item: Tuple[int, bytes]) -> bool:
+        if self.overflowed:
+            return False
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            # Klien lambat: akhiri stream-nya; EventSource reconnect dengan
+            # Last-Event-ID dan mengejar dari review_events
+            self.overflowed = True
+            self.close()
+            metrics.SSE_EVENTS.inc(result='dropped_slow_client')
+            return False
+
+    def close(self):
+        """Drop whatever is queued and end the stream."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class EventBroker:
+    """
+    LISTEN on a dedicated connection and fan events out to the subscribers.
+    The connection is re-opened when it drops; events committed meanwhile
+    are read back from review_events.
+    """
+
+    def __init__(self, dsn: str, session_factory):
+        self.dsn = dsn
+        self.session_factory = session_factory  # async_sessionmaker
+        self.subscribers = set()
+        self.last_id: Optional[int] = None
+        self.listening = False
+        self.delivered = 0
+        self.dropped = 0
+        self.reconnects = 0
+        self._payloads: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # ID event yang baru di-dispatch, untuk membuang duplikat
+        self._recent = collections.deque(maxlen=10000)
+        self._seen = set()
+
+    def start(self):
+        """Start listening on the running loop (idempotent)."""
+        if self._tasks:
+            return
+        self._payloads = asyncio.Queue()
+        self._tasks = [asyncio.ensure_future(self._listen()), asyncio.ensure_future(self._dispatch())]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for subscriber in list(self.subscribers):
+            subscriber.close()
+
+    def subscribe(self) -> Optional[Subscriber]:
+        """A new subscriber, or None when the process already has ``max_subscribers``."""
+        if len(self.subscribers) >= EVENTS_SETTINGS['max_subscribers']:
+            return None
+        subscriber = Subscriber(EVENTS_SETTINGS['queue_size'])
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+
+    async def replay(self, after_id: int) -> Optional[List[Tuple[int, bytes]]]:
+        """Messages for the events after ``after_id``, or None when the client must reset."""
+        limit = EVENTS_SETTINGS['replay_limit']
+        async with self.session_factory() as dbsession:
+            events, oldest = await dbsession.run_sync(fetch_events, after_id, limit + 1)
+            # Terlalu banyak yang terlewat, atau event setelah after_id sudah dihapus (retention)
+            if len(events) > limit or (oldest is not None and oldest > after_id + 1):
+                return None
+            reviews = await dbsession.run_sync(
+                fetch_reviews, [review_id for _, event_type, review_id in events if event_type != 'deleted'])
+        return build_messages(events, reviews)
+
+    async def _listen(self):
+        import asyncpg  # dependency opsional (extra "asgi")
+
+        channel = EVENTS_SETTINGS['channel']
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _conn: lost.set())
+                # Dicatat sebelum LISTEN: event setelah ini yang terlewat selama putus dikejar dari tabel
+                missed_after = self.last_id
+                await conn.add_listener(channel, self._on_notify)
+                self.listening = True
+                log.info("Listening on %s for live review events", channel)
+                if missed_after is not None:
+                    self._payloads.put_nowait(CatchUp(missed_after))
+
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), PRUNE_INTERVAL)
+                    except asyncio.TimeoutError:
+                        # Sekalian memastikan koneksi LISTEN masih hidup
+                        await conn.execute(PRUNE_SQL, float(EVENTS_SETTINGS['retention']))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("Live review events: LISTEN connection failed: %s", e)
+            finally:
+                self.listening = False
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            self.reconnects += 1
+            await asyncio.sleep(EVENTS_SETTINGS['reconnect_delay'])
+
+    def _on_notify(self, conn, pid, channel, payload):
+        self._payloads.put_nowait(payload)
+
+    def _is_new(self, event_id: int) -> bool:
+        """False for an event already dispatched (NOTIFY and catch-up can overlap)."""
+        if event_id in self._seen:
+            return False
+        if len(self._recent) == self._recent.maxlen:
+            self._seen.discard(self._recent[0])
+        self._recent.append(event_id)
+        self._seen.add(event_id)
+        return True
+
+    async def _dispatch(self):
+        while True:
+            # Semua NOTIFY yang sudah menunggu diproses sekaligus: satu query review per batch
+            payloads = [await self._payloads.get()]
+            while not self._payloads.empty():
+                payloads.append(self._payloads.get_nowait())
+            try:
+                events = []
+                for payload in payloads:
+                    if isinstance(payload, CatchUp):
+                        missed = await self._missed_events(payload.after_id)
+                        if missed is None:
+                            self._broadcast([(None, format_event(None, 'reset', {}))])
+                            continue
+                        events.extend(event for event in missed if self._is_new(event[0]))
+                        continue
+                    event = json.loads(payload)
+                    if self._is_new(event['id']):
+                        events.append((event['id'], event['type'], event['review_id']))
+                if not events:
+                    continue
+                async with self.session_factory() as dbsession:
+                    reviews = await dbsession.run_sync(
+                        fetch_reviews, [review_id for _, event_type, review_id in events if event_type != 'deleted'])
+                self._broadcast(build_messages(events, reviews))
+                self.last_id = max([self.last_id or 0] + [event[0] for event in events])
+            except Exception as e:
+                log.error("❌ Live review events: dispatch failed: %s", e)
+
+    async def _missed_events(self, after_id: int):
+        """Events committed while not listening, or None when too many were missed."""
+        limit = EVENTS_SETTINGS['replay_limit']
+        async with self.session_factory() as dbsession:
+            events, _ = await dbsession.run_sync(fetch_events, after_id, limit + 1)
+        return None if len(events) > limit else [tuple(event) for event in events]
+
+    def _broadcast(self, messages: List[Tuple[Optional[int], bytes]]):
+        sent = 0
+        for subscriber in list(self.subscribers):
+            if subscriber.overflowed:
+                continue
+            for item in messages:
+                if not subscriber.push(item):
+                    self.dropped += 1
+                    break
+                sent += 1
+        self.delivered += sent
+        if sent:
+            metrics.SSE_EVENTS.inc(sent, result='sent')
+
+    def stats(self):
+        return {
+            'listening': self.listening,
+            'subscribers': len(self.subscribers),
+            'last_event_id': self.last_id,
+            'delivered': self.delivered,
+            'dropped_slow_clients': self.dropped,
+            'reconnects': self.reconnects,
+        }
+
+
+def stats():
+    return BROKER.stats() if BROKER is not None else None
@@ -0,0 +1,162 @@
+import csv
+import io
+import json
+from typing import Iterable, Iterator, Optional, Tuple
+
+from sqlalchemy import select
+
+from ..models import Review
+from . import listing
+
+FORMATS = {
+    # format: (content type, ekstensi file)
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+CHUNK_SIZE = 5000
+
+
+def export_query(params):
+    """
+    SELECT for an export: the listing filters and ?fields= projection
+    (see listing.apply_filters / parse_fields), ordered by id.
+    Returns (query, fields); raises ValueError on an invalid parameter.
+    """
+    fields = listing.parse_fields(params.get('fields')) or Review.FIELDS
+    query = select(*[getattr(Review, name) for name in fields]).order_by(Review.id)
+    return listing.apply_filters(query, params), fields
+
+
+def iter_chunks(dbsession, query, chunk_size: int = CHUNK_SIZE) -> Iterator[list]:
+    """Rows in chunks from a server-side cursor; memory stays at one chunk."""
+    result = dbsession.execute(query, execution_options={'yield_per': chunk_size})
+    for rows in result.partitions():
+        yield rows
+
+
+def _value(name, value):
+    if value is not None and name == 'created_at':
+        return value.isoformat()
+    return value
+
+
+def iter_csv(fields: Tuple[str, ...], chunks: Iterable[list]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for rows in chunks:
+        for row in rows:
+            writer.writerow([
+                json.dumps(value, ensure_ascii=False) if name == 'key_points' else _value(name, value)
+                for name, value in zip(fields, row)
+            ])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_ndjson(fields: Tuple[str, ...], chunks: Iterable[list]) -> Iterator[bytes]:
+    for rows in chunks:
+        yield ''.join(
+            json.dumps({name: _value(name, value) for name, value in zip(fields, row)}, ensure_ascii=False) + '\n'
+            for row in rows
+        ).encode('utf-8')
+
+
+class _ParquetSink:
+    """Write-only file object; the Parquet writer's output is drained per chunk."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def parquet_schema(fields: Tuple[str, ...]):
+    import pyarrow as pa
+
+    types = {
+        'id': pa.int64(),
+        'product_name': pa.string(),
+        'review_text': pa.string(),
+        'sentiment': pa.string(),
+        'sentiment_score': pa.float64(),
+        'key_points': pa.list_(pa.string()),
+        'analysis_status': pa.string(),
+        'model_version': pa.string(),
+        'created_at': pa.timestamp('us', tz='UTC'),
+    }
+    return pa.schema([(name, types[name]) for name in fields])
+
+
+def iter_parquet(fields: Tuple[str, ...], chunks: Iterable[list]) -> Iterator[bytes]:
+    """One Parquet row group per chunk; requires pyarrow (extra 'parquet')."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema(fields)
+    sink = _ParquetSink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        for rows in chunks:
+            columns = list(zip(*rows)) if rows else [[] for _ in fields]
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(list(column), type=schema.field(name).type) for name, column in zip(fields, columns)],
+                schema=schema,
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+WRITERS = {
+    'csv': iter_csv,
+    'ndjson': iter_ndjson,
+    'parquet': iter_parquet,
+}
+
+
+def check_format(name: Optional[str]) -> str:
+    name = (name or 'csv').lower()
+    if name not in FORMATS:
+        raise ValueError(f'format must be one of {", ".join(FORMATS)}')
+    if name == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError('parquet export needs pyarrow (pip install -e ".[parquet]")')
+    return name
+
+
+def stream(session_factory, query, fields: Tuple[str, ...], fmt: str,
+           chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Encoded export body, produced chunk by chunk in its own session."""
+    dbsession = session_factory()
+    try:
+        yield from WRITERS[fmt](fields, iter_chunks(dbsession, query, chunk_size))
+    finally:
+        dbsession.close()
@@ -0,0 +1,196 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+import aiohttp
+import yarl
+
+# Default pool / timeout, bisa di-override dari development.ini (prefix "http.")
+HTTP_SETTINGS = {
+    'pool_size': 100,          # total koneksi terbuka
+    'pool_per_host': 20,       # batas koneksi bersamaan per host
+    'keepalive_timeout': 30.0, # detik koneksi idle tetap disimpan
+    'dns_cache_ttl': 300,      # detik hasil DNS di-cache
+    'connect_timeout': 5.0,
+    'read_timeout': 30.0,
+}
+
+_sessions: Dict[int, aiohttp.ClientSession] = {}
+_lock = threading.Lock()
+
+
+def configure(settings):
+    """Read pool and timeout settings (``http.*``) from the app settings."""
+    for key, default in list(HTTP_SETTINGS.items()):
+        value = settings.get(f'http.{key}')
+        if value is not None:
+            HTTP_SETTINGS[key] = type(default)(value)
+
+
+class CallTiming:
+    """
+    Per-call timing, split into:
+    - connect: waiting for a pooled connection, DNS, TCP and TLS setup
+    - wait: sending the request until the response headers arrive
+    - read: reading the response body
+    """
+
+    def __init__(self):
+        self.started = None
+        self.connected = None
+        self.headers_received = None
+        self.reused_connection = False
+        self.connect = 0.0
+        self.wait = 0.0
+        self.read = 0.0
+
+    def finish_read(self):
+        if self.headers_received is not None:
+            self.read = time.perf_counter() - self.headers_received
+        TIMINGS.record(self)
+
+    def as_dict(self):
+        return {
+            'connect': round(self.connect, 4),
+            'wait': round(self.wait, 4),
+            'read': round(self.read, 4),
+            'reused_connection': self.reused_connection,
+        }
+
+
+class TimingStats:
+    """Running totals of call timings, safe to update from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.reused = 0
+            self.totals = {'connect': 0.0, 'wait': 0.0, 'read': 0.0}
+            self.last: Optional[dict] = None
+
+    def record(self, timing: CallTiming):
+        with self._lock:
+            self.calls += 1
+            self.reused += int(timing.reused_connection)
+            for phase in self.totals:
+                self.totals[phase] += getattr(timing, phase)
+            self.last = timing.as_dict()
+
+    def snapshot(self):
+        with self._lock:
+            calls = self.calls or 1
+            return {
+                'calls': self.calls,
+                'reused_connections': self.reused,
+                'avg_seconds': {
+                    phase: round(total / calls, 4) for phase, total in self.totals.items()
+                },
+                'last': self.last,
+            }
+
+
+TIMINGS = TimingStats()
+
+
+# --- aiohttp trace hooks ---
+def _timing(ctx) -> Optional[CallTiming]:
+    timing = ctx.trace_request_ctx
+    return timing if isinstance(timing, CallTiming) else None
+
+
+async def _on_request_start(session, ctx, params):
+    timing = _timing(ctx)
+    if timing:
+        timing.started = time.perf_counter()
+
+
+async def _on_connection_ready(session, ctx, params):
+    timing = _timing(ctx)
+    if timing and timing.started is not None:
+        timing.connected = time.perf_counter()
+        timing.connect = timing.connected - timing.started
+
+
+async def _on_connection_reused(session, ctx, params):
+    timing = _timing(ctx)
+    if timing:
+        timing.reused_connection = True
+    await _on_connection_ready(session, ctx, params)
+
+
+async def _on_request_end(session, ctx, params):
+    timing = _timing(ctx)
+    if timing and timing.connected is not None:
+        timing.headers_received = time.perf_counter()
+        timing.wait = timing.headers_received - timing.connected
+
+
+def _trace_config() -> aiohttp.TraceConfig:
+    trace = aiohttp.TraceConfig(trace_config_ctx_factory=SimpleNamespace)
+    trace.on_request_start.append(_on_request_start)
+    trace.on_connection_create_end.append(_on_connection_ready)
+    trace.on_connection_reuseconn.append(_on_connection_reused)
+    trace.on_request_end.append(_on_request_end)
+    return trace
+
+
+def _build_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_SETTINGS['pool_size'],
+        limit_per_host=HTTP_SETTINGS['pool_per_host'],
+        keepalive_timeout=HTTP_SETTINGS['keepalive_timeout'],
+        ttl_dns_cache=HTTP_SETTINGS['dns_cache_ttl'],
+    )
+    timeout = aiohttp.ClientTimeout(
+        sock_connect=HTTP_SETTINGS['connect_timeout'],
+        sock_read=HTTP_SETTINGS['read_timeout'],
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        trace_configs=[_trace_config()],
+    )
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """
+    Return the pooled session for the running event loop.
+
+    aiohttp sessions are bound to the loop they were created on, so one
+    session is kept per loop (in practice: the shared runtime loop).
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        session = _sessions.get(id(loop))
+        if session is None or session.closed:
+            session = _build_session()
+            _sessions[id(loop)] = session
+        return session
+
+
+async def preconnect(url: str):
+    """
+    Resolve the host of ``url`` and leave an open keep-alive connection to
+    it in the pool, so the first real call skips DNS, TCP and TLS setup.
+    Uses a HEAD request to the origin; its status does not matter.
+    """
+    session = await get_session()
+    origin = yarl.URL(url).origin()
+    async with session.head(origin, allow_redirects=False,
+                            timeout=aiohttp.ClientTimeout(total=HTTP_SETTINGS['connect_timeout'])) as response:
+        await response.read()
+
+
+async def close():
+    """Close the session owned by the running loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        session = _sessions.pop(id(loop), None)
+    if session is not None and not session.closed:
+        await session.close()
@@ -0,0 +1,279 @@
+import datetime
+import random
+from types import SimpleNamespace
+from typing import List, Tuple
+
+from sqlalchemy import Integer, column, insert, select, update, values
+from sqlalchemy.sql import func
+
+from ..models import AnalysisJob, Review
+from . import aggregates, events
+from .ai_services import sys_log
+from .pipeline import analysis_status, analyze_many, model_id
+
+# Default antrian, bisa di-override dari development.ini (prefix "jobs.")
+JOB_SETTINGS = {
+    'workers': 2,              # jumlah worker process
+    'batch_size': 8,           # job yang di-claim sekaligus per putaran
+    'concurrency': 8,          # panggilan AI paralel per batch
+    'poll_interval': 1.0,      # detik tidur kalau antrian kosong
+    'max_attempts': 5,
+    'retry_base_delay': 5.0,   # detik, dikali 2 setiap percobaan
+    'retry_max_delay': 300.0,
+    'lock_timeout': 600.0,     # job 'running' lebih lama dari ini dianggap worker-nya mati
+}
+
+
+def configure(settings):
+    """Read queue settings (``jobs.*``) from the app settings."""
+    for key, default in list(JOB_SETTINGS.items()):
+        value = settings.get(f'jobs.{key}')
+        if value is not None:
+            JOB_SETTINGS[key] = type(default)(value)
+
+
+def enqueue(dbsession, product_name: str, review_text: str) -> AnalysisJob:
+    """Add a job to the queue (inside the caller's transaction)."""
+    job = AnalysisJob(
+        product_name=product_name,
+        review_text=review_text,
+        max_attempts=JOB_SETTINGS['max_attempts'],
+    )
+    dbsession.add(job)
+    dbsession.flush()
+    return job
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter: half the delay fixed, half random."""
+    delay = min(JOB_SETTINGS['retry_max_delay'],
+                JOB_SETTINGS['retry_base_delay'] * (2 ** max(0, attempts - 1)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def claim(dbsession, limit: int) -> List[AnalysisJob]:
+    """
+    Lock up to ``limit`` runnable jobs and mark them running.
+
+    ``FOR UPDATE SKIP LOCKED`` lets many workers poll the same table without
+    blocking each other or taking the same job twice.
+    """
+    jobs = dbsession.scalars(
+        select(AnalysisJob)
+        .where(AnalysisJob.status == 'queued', AnalysisJob.run_after <= func.now())
+        .order_by(AnalysisJob.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+    for job in jobs:
+        job.status = 'running'
+        job.attempts = job.attempts + 1
+        job.locked_at = func.now()
+    dbsession.flush()
+    return jobs
+
+
+def requeue_stale(dbsession) -> int:
+    """
+    Put back jobs whose worker died while running them. A job that has
+    used up its attempts is marked failed instead, so a job that keeps
+    crashing its worker does not loop forever.
+    """
+    cutoff = func.now() - datetime.timedelta(seconds=JOB_SETTINGS['lock_timeout'])
+    stale = (AnalysisJob.status == 'running', AnalysisJob.locked_at < cutoff)
+    dbsession.execute(
+        update(AnalysisJob)
+        .where(*stale, AnalysisJob.attempts >= AnalysisJob.max_attempts)
+        .values(status='failed', locked_at=None, finished_at=func.now(),
+                last_error='Worker lost while running job; no attempts left')
+    )
+    result = dbsession.execute(
+        update(AnalysisJob)
+        .where(*stale)
+        .values(status='queued', locked_at=None, last_error='Worker lost while running job')
+    )
+    return result.rowcount
+
+
+def _fail(dbsession, job_ids: List[int], error: str):
+    jobs = dbsession.scalars(select(AnalysisJob).where(AnalysisJob.id.in_(job_ids))).all()
+    for job in jobs:
+        job.last_error = error[:2000]
+        job.locked_at = None
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            job.finished_at = func.now()
+        else:
+            delay = retry_delay(job.attempts)
+            job.status = 'queued'
+            job.run_after = func.now() + datetime.timedelta(seconds=delay)
+            sys_log("WARN", "JOBS", f"Job {job.id} retry #{job.attempts} in {delay:.1f}s")
+
+
+def _finish(dbsession, job_ids: List[int], review_ids: List[int]):
+    """Mark jobs done with their review: one UPDATE ... FROM (VALUES ...) for the whole batch."""
+    if not job_ids:
+        return
+    finished = values(column('job_id', Integer), column('review_id', Integer), name='finished')\
+        .data(list(zip(job_ids, review_ids)))
+    # synchronize_session=False: objek job di session ini kedaluwarsa saat commit
+    dbsession.execute(
+        update(AnalysisJob)
+        .where(AnalysisJob.id == finished.c.job_id)
+        .values(status='done', review_id=finished.c.review_id, locked_at=None,
+                last_error=None, finished_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _store_pending(dbsession, items: List[Tuple[int, int]], results: List[dict]):
+    """
+    Write results onto existing 'pending' reviews (one executemany UPDATE)
+    and add them to the rollups. Reviews that are no longer pending, e.g.
+    already re-analyzed by the backfill, are left as they are.
+    """
+    rows = dbsession.execute(
+        select(Review.id, Review.product_name, Review.created_at)
+        .where(Review.id.in_([review_id for _, review_id in items]), Review.analysis_status == 'pending')
+        .with_for_update()
+    ).all()
+    pending = {row.id: row for row in rows}
+
+    params, added = [], []
+    for (_, review_id), result in zip(items, results):
+        row = pending.get(review_id)
+        if row is None:
+            continue
+        values = {
+            'sentiment': result['sentiment'],
+            'sentiment_score': result['score'],
+            'key_points': result['key_points'],
+            'analysis_status': analysis_status(result),
+            'model_version': model_id(),
+        }
+        params.append(dict(values, id=review_id))
+        added.append(SimpleNamespace(product_name=row.product_name, created_at=row.created_at, **values))
+
+    if params:
+        dbsession.execute(update(Review), params)
+        aggregates.record_added(dbsession, added)
+        events.publish(dbsession, 'updated', [values['id'] for values in params])
+    _finish(dbsession, [job_id for job_id, _ in items], [review_id for _, review_id in items])
+
+
+def _without(job_ids: List[int], jobs: list, results: List[dict]):
+    """Drop ``job_ids`` from ``jobs`` (tuples starting with the job ID) and their results."""
+    kept = [(job, result) for job, result in zip(jobs, results) if job[0] not in job_ids]
+    return [job for job, _ in kept], [result for _, result in kept]
+
+
+def process_batch(session_factory) -> int:
+    """
+    Claim one batch of jobs, analyze it and store the reviews: new jobs
+    insert a review, jobs for an imported 'pending' review update it.
+    Returns the number of jobs claimed (0 means the queue was empty).
+    """
+    dbsession = session_factory()
+    try:
+        requeue_stale(dbsession)
+        jobs = claim(dbsession, JOB_SETTINGS['batch_size'])
+        claimed = [(job.id, job.review_id, job.product_name, job.review_text) for job in jobs]
+        # Job yang masih punya sisa percobaan: hasil degraded di-retry, bukan disimpan
+        retryable = {job.id for job in jobs if job.attempts < job.max_attempts}
+
+        # Job tanpa teks menunjuk review 'pending'; teksnya dibaca dari reviews
+        texts = {}
+        pending_ids = [review_id for _, review_id, _, review_text in claimed if review_text is None]
+        if pending_ids:
+            texts = {
+                row.id: (row.product_name, row.review_text)
+                for row in dbsession.execute(
+                    select(Review.id, Review.product_name, Review.review_text).where(Review.id.in_(pending_ids))
+                )
+            }
+        missing = [job_id for job_id, review_id, _, review_text in claimed
+                   if review_text is None and review_id not in texts]
+        if missing:
+            # Review sudah dihapus: tidak ada yang perlu dianalisis, jangan di-retry
+            dbsession.execute(
+                update(AnalysisJob)
+                .where(AnalysisJob.id.in_(missing))
+                .values(status='failed', locked_at=None, last_error='Review no longer exists',
+                        finished_at=func.now())
+            )
+        dbsession.commit()
+    finally:
+        dbsession.close()
+
+    if not claimed:
+        return 0
+
+    new_jobs, pending_jobs, items = [], [], []
+    for job_id, review_id, product_name, review_text in claimed:
+        if review_text is not None:
+            new_jobs.append((job_id, product_name, review_text))
+        elif review_id in texts:
+            pending_jobs.append((job_id, review_id))
+    for _, product_name, review_text in new_jobs:
+        items.append((review_text, product_name))
+    for _, review_id in pending_jobs:
+        product_name, review_text = texts[review_id]
+        items.append((review_text, product_name))
+
+    job_ids = [job_id for job_id, _, _ in new_jobs] + [job_id for job_id, _ in pending_jobs]
+    if not job_ids:
+        return len(claimed)
+
+    dbsession = session_factory()
+    try:
+        results = analyze_many(dbsession, items, concurrency=JOB_SETTINGS['concurrency'])
+
+        # analyze_many tidak raise saat provider gagal, tapi mengembalikan hasil
+        # fallback (degraded). Selama masih ada percobaan, job itu di-retry dengan
+        # backoff; di percobaan terakhir hasil degraded disimpan apa adanya
+        # (analysis_status='degraded', bisa dianalisis ulang oleh backfill).
+        retry_ids = [job_id for job_id, result in zip(job_ids, results)
+                     if result['degraded'] and job_id in retryable]
+        if retry_ids:
+            _fail(dbsession, retry_ids, 'Analysis degraded: provider failed or timed out')
+        new_results, pending_results = results[:len(new_jobs)], results[len(new_jobs):]
+        new_jobs, new_results = _without(retry_ids, new_jobs, new_results)
+        pending_jobs, pending_results = _without(retry_ids, pending_jobs, pending_results)
+
+        if new_jobs:
+            rows = [
+                {
+                    'product_name': product_name,
+                    'review_text': review_text,
+                    'sentiment': result['sentiment'],
+                    'sentiment_score': result['score'],
+                    'key_points': result['key_points'],
+                    'analysis_status': analysis_status(result),
+                    'model_version': model_id(),
+                }
+                for (_, product_name, review_text), result in zip(new_jobs, new_results)
+            ]
+            inserted = dbsession.execute(
+                insert(Review).returning(Review.id, *aggregates.ROLLUP_COLUMNS, sort_by_parameter_order=True), rows
+            ).all()
+            aggregates.record_added(dbsession, inserted)
+            events.publish(dbsession, 'created', [row.id for row in inserted])
+            _finish(dbsession, [job_id for job_id, _, _ in new_jobs], [row.id for row in inserted])
+
+        if pending_jobs:
+            _store_pending(dbsession, pending_jobs, pending_results)
+
+        dbsession.commit()
+        finished = [job_id for job_id in job_ids if job_id not in retry_ids]
+        if finished:
+            sys_log("SUCCESS", "JOBS", f"Finished {len(finished)} job(s): {finished}")
+    except Exception as e:
+        dbsession.rollback()
+        sys_log("ERROR", "JOBS", f"Batch {job_ids} failed: {str(e)[:100]}")
+        _fail(dbsession, job_ids, str(e))
+        dbsession.commit()
+    finally:
+        dbsession.close()
+
+    return len(claimed)
@@ -0,0 +1,60 @@
+"""
+Small bundled sentiment lexicon (Indonesian + English) for the offline
+``lexicon`` sentiment backend. Weights are rough polarity strengths.
+"""
+
+POSITIVE = {
+    # Indonesian
+    'bagus': 1.0, 'baik': 0.8, 'mantap': 1.2, 'mantul': 1.2, 'keren': 1.0,
+    'suka': 0.9, 'senang': 0.9, 'puas': 1.1, 'memuaskan': 1.1, 'recommended': 1.0,
+    'rekomendasi': 0.9, 'cepat': 0.6, 'awet': 0.8, 'murah': 0.5, 'worth': 0.9,
+    'sempurna': 1.3, 'hebat': 1.1, 'top': 0.9,
+    'nyaman': 0.9, 'jernih': 0.7, 'lancar': 0.7, 'terbaik': 1.3, 'oke': 0.5,
+    'mulus': 0.7, 'ramah': 0.7, 'rapi': 0.6, 'halus': 0.5, 'kencang': 0.6,
+    'tajam': 0.6, 'enak': 0.9, 'cantik': 0.8, 'elegan': 0.8, 'responsif': 0.7,
+    'original': 0.5, 'asli': 0.4, 'sesuai': 0.6, 'aman': 0.5, 'kuat': 0.6,
+    # English
+    'good': 0.8, 'great': 1.1, 'excellent': 1.3, 'amazing': 1.3, 'awesome': 1.2,
+    'love': 1.2, 'loved': 1.2, 'like': 0.6, 'nice': 0.8, 'perfect': 1.3,
+    'best': 1.2, 'fast': 0.6, 'smooth': 0.7, 'happy': 0.9, 'satisfied': 1.0,
+    'recommend': 1.0, 'reliable': 0.8, 'sturdy': 0.7, 'beautiful': 0.9,
+    'fantastic': 1.3, 'solid': 0.7, 'impressive': 1.0, 'comfortable': 0.8,
+    'crisp': 0.6, 'sharp': 0.5, 'cheap': 0.3, 'affordable': 0.6, 'fine': 0.4,
+}
+
+NEGATIVE = {
+    # Indonesian
+    'buruk': 1.1, 'jelek': 1.1, 'kecewa': 1.2, 'mengecewakan': 1.2, 'rusak': 1.2,
+    'lambat': 0.8, 'lemot': 0.9, 'mahal': 0.6, 'parah': 1.1, 'payah': 1.0,
+    'cacat': 1.1, 'palsu': 1.2, 'panas': 0.6, 'boros': 0.8, 'berisik': 0.7,
+    'retak': 1.0, 'macet': 0.9, 'error': 0.9, 'gagal': 1.0, 'susah': 0.7,
+    'ribet': 0.7, 'kotor': 0.8, 'bau': 0.8, 'lecet': 0.8, 'penyok': 0.9,
+    'nyesel': 1.1, 'menyesal': 1.1, 'zonk': 1.2, 'tipu': 1.3, 'penipu': 1.3,
+    'hang': 0.9, 'mati': 0.8, 'bocor': 1.0, 'lama': 0.4,
+    # English
+    'bad': 1.0, 'terrible': 1.3, 'awful': 1.3, 'worst': 1.4, 'poor': 1.0,
+    'broken': 1.2, 'hate': 1.3, 'disappointed': 1.2, 'disappointing': 1.2,
+    'slow': 0.8, 'expensive': 0.6, 'overpriced': 0.9, 'laggy': 0.9, 'buggy': 1.0,
+    'useless': 1.2, 'cheaply': 0.6, 'defective': 1.2, 'fake': 1.2, 'noisy': 0.7,
+    'waste': 1.1, 'refund': 0.7, 'return': 0.3, 'crash': 1.0, 'crashes': 1.0,
+    'overheat': 0.9, 'overheats': 0.9, 'scratched': 0.8, 'flimsy': 0.9,
+}
+
+NEUTRAL = {
+    'biasa': 1.0, 'lumayan': 0.6, 'standar': 0.8, 'cukup': 0.6, 'sedang': 0.5,
+    'average': 0.9, 'okay': 0.5, 'ok': 0.5, 'decent': 0.5, 'mediocre': 0.8,
+    'normal': 0.7, 'standard': 0.7, 'so-so': 0.9,
+}
+
+# Membalik polaritas kata setelahnya (window 2 token)
+NEGATORS = {
+    'tidak', 'tak', 'gak', 'ga', 'nggak', 'enggak', 'bukan', 'belum', 'jangan', 'kurang',
+    'not', 'no', 'never', "don't", "doesn't", "didn't", "isn't", "wasn't", 'hardly',
+}
+
+# Menguatkan kata setelahnya (atau sebelumnya untuk "banget"/"sekali")
+INTENSIFIERS = {
+    'sangat': 1.5, 'amat': 1.4, 'super': 1.5, 'paling': 1.5, 'terlalu': 1.3,
+    'very': 1.5, 'really': 1.4, 'extremely': 1.7, 'so': 1.3, 'too': 1.3,
+}
+POST_INTENSIFIERS = {'banget': 1.5, 'sekali': 1.4, 'bgt': 1.5}
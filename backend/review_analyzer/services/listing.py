@@ -0,0 +1,295 @@
+import base64
+import datetime
+import json
+import threading
+import time
+from typing import Optional, Tuple
+
+from sqlalchemy import func, literal_column, text, tuple_
+
+from ..models import Review, on_reviews_changed
+
+TOTAL_MODES = ('exact', 'estimate', 'cached', 'none')
+
+# Default listing, bisa di-override dari development.ini (prefix "listing.")
+LISTING_SETTINGS = {
+    'total_mode': 'cached',   # exact | estimate | cached | none
+    'count_cache_ttl': 30.0,  # detik; juga di-invalidate saat insert/delete
+    'max_limit': 200,
+}
+
+
+def configure(settings):
+    """Read listing settings (``listing.*``) from the app settings."""
+    for key, default in list(LISTING_SETTINGS.items()):
+        value = settings.get(f'listing.{key}')
+        if value is not None:
+            LISTING_SETTINGS[key] = type(default)(value)
+    if LISTING_SETTINGS['total_mode'] not in TOTAL_MODES:
+        raise ValueError(f"Unknown listing.total_mode: {LISTING_SETTINGS['total_mode']}")
+
+
+# --- Cursor ---
+def encode_cursor(created_at: datetime.datetime, review_id: int) -> str:
+    """Opaque cursor for the row *after which* the next page starts."""
+    raw = json.dumps([created_at.isoformat(), review_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime.datetime, int]:
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, review_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.datetime.fromisoformat(created_at), int(review_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def after_cursor(query, cursor: str):
+    """Restrict a query ordered by (created_at DESC, id DESC) to rows after the cursor."""
+    created_at, review_id = decode_cursor(cursor)
+    # Syarat created_at terpisah supaya partisi yang lebih baru dari cursor dilewati
+    # (partition pruning tidak bekerja pada perbandingan tuple)
+    return query.filter(Review.created_at <= created_at,
+                        tuple_(Review.created_at, Review.id) < tuple_(created_at, review_id))
+
+
+def next_cursor(rows, limit: int) -> Optional[str]:
+    """Cursor for the next page, or None when this page was the last one."""
+    if len(rows) < limit or not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor(last.created_at, last.id)
+
+
+# --- Filters & projection ---
+SENTIMENTS = ('positive', 'negative', 'neutral')
+ANALYSIS_STATUSES = ('complete', 'degraded', 'pending')
+
+
+def _parse_datetime(value: str, name: str) -> datetime.datetime:
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an ISO date or datetime')
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
+
+def apply_filters(query, params):
+    """
+    Apply the listing filters from request params to a Review query:
+    - product_name: exact product name
+    - sentiment: one or more of positive,negative,neutral (comma separated)
+    - min_score / max_score: sentiment_score range (inclusive)
+    - created_from / created_to: created_at range, ISO date or datetime
+      (from inclusive, to exclusive)
+    - q: full-text search over review_text (websearch syntax)
+    - analysis_status: complete | degraded | pending
+    Raises ValueError on an invalid value.
+    """
+    product_name = params.get('product_name')
+    if product_name:
+        query = query.filter(Review.product_name == product_name.strip())
+
+    sentiment = params.get('sentiment')
+    if sentiment:
+        values = [v.strip().lower() for v in sentiment.split(',') if v.strip()]
+        if any(v not in SENTIMENTS for v in values):
+            raise ValueError(f'sentiment must be one of {", ".join(SENTIMENTS)}')
+        query = query.filter(Review.sentiment.in_(values))
+
+    if params.get('min_score'):
+        query = query.filter(Review.sentiment_score >= float(params['min_score']))
+    if params.get('max_score'):
+        query = query.filter(Review.sentiment_score <= float(params['max_score']))
+
+    if params.get('created_from'):
+        query = query.filter(Review.created_at >= _parse_datetime(params['created_from'], 'created_from'))
+    if params.get('created_to'):
+        query = query.filter(Review.created_at < _parse_datetime(params['created_to'], 'created_to'))
+
+    status = params.get('analysis_status')
+    if status:
+        if status not in ANALYSIS_STATUSES:
+            raise ValueError(f'analysis_status must be one of {", ".join(ANALYSIS_STATUSES)}')
+        query = query.filter(Review.analysis_status == status)
+
+    search = (params.get('q') or '').strip()
+    if search:
+        # Ekspresi sama dengan index GIN ix_reviews_review_text_fts
+        query = query.filter(
+            Review.search_vector().op('@@')(func.websearch_to_tsquery(literal_column("'simple'"), search))
+        )
+
+    return query
+
+
+def has_filters(params) -> bool:
+    return any(params.get(name) for name in (
+        'product_name', 'sentiment', 'min_score', 'max_score', 'created_from', 'created_to', 'q',
+        'analysis_status'))
+
+
+def parse_fields(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse ?fields=a,b,c into a tuple of Review columns (None = all)."""
+    if not value:
+        return None
+    fields = tuple(dict.fromkeys(f.strip() for f in value.split(',') if f.strip()))
+    unknown = [f for f in fields if f not in Review.FIELDS]
+    if unknown:
+        raise ValueError(f'unknown fields: {", ".join(unknown)}')
+    return fields
+
+
+def projected_query(dbsession, fields: Tuple[str, ...]):
+    """
+    Column query for the requested fields, in that order, followed by id and
+    created_at if missing (the cursor needs them). Rows are plain tuples:
+    no ORM instances are built and nothing enters the identity map.
+    """
+    columns = fields + tuple(name for name in ('id', 'created_at') if name not in fields)
+    return dbsession.query(*[getattr(Review, name) for name in columns])
+
+
+def rows_to_dicts(rows, fields: Tuple[str, ...]):
+    """
+    Rows of projected_query -> response dicts. zip() stops at ``fields``, so
+    the trailing cursor columns are dropped; created_at stays a datetime and
+    is written as ISO 8601 by serialization.dumps.
+    """
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def fetch_review(dbsession, review_id: int):
+    """One review as a response dict (same keys as Review.to_dict), or None."""
+    row = projected_query(dbsession, Review.FIELDS).filter(Review.id == review_id).first()
+    return dict(zip(Review.FIELDS, row)) if row is not None else None
+
+
+# --- Page ---
+def page_params(params) -> Tuple[int, int, Optional[str], str]:
+    """Parse limit/offset/cursor/total from request params.
+    Raises ValueError('Invalid pagination parameters') on bad values."""
+    try:
+        limit = min(int(params.get('limit', 50)), LISTING_SETTINGS['max_limit'])
+        offset = int(params.get('offset', 0))
+    except ValueError:
+        raise ValueError('Invalid pagination parameters')
+    cursor = params.get('cursor')
+    total_mode = params.get('total', LISTING_SETTINGS['total_mode'])
+
+    if limit < 1 or offset < 0 or total_mode not in TOTAL_MODES:
+        raise ValueError('Invalid pagination parameters')
+    return limit, offset, cursor, total_mode
+
+
+def fetch_page(dbsession, params, limit: int, offset: int, cursor: Optional[str], total_mode: str):
+    """
+    Load one page of reviews (newest first) with filters, projection and
+    total; returns the GET /api/reviews response body.
+    Raises ValueError on an invalid filter, field or cursor.
+    """
+    fields = parse_fields(params.get('fields')) or Review.FIELDS
+
+    # Get total count (exact / estimate / cached / none)
+    total = total_reviews(dbsession, total_mode, params)
+
+    # Get reviews, newest first (index: ix_reviews_created_at_id).
+    # Query kolom (tanpa ORM object); dengan ?fields= hanya kolom yang diminta.
+    query = apply_filters(projected_query(dbsession, fields), params)\
+        .order_by(Review.created_at.desc(), Review.id.desc())
+
+    if cursor:
+        query = after_cursor(query, cursor)
+    elif offset:
+        query = query.offset(offset)
+
+    reviews = query.limit(limit).all()
+    review_dicts = rows_to_dicts(reviews, fields)
+
+    return {
+        'reviews': review_dicts,
+        'total': total,
+        'total_mode': total_mode,
+        'next_cursor': next_cursor(reviews, limit),
+    }
+
+
+# --- Total ---
+class CachedCount:
+    """Exact row count, cached until it expires or a review is added/removed."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value: Optional[int] = None
+        self._expires_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+
+    def get(self, dbsession) -> int:
+        with self._lock:
+            if self._value is not None and time.monotonic() < self._expires_at:
+                return self._value
+
+        value = dbsession.query(Review).count()
+        with self._lock:
+            self._value = value
+            self._expires_at = time.monotonic() + LISTING_SETTINGS['count_cache_ttl']
+        return value
+
+
+REVIEW_COUNT = CachedCount()
+on_reviews_changed(REVIEW_COUNT.invalidate)
+
+
+# reviews dipartisi per bulan: autovacuum tidak pernah meng-ANALYZE tabel induk,
+# jadi reltuples induk beku. Estimasi = jumlah reltuples partisi (yang sudah di-ANALYZE);
+# tabel tanpa partisi memakai reltuples-nya sendiri. -1 = belum pernah di-ANALYZE.
+ESTIMATED_COUNT_SQL = """
+WITH parts AS (
+    SELECT c.reltuples
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'reviews'::regclass
+)
+SELECT CASE
+    WHEN NOT EXISTS (SELECT 1 FROM parts)
+        THEN (SELECT reltuples FROM pg_class WHERE oid = 'reviews'::regclass)
+    WHEN (SELECT max(reltuples) FROM parts) < 0 THEN -1
+    ELSE (SELECT sum(greatest(reltuples, 0)) FROM parts)
+END::bigint
+"""
+
+
+def estimated_count(dbsession) -> Optional[int]:
+    """Row estimate from planner statistics (reltuples of the partitions); None if unknown."""
+    value = dbsession.execute(text(ESTIMATED_COUNT_SQL)).scalar()
+    if value is None or value < 0:
+        # Tabel belum pernah di-ANALYZE
+        return None
+    return int(value)
+
+
+def total_reviews(dbsession, mode: str, params=None) -> Optional[int]:
+    """
+    Total number of reviews according to ``mode`` (see TOTAL_MODES).
+    With filters the estimate and cache don't apply, so the filtered count
+    is computed exactly (unless mode is 'none').
+    """
+    if mode == 'none':
+        return None
+    if params is not None and has_filters(params):
+        return apply_filters(dbsession.query(Review), params).count()
+    if mode == 'estimate':
+        estimate = estimated_count(dbsession)
+        if estimate is not None:
+            return estimate
+        return REVIEW_COUNT.get(dbsession)
+    if mode == 'cached':
+        return REVIEW_COUNT.get(dbsession)
+    return dbsession.query(Review).count()
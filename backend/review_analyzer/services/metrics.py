@@ -0,0 +1,200 @@
+"""
+In-process metrics in the Prometheus text format (GET /metrics).
+
+Every process keeps its own counters; with several server/worker processes
+each one has to be scraped on its own (or run one process per port).
+"""
+import bisect
+import contextlib
+import threading
+import time
+from typing import Dict, Iterator, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Default metrics, bisa di-override dari development.ini (prefix "metrics.")
+METRICS_SETTINGS = {
+    'enabled': True,
+    # Stage yang diukur (histogram per stage); kosong = hanya request, counter
+    'spans': (),
+}
+
+STAGES = ('huggingface', 'gemini', 'db_flush', 'json_serialize')
+
+# Detik; cukup rapat di bawah 100 ms (flush, serialisasi) dan sampai 30 s (provider)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> Iterator[str]:
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} counter'
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f'{self.name}{_labels(self.labelnames, key)} {value:g}'
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # Per label: [jumlah per bucket (tidak kumulatif) ..., +Inf], sum, count
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            value = self._values.get(key)
+            if value is None:
+                value = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            value[0][index] += 1
+            value[1] += seconds
+            value[2] += 1
+
+    def render(self) -> Iterator[str]:
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} histogram'
+        with self._lock:
+            values = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                bucket_labels = _labels(self.labelnames, key, f'le="{le}"')
+                yield f'{self.name}_bucket{bucket_labels} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.labelnames, key)} {total:.6f}'
+            yield f'{self.name}_count{_labels(self.labelnames, key)} {count}'
+
+
+REQUEST_DURATION = Histogram(
+    'review_analyzer_request_duration_seconds', 'Whole request, by route, method and status.',
+    ('route', 'method', 'status'))
+STAGE_DURATION = Histogram(
+    'review_analyzer_stage_duration_seconds', 'Hot-path stages enabled in metrics.spans.',
+    ('stage',))
+ERRORS = Counter(
+    'review_analyzer_errors_total', 'Errors by source (request = 5xx response).', ('source',))
+FALLBACKS = Counter(
+    'review_analyzer_fallbacks_total', 'Analysis stages that returned their fallback value.', ('stage',))
+CACHE_LOOKUPS = Counter(
+    'review_analyzer_cache_lookups_total', 'Cache lookups by cache layer and result.', ('layer', 'result'))
+
+SSE_EVENTS = Counter(
+    'review_analyzer_sse_events_total',
+    'Live review events (GET /api/reviews/events): sent to a client, or a client dropped as too slow.',
+    ('result',))
+
+REGISTRY = (REQUEST_DURATION, STAGE_DURATION, ERRORS, FALLBACKS, CACHE_LOOKUPS, SSE_EVENTS)
+
+_spans = frozenset()
+
+
+def configure(settings):
+    """Read ``metrics.enabled`` and ``metrics.spans`` (space separated stage names, or "all")."""
+    global _spans
+    enabled = settings.get('metrics.enabled', METRICS_SETTINGS['enabled'])
+    if not isinstance(enabled, bool):
+        enabled = str(enabled).strip().lower() in ('1', 'true', 'yes', 'on')
+    METRICS_SETTINGS['enabled'] = enabled
+
+    spans = settings.get('metrics.spans')
+    if spans is not None:
+        names = tuple(spans.split())
+        if names == ('all',):
+            names = STAGES
+        unknown = set(names) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown metrics.spans: {', '.join(sorted(unknown))}")
+        METRICS_SETTINGS['spans'] = names
+    _spans = frozenset(METRICS_SETTINGS['spans']) if enabled else frozenset()
+
+
+@contextlib.contextmanager
+def span(stage: str):
+    """Time the block into the stage histogram (no-op unless the stage is enabled)."""
+    if stage not in _spans:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.observe(time.perf_counter() - started, stage=stage)
+
+
+def observe_request(route: str, method: str, status: int, seconds: float):
+    if not METRICS_SETTINGS['enabled']:
+        return
+    REQUEST_DURATION.observe(seconds, route=route, method=method, status=status)
+    if status >= 500:
+        ERRORS.inc(source='request')
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def tween_factory(handler, registry):
+    """Pyramid tween: request duration by matched route."""
+    def metrics_tween(request):
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = handler(request)
+            status = response.status_code
+            return response
+        finally:
+            matched = getattr(request, 'matched_route', None)
+            route = matched.name if matched is not None else 'unmatched'
+            observe_request(route, request.method, status, time.perf_counter() - started)
+    return metrics_tween
+
+
+# --- DB flush span: dicatat lewat event Session, berlaku untuk semua session ---
+_FLUSH_STARTED = '_metrics_flush_started'
+
+
+@event.listens_for(Session, 'before_flush')
+def _flush_started(session, flush_context, instances):
+    if 'db_flush' in _spans:
+        session.info[_FLUSH_STARTED] = time.perf_counter()
+
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _flush_finished(session, flush_context):
+    started = session.info.pop(_FLUSH_STARTED, None)
+    if started is not None:
+        STAGE_DURATION.observe(time.perf_counter() - started, stage='db_flush')
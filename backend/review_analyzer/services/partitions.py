@@ -0,0 +1,188 @@
+"""
+Monthly range partitions of ``reviews`` on created_at (UTC months), see
+migration d1f4b7a2c9e6. Used by the review_analyzer_partitions command:
+
+- ensure_partitions: create partitions ahead of time and move rows out of
+  the DEFAULT partition into partitions of their own month.
+- archive_partition: write an old partition to a gzip'd CSV file, take its
+  reviews out of the rollups, then detach and drop it.
+"""
+import datetime
+import gzip
+import os
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import text
+
+from . import aggregates
+
+# Default partisi, bisa di-override dari development.ini (prefix "partitions.")
+PARTITION_SETTINGS = {
+    'premake': 3,            # bulan ke depan yang partisinya sudah dibuat
+    'retention_months': 0,   # partisi lebih tua dari ini diarsip & di-drop; 0 = simpan selamanya
+    'archive_dir': 'archive',
+}
+
+DEFAULT_PARTITION = 'reviews_default'
+
+# Partisi reviews beserta batasnya (kosong untuk DEFAULT)
+PARTITIONS_SQL = """
+SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = 'reviews'::regclass
+ORDER BY c.relname
+"""
+BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+class Partition(NamedTuple):
+    name: str
+    lower: Optional[datetime.datetime]  # None: DEFAULT
+    upper: Optional[datetime.datetime]
+
+
+def configure(settings):
+    """Read partition settings (``partitions.*``) from the app settings."""
+    for key, default in list(PARTITION_SETTINGS.items()):
+        value = settings.get(f'partitions.{key}')
+        if value is not None:
+            PARTITION_SETTINGS[key] = type(default)(value)
+
+
+def month_start(value: datetime.datetime) -> datetime.datetime:
+    value = value.astimezone(datetime.timezone.utc)
+    return datetime.datetime(value.year, value.month, 1, tzinfo=datetime.timezone.utc)
+
+
+def add_months(month: datetime.datetime, months: int) -> datetime.datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime.datetime) -> str:
+    return f'reviews_p{month:%Y_%m}'
+
+
+def list_partitions(dbsession) -> List[Partition]:
+    """Attached partitions of reviews, oldest first, DEFAULT last."""
+    # Batas partisi ditampilkan dalam TimeZone session
+    dbsession.execute(text("SET LOCAL TimeZone = 'UTC'"))
+    partitions, default = [], None
+    for name, bound in dbsession.execute(text(PARTITIONS_SQL)):
+        match = BOUND.search(bound)
+        if match is None:
+            default = Partition(name, None, None)
+            continue
+        lower, upper = (datetime.datetime.fromisoformat(v) for v in match.groups())
+        partitions.append(Partition(name, lower, upper))
+    partitions.sort(key=lambda p: p.lower)
+    return partitions + ([default] if default else [])
+
+
+def create_partition(dbsession, month: datetime.datetime, move_from_default: bool = False) -> Partition:
+    """
+    Create the partition for ``month``. With ``move_from_default``, rows of
+    that month sitting in the DEFAULT partition (e.g. imported history) are
+    moved into it; PostgreSQL refuses to create the partition otherwise.
+    """
+    name = partition_name(month)
+    lower, upper = month, add_months(month, 1)
+    bounds = {'lower': lower, 'upper': upper}
+
+    if not move_from_default:
+        dbsession.execute(text(
+            f'CREATE TABLE {name} PARTITION OF reviews FOR VALUES FROM (:lower) TO (:upper)'
+        ).bindparams(**bounds))
+        return Partition(name, lower, upper)
+
+    # Tabel biasa dulu, isi dari DEFAULT, baru ATTACH (ATTACH memeriksa isi DEFAULT)
+    dbsession.execute(text(f'LOCK TABLE {DEFAULT_PARTITION} IN ACCESS EXCLUSIVE MODE'))
+    dbsession.execute(text(
+        f'CREATE TABLE {name} (LIKE reviews INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    dbsession.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :lower AND created_at < :upper
+            RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """), bounds)
+    dbsession.execute(text(
+        f'ALTER TABLE {name} ADD CONSTRAINT {name}_bounds CHECK (created_at >= :lower AND created_at < :upper)'
+    ).bindparams(**bounds))
+    dbsession.execute(text(
+        f'ALTER TABLE reviews ATTACH PARTITION {name} FOR VALUES FROM (:lower) TO (:upper)'
+    ).bindparams(**bounds))
+    # CHECK hanya untuk mempercepat ATTACH (tidak perlu scan); batas partisi sudah cukup
+    dbsession.execute(text(f'ALTER TABLE {name} DROP CONSTRAINT {name}_bounds'))
+    return Partition(name, lower, upper)
+
+
+def ensure_partitions(dbsession, now: Optional[datetime.datetime] = None) -> List[Partition]:
+    """
+    Create missing partitions from the current month through ``premake``
+    months ahead, plus one for every month that has rows in DEFAULT.
+    Returns the partitions created (inside the caller's transaction).
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    partitions = list_partitions(dbsession)
+    existing = {p.lower for p in partitions if p.lower is not None}
+    has_default = any(p.name == DEFAULT_PARTITION for p in partitions)
+
+    wanted = {add_months(month_start(now), i) for i in range(PARTITION_SETTINGS['premake'] + 1)}
+    in_default = set()
+    if has_default:
+        months = dbsession.execute(text(
+            f"SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC') FROM {DEFAULT_PARTITION}"
+        )).scalars()
+        in_default = {month.replace(tzinfo=datetime.timezone.utc) for month in months}
+        wanted.update(in_default)
+
+    return [create_partition(dbsession, month, month in in_default) for month in sorted(wanted - existing)]
+
+
+def expired_partitions(dbsession, now: Optional[datetime.datetime] = None) -> List[Partition]:
+    """Partitions entirely older than ``retention_months`` (none when retention is 0)."""
+    months = PARTITION_SETTINGS['retention_months']
+    if months <= 0:
+        return []
+    cutoff = add_months(month_start(now or datetime.datetime.now(datetime.timezone.utc)), -months)
+    return [p for p in list_partitions(dbsession) if p.upper is not None and p.upper <= cutoff]
+
+
+def archive_partition(dbsession, partition: Partition, archive_dir: str) -> Tuple[str, int]:
+    """
+    Write ``partition`` to <archive_dir>/<name>.csv.gz (CSV with header),
+    take its reviews out of the rollups, then detach and drop it, all in
+    the caller's transaction. Returns the file path and row count.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f'{partition.name}.csv.gz')
+    partial = path + '.partial'
+
+    # Tidak ada yang boleh menulis ke partisi selama diarsip
+    dbsession.execute(text(f'LOCK TABLE {partition.name} IN SHARE MODE'))
+    expected = dbsession.execute(text(f'SELECT count(*) FROM {partition.name}')).scalar()
+
+    # COPY lewat koneksi DBAPI (psycopg2) dari transaksi yang sama
+    cursor = dbsession.connection().connection.dbapi_connection.cursor()
+    try:
+        with gzip.open(partial, 'wb') as f:
+            cursor.copy_expert(
+                f'COPY (SELECT * FROM {partition.name} ORDER BY created_at, id) '
+                f'TO STDOUT WITH (FORMAT csv, HEADER)', f)
+        written = cursor.rowcount
+    finally:
+        cursor.close()
+    if written != expected:
+        os.remove(partial)
+        raise RuntimeError(f'{partition.name}: archived {written} of {expected} rows')
+    with open(partial, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(partial, path)
+
+    aggregates.remove_table(dbsession, partition.name, partition.lower, partition.upper)
+    dbsession.execute(text(f'ALTER TABLE reviews DETACH PARTITION {partition.name}'))
+    dbsession.execute(text(f'DROP TABLE {partition.name}'))
+    return path, expected
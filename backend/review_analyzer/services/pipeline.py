@@ -0,0 +1,278 @@
+import asyncio
+import threading
+from typing import Dict, List, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+
+from ..models import AnalysisCache
+from . import ai_services, metrics
+from .ai_services import (
+    KEY_POINTS_FALLBACK,
+    SENTIMENT_FALLBACK,
+    analyze_sentiment,
+    extract_key_points,
+    is_fallback,
+    sys_log,
+)
+from .cache import ANALYSIS_CACHE, CACHE_SETTINGS, make_key
+from .runtime import run_async, run_sync
+
+# Default timeout (detik) per tahap, bisa di-override dari development.ini
+TIMEOUTS = {
+    'sentiment': 15.0,
+    'key_points': 30.0,
+}
+
+
+class PersistentCacheStats:
+    """Counters for the database cache layer (the LRU keeps its own)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def snapshot(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'writes': self.writes}
+
+
+PERSISTENT_CACHE_STATS = PersistentCacheStats()
+
+
+def configure(settings):
+    """Read per-stage timeouts from the app settings."""
+    TIMEOUTS['sentiment'] = float(
+        settings.get('analysis.sentiment_timeout', TIMEOUTS['sentiment']))
+    TIMEOUTS['key_points'] = float(
+        settings.get('analysis.key_points_timeout', TIMEOUTS['key_points']))
+
+
+def model_id() -> str:
+    """Identifies the models (and key-point prompt) behind a result; part of
+    every cache key and stored as Review.model_version."""
+    sentiment_model = ai_services.get_sentiment_backend().model_id
+    return f"{sentiment_model}+{ai_services.GEMINI_MODEL_ID}:{ai_services.KEY_POINTS_PROMPT_VERSION}"
+
+
+def cache_stats() -> Dict[str, dict]:
+    return {
+        'memory': ANALYSIS_CACHE.stats(),
+        'database': PERSISTENT_CACHE_STATS.snapshot(),
+    }
+
+
+async def _with_timeout(stage: str, coro, fallback):
+    try:
+        return await asyncio.wait_for(coro, timeout=TIMEOUTS[stage]), False
+    except asyncio.TimeoutError:
+        sys_log("WARN", "PIPELINE", f"Stage '{stage}' timed out after {TIMEOUTS[stage]}s")
+        return fallback, True
+
+
+async def run_analysis(review_text: str, product_name: str) -> Dict[str, any]:
+    """
+    Run sentiment analysis and key-point extraction concurrently.
+
+    Each stage has its own timeout; a stage that does not finish in time is
+    replaced by its fallback value and listed in ``timed_out``. ``degraded``
+    is set whenever any stage returned a fallback instead of a real result.
+    """
+    (sentiment, sentiment_timed_out), (key_points, key_points_timed_out) = await asyncio.gather(
+        _with_timeout('sentiment', analyze_sentiment(review_text), SENTIMENT_FALLBACK),
+        _with_timeout('key_points', extract_key_points(review_text, product_name), KEY_POINTS_FALLBACK),
+    )
+
+    timed_out: List[str] = []
+    if sentiment_timed_out:
+        timed_out.append('sentiment')
+    if key_points_timed_out:
+        timed_out.append('key_points')
+
+    # Provider sendiri yang menandai fallback; hasil asli neutral/0.5 bukan degraded
+    sentiment_fallback = sentiment_timed_out or is_fallback(sentiment)
+    key_points_fallback = key_points_timed_out or is_fallback(key_points)
+    if sentiment_fallback:
+        metrics.FALLBACKS.inc(stage='sentiment')
+    if key_points_fallback:
+        metrics.FALLBACKS.inc(stage='key_points')
+    degraded = sentiment_fallback or key_points_fallback
+
+    return {
+        'sentiment': sentiment['sentiment'],
+        'score': sentiment['score'],
+        'key_points': list(key_points),
+        'timed_out': timed_out,
+        'degraded': degraded,
+    }
+
+
+def analysis_status(result: Dict[str, any]) -> str:
+    """Review.analysis_status for a result: 'degraded' when any stage fell
+    back instead of returning a real result."""
+    return 'degraded' if result.get('degraded') else 'complete'
+
+
+async def run_many(items: List[Tuple[str, str]], concurrency: int) -> List[Dict[str, any]]:
+    """Run ``run_analysis`` for many (review_text, product_name) pairs, at most
+    ``concurrency`` at a time. Results keep the input order."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(review_text, product_name):
+        async with semaphore:
+            return await run_analysis(review_text, product_name)
+
+    return await asyncio.gather(*[_one(text, product) for text, product in items])
+
+
+def _lookup_cache(dbsession, keys: List[str]) -> Dict[str, dict]:
+    found = {}
+    missing = []
+    for key in keys:
+        cached = ANALYSIS_CACHE.get(key)
+        if cached is not None:
+            found[key] = dict(cached, cached='memory')
+        else:
+            missing.append(key)
+    metrics.CACHE_LOOKUPS.inc(len(found), layer='memory', result='hit')
+    metrics.CACHE_LOOKUPS.inc(len(missing), layer='memory', result='miss')
+
+    if missing and CACHE_SETTINGS['persistent']:
+        entries = dbsession.query(AnalysisCache)\
+            .filter(AnalysisCache.cache_key.in_(missing))\
+            .all()
+        for entry in entries:
+            result = entry.to_result()
+            ANALYSIS_CACHE.set(entry.cache_key, result)
+            found[entry.cache_key] = dict(result, cached='database')
+        PERSISTENT_CACHE_STATS.incr('hits', len(entries))
+        PERSISTENT_CACHE_STATS.incr('misses', len(missing) - len(entries))
+        metrics.CACHE_LOOKUPS.inc(len(entries), layer='database', result='hit')
+        metrics.CACHE_LOOKUPS.inc(len(missing) - len(entries), layer='database', result='miss')
+
+    return found
+
+
+def _store_cache(dbsession, entries: List[Tuple[str, str, dict]]):
+    rows = []
+    for key, product_name, result in entries:
+        ANALYSIS_CACHE.set(key, {
+            'sentiment': result['sentiment'],
+            'score': result['score'],
+            'key_points': result['key_points'],
+        })
+        rows.append({
+            'cache_key': key,
+            'product_name': product_name,
+            'model_id': model_id(),
+            'sentiment': result['sentiment'],
+            'sentiment_score': result['score'],
+            'key_points': result['key_points'],
+        })
+
+    if rows and CACHE_SETTINGS['persistent']:
+        # ON CONFLICT DO NOTHING: request lain bisa saja menyimpan key yang sama
+        dbsession.execute(
+            insert(AnalysisCache).on_conflict_do_nothing(index_elements=['cache_key']),
+            rows
+        )
+        PERSISTENT_CACHE_STATS.incr('writes', len(rows))
+
+
+def _pending(keys: List[str], items: List[Tuple[str, str]], found: Dict[str, dict]) -> Dict[str, Tuple[str, str]]:
+    # Yang belum ada di cache dianalisis sekali per key
+    pending = {}
+    for key, item in zip(keys, items):
+        if key not in found and key not in pending:
+            pending[key] = item
+    return pending
+
+
+def _merge_fresh(found: Dict[str, dict], pending: Dict[str, Tuple[str, str]], fresh) -> List[Tuple[str, str, dict]]:
+    """Add fresh provider results to ``found``; returns the entries worth caching."""
+    to_store = []
+    for (key, (review_text, product_name)), result in zip(pending.items(), fresh):
+        found[key] = dict(result, cached=None)
+        if not result['degraded']:
+            to_store.append((key, product_name, result))
+    return to_store
+
+
+def _results(keys: List[str], found: Dict[str, dict]) -> List[Dict[str, any]]:
+    results = []
+    for key in keys:
+        result = dict(found[key])
+        result.setdefault('timed_out', [])
+        result.setdefault('degraded', False)
+        results.append(result)
+    return results
+
+
+def analyze_many(dbsession, items: List[Tuple[str, str]], concurrency: int = 8) -> List[Dict[str, any]]:
+    """
+    Analyze many (review_text, product_name) pairs, going through the cache.
+
+    Lookup order: in-process LRU, then the ``analysis_cache`` table (one
+    query for all keys), then the AI providers for the remaining misses, run
+    with bounded concurrency. A cache hit skips both providers; duplicates
+    within ``items`` are analyzed once. Degraded results are never cached.
+    ``cached`` in each result tells where it came from (or None).
+    """
+    if not CACHE_SETTINGS['enabled']:
+        results = run_sync(run_many(items, concurrency))
+        return [dict(result, cached=None) for result in results]
+
+    keys = [make_key(product_name, review_text, model_id()) for review_text, product_name in items]
+    found = _lookup_cache(dbsession, keys)
+
+    pending = _pending(keys, items, found)
+    if pending:
+        fresh = run_sync(run_many(list(pending.values()), concurrency))
+        _store_cache(dbsession, _merge_fresh(found, pending, fresh))
+
+    return _results(keys, found)
+
+
+def analyze(dbsession, review_text: str, product_name: str) -> Dict[str, any]:
+    """Analyze a single review through the cache; see ``analyze_many``."""
+    return analyze_many(dbsession, [(review_text, product_name)], concurrency=1)[0]
+
+
+async def analyze_many_async(session_factory, items: List[Tuple[str, str]], concurrency: int = 8) -> List[Dict[str, any]]:
+    """
+    Async counterpart of ``analyze_many`` for the ASGI path.
+
+    ``session_factory`` makes ``AsyncSession`` objects. No database
+    connection is held while the providers run: the cache lookup and the
+    cache write each use their own short transaction.
+    """
+    if not CACHE_SETTINGS['enabled']:
+        results = await run_async(run_many(items, concurrency))
+        return [dict(result, cached=None) for result in results]
+
+    keys = [make_key(product_name, review_text, model_id()) for review_text, product_name in items]
+    async with session_factory() as dbsession:
+        found = await dbsession.run_sync(_lookup_cache, keys)
+
+    pending = _pending(keys, items, found)
+    if pending:
+        fresh = await run_async(run_many(list(pending.values()), concurrency))
+        to_store = _merge_fresh(found, pending, fresh)
+        if to_store and CACHE_SETTINGS['persistent']:
+            async with session_factory() as dbsession, dbsession.begin():
+                await dbsession.run_sync(_store_cache, to_store)
+        else:
+            # Tanpa cache di database cukup isi LRU, tidak perlu koneksi
+            _store_cache(None, to_store)
+
+    return _results(keys, found)
+
+
+async def analyze_async(session_factory, review_text: str, product_name: str) -> Dict[str, any]:
+    """Analyze a single review through the cache; see ``analyze_many_async``."""
+    return (await analyze_many_async(session_factory, [(review_text, product_name)], concurrency=1))[0]
@@ -0,0 +1,268 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import aiohttp
+
+# Default per provider, bisa di-override dari development.ini
+# (prefix "resilience.<provider>.", mis. resilience.gemini.rate = 5)
+DEFAULTS = {
+    'rate': 10.0,              # request per detik (token bucket)
+    'burst': 20,               # kapasitas bucket
+    'min_rate': 0.5,           # batas bawah saat rate diturunkan karena 429
+    'max_retries': 3,
+    'retry_base_delay': 0.5,   # detik, dikali 2 setiap percobaan
+    'retry_max_delay': 10.0,   # retry yang harus menunggu lebih lama dari ini tidak dicoba
+    'failure_threshold': 5,    # kegagalan beruntun sebelum circuit dibuka
+    'reset_timeout': 30.0,     # detik circuit terbuka sebelum satu request percobaan
+}
+
+PROVIDER_NAMES = ('huggingface', 'gemini')
+
+
+class ProviderError(Exception):
+    """Error response from an AI provider."""
+
+    def __init__(self, provider: str, message: str, status: Optional[int] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.provider = provider
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        # 429 & 5xx bisa sembuh sendiri; 4xx lain berarti request-nya yang salah
+        return self.status is None or self.status == 429 or self.status >= 500
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while its circuit is open."""
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Retry-After in seconds (only the delta-seconds form is supported)."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter that adapts to throttling: a 429 halves the
+    rate (down to ``min_rate``) and pauses the bucket for Retry-After; each
+    success gives back 5% of the configured rate.
+    """
+
+    def __init__(self, rate: float, burst: int, min_rate: float):
+        self.max_rate = max(0.001, float(rate))
+        self.min_rate = min(self.max_rate, max(0.001, float(min_rate)))
+        self.rate = self.max_rate
+        self.capacity = max(1, int(burst))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _reserve(self) -> float:
+        """Take a token if possible; otherwise return how long to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    async def acquire(self):
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def throttled(self, retry_after: Optional[float] = None):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def succeeded(self):
+        if self.rate < self.max_rate:
+            with self._lock:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class CircuitBreaker:
+    """
+    closed -> open after ``failure_threshold`` consecutive failures; open
+    rejects calls for ``reset_timeout`` seconds, then lets one probe through
+    (half-open). The probe's outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self.state = 'closed'
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpenError, or let the call through; True when the call is the half-open probe."""
+        with self._lock:
+            if self.state == 'closed':
+                return False
+            if self.state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self._probing = False
+            if self.state == 'half_open' and not self._probing:
+                self._probing = True
+                return True
+            raise CircuitOpenError('Circuit open')
+
+    def release_probe(self):
+        """End a probe that finished without an outcome (e.g. cancelled): the next call probes again."""
+        with self._lock:
+            if self.state == 'half_open':
+                self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.opened += 1
+                self.state = 'open'
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+class Provider:
+    """Rate limit, retry and circuit breaker around calls to one provider."""
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        self.name = name
+        self.settings = settings
+        self.bucket = TokenBucket(settings['rate'], settings['burst'], settings['min_rate'])
+        self.breaker = CircuitBreaker(settings['failure_threshold'], settings['reset_timeout'])
+        self._stats_lock = threading.Lock()
+        self._counts = {'calls': 0, 'retries': 0, 'throttled': 0, 'failures': 0, 'rejected': 0}
+
+    def _incr(self, name: str):
+        with self._stats_lock:
+            self._counts[name] += 1
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        delay = min(self.settings['retry_max_delay'],
+                    self.settings['retry_base_delay'] * (2 ** attempt))
+        return random.uniform(0, delay)
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await ``fn()`` under the rate limiter and circuit breaker, retrying
+        retryable failures (429, 5xx, network errors, timeouts). Any other
+        exception counts as a failure and is raised without a retry. Raises
+        the last error, or CircuitOpenError while the provider is considered down.
+        """
+        attempt = 0
+        while True:
+            try:
+                probe = self.breaker.before_call()
+            except CircuitOpenError:
+                self._incr('rejected')
+                raise CircuitOpenError(f'{self.name}: circuit open, provider skipped')
+
+            retry = True
+            try:
+                await self.bucket.acquire()
+                self._incr('calls')
+                result = await fn()
+            except ProviderError as e:
+                if not e.retryable:
+                    # Request yang salah bukan tanda provider down
+                    self.breaker.record_success()
+                    raise
+                error, retry_after = e, e.retry_after
+                if e.status == 429:
+                    self._incr('throttled')
+                    self.bucket.throttled(retry_after)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error, retry_after = e, None
+            except Exception as e:
+                # Error lain (respons tidak valid, error SDK): gagal, tapi tidak di-retry
+                error, retry_after, retry = e, None, False
+            except BaseException:
+                # Dibatalkan (mis. wait_for per tahap habis) di tengah probe: tanpa hasil,
+                # jadi probe dilepas; jangan sampai circuit tertahan half-open selamanya
+                if probe:
+                    self.breaker.release_probe()
+                raise
+            else:
+                self.breaker.record_success()
+                self.bucket.succeeded()
+                return result
+
+            self._incr('failures')
+            self.breaker.record_failure()
+            if not retry:
+                raise error
+            delay = retry_after if retry_after is not None else self.backoff(attempt)
+            if attempt >= self.settings['max_retries'] or delay > self.settings['retry_max_delay']:
+                raise error
+            attempt += 1
+            self._incr('retries')
+            await asyncio.sleep(delay)
+
+    def stats(self):
+        with self._stats_lock:
+            counts = dict(self._counts)
+        counts.update({
+            'circuit': self.breaker.state,
+            'circuit_opened': self.breaker.opened,
+            'rate': round(self.bucket.rate, 3),
+        })
+        return counts
+
+
+PROVIDERS: Dict[str, Provider] = {}
+
+
+def configure(settings):
+    """Create the providers from ``resilience.<provider>.*`` settings."""
+    for name in PROVIDER_NAMES:
+        provider_settings = {}
+        for key, default in DEFAULTS.items():
+            value = settings.get(f'resilience.{name}.{key}')
+            provider_settings[key] = type(default)(value) if value is not None else default
+        PROVIDERS[name] = Provider(name, provider_settings)
+
+
+def get(name: str) -> Provider:
+    if name not in PROVIDERS:
+        PROVIDERS[name] = Provider(name, dict(DEFAULTS))
+    return PROVIDERS[name]
+
+
+def stats():
+    return {name: provider.stats() for name, provider in PROVIDERS.items()}
@@ -0,0 +1,129 @@
+import datetime
+import hashlib
+import threading
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, NamedTuple, Optional
+
+from ..models import on_reviews_changed
+from . import metrics, serialization
+from .cache import LRUCache, _as_bool
+
+# Default cache response GET review, bisa di-override dari development.ini (prefix "response_cache.")
+RESPONSE_CACHE_SETTINGS = {
+    'enabled': True,
+    'max_entries': 2000,
+    # Perubahan dari proses ini langsung meng-invalidate cache; perubahan dari proses
+    # lain (worker, import, worker uvicorn lain) baru terlihat setelah TTL ini
+    'ttl': 5.0,
+}
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: datetime.datetime
+
+
+class ResponseCache:
+    """
+    Serialized JSON responses by key. ``invalidate`` drops everything and
+    bumps the generation, so a response read from the database before a
+    commit is not stored after it (see ``store``).
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.entries = LRUCache(max_entries, ttl)
+        self.generation = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> Optional[CachedResponse]:
+        if not RESPONSE_CACHE_SETTINGS['enabled']:
+            return None
+        entry = self.entries.get(key)
+        metrics.CACHE_LOOKUPS.inc(layer='response', result='miss' if entry is None else 'hit')
+        return entry
+
+    def store(self, key: str, data: Any, generation: int) -> CachedResponse:
+        """Serialize ``data``; cache it unless reviews changed since ``generation``."""
+        with metrics.span('json_serialize'):
+            body = serialization.dumps(data)
+        entry = CachedResponse(
+            body=body,
+            etag=hashlib.blake2b(body, digest_size=16).hexdigest(),
+            last_modified=datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0),
+        )
+        with self._lock:
+            current = generation == self.generation
+        if current and RESPONSE_CACHE_SETTINGS['enabled']:
+            self.entries.set(key, entry)
+        return entry
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+        self.entries.clear()
+
+    def stats(self):
+        stats = self.entries.stats()
+        stats['invalidations'] = self.invalidations
+        return stats
+
+
+RESPONSE_CACHE = ResponseCache(RESPONSE_CACHE_SETTINGS['max_entries'], RESPONSE_CACHE_SETTINGS['ttl'])
+on_reviews_changed(RESPONSE_CACHE.invalidate)
+
+
+def configure(settings):
+    """Read response cache settings (``response_cache.*``) from the app settings."""
+    RESPONSE_CACHE_SETTINGS['enabled'] = _as_bool(
+        settings.get('response_cache.enabled', RESPONSE_CACHE_SETTINGS['enabled']))
+    RESPONSE_CACHE_SETTINGS['max_entries'] = int(
+        settings.get('response_cache.max_entries', RESPONSE_CACHE_SETTINGS['max_entries']))
+    RESPONSE_CACHE_SETTINGS['ttl'] = float(settings.get('response_cache.ttl', RESPONSE_CACHE_SETTINGS['ttl']))
+    RESPONSE_CACHE.entries.resize(RESPONSE_CACHE_SETTINGS['max_entries'], RESPONSE_CACHE_SETTINGS['ttl'])
+
+
+def cache_key(route: str, params) -> str:
+    """Key from the route and its query parameters (order-independent)."""
+    return route + '?' + '&'.join(f'{k}={v}' for k, v in sorted(dict(params).items()))
+
+
+def not_modified(entry: CachedResponse, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    """
+    Conditional GET check. If-None-Match wins over If-Modified-Since
+    (RFC 9110 13.2.2); weak ETags compare equal to strong ones.
+    """
+    if if_none_match:
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag == '*':
+                return True
+            if tag.startswith('W/'):
+                tag = tag[2:]
+            if tag.strip('"') == entry.etag:
+                return True
+        return False
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=datetime.timezone.utc)
+        return entry.last_modified <= since
+    return False
+
+
+def headers(entry: CachedResponse) -> Dict[str, str]:
+    return {
+        'ETag': f'"{entry.etag}"',
+        'Last-Modified': format_datetime(entry.last_modified, usegmt=True),
+        # Browser boleh menyimpan, tapi harus revalidasi (dapat 304) setiap kali
+        'Cache-Control': 'no-cache',
+    }
+
+
+def stats():
+    return RESPONSE_CACHE.stats()
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, List, Optional
+
+# Satu event loop untuk seluruh proses. Loop ini jalan di thread tersendiri,
+# dan thread waitress cukup menitipkan coroutine ke sini (tanpa bikin loop baru
+# di setiap request).
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+# Coroutine function yang dijalankan di loop sebelum loop dimatikan
+_shutdown_hooks: List[Callable[[], Awaitable[Any]]] = []
+
+
+def _run_loop(loop: asyncio.AbstractEventLoop):
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the process-wide event loop, starting it on first use."""
+    global _loop, _thread
+
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(
+                target=_run_loop,
+                args=(_loop,),
+                name='review-analyzer-loop',
+                daemon=True,
+            )
+            _thread.start()
+        return _loop
+
+
+def run_sync(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """
+    Run a coroutine on the shared loop and block the calling thread until it
+    finishes. Must not be called from inside the shared loop itself.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_loop())
+    try:
+        return future.result(timeout)
+    except Exception:
+        future.cancel()
+        raise
+
+
+async def run_async(coro: Awaitable[Any]) -> Any:
+    """
+    Await a coroutine on the shared loop from another event loop (e.g. the
+    ASGI server's) without blocking that loop or holding a thread.
+    """
+    loop = get_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+def add_shutdown_hook(hook: Callable[[], Awaitable[Any]]):
+    """Register a coroutine function to run on the loop during shutdown()."""
+    if hook not in _shutdown_hooks:
+        _shutdown_hooks.append(hook)
+
+
+async def _run_shutdown_hooks():
+    for hook in reversed(_shutdown_hooks):
+        try:
+            await hook()
+        except Exception:
+            pass
+
+    # Task yang masih jalan (batcher, dll.) dibatalkan supaya loop bisa ditutup rapi
+    current = asyncio.current_task()
+    pending = [t for t in asyncio.all_tasks() if t is not current]
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+
+def shutdown():
+    """Run the shutdown hooks, then stop the shared loop and join its thread."""
+    global _loop, _thread
+
+    if _loop is not None and not _loop.is_closed():
+        try:
+            run_sync(_run_shutdown_hooks(), timeout=10)
+        except Exception:
+            pass
+
+    with _lock:
+        loop, thread = _loop, _thread
+        _loop, _thread = None, None
+
+    if loop is None or loop.is_closed():
+        return
+
+    loop.call_soon_threadsafe(loop.stop)
+    if thread is not None:
+        thread.join(timeout=5)
+    loop.close()
@@ -0,0 +1,273 @@
+import asyncio
+import math
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from . import http_client, lexicon, metrics, resilience
+
+# Label urut sesuai output model cardiffnlp/twitter-xlm-roberta-base-sentiment
+LABELS = ['negative', 'neutral', 'positive']
+
+
+def _softmax(logits: List[float]) -> List[float]:
+    top = max(logits)
+    exps = [math.exp(x - top) for x in logits]
+    total = sum(exps)
+    return [x / total for x in exps]
+
+
+def _top_label(labels: List[str], probs: List[float]) -> Dict[str, any]:
+    best = max(range(len(probs)), key=lambda i: probs[i])
+    return {"sentiment": labels[best].lower(), "score": round(float(probs[best]), 4)}
+
+
+class SentimentBackend:
+    """
+    Interface for sentiment engines.
+
+    Every backend returns one ``{"sentiment", "score"}`` dict per input text,
+    with ``sentiment`` in negative/neutral/positive and ``score`` the
+    probability of that label.
+    """
+    name = 'base'
+    model_id = ''
+
+    async def analyze_batch(self, texts: List[str]) -> List[Dict[str, any]]:
+        raise NotImplementedError
+
+    async def analyze(self, text: str) -> Dict[str, any]:
+        return (await self.analyze_batch([text]))[0]
+
+    def load(self):
+        """Load models. Called by ai_services.warm_up() at startup, or lazily."""
+
+    def loaded(self) -> bool:
+        """Whether load() has nothing left to do."""
+        return True
+
+    async def close(self):
+        """Release resources held by the backend."""
+
+
+class HuggingFaceBackend(SentimentBackend):
+    """Remote inference through the HuggingFace router (the original behaviour)."""
+    name = 'huggingface'
+
+    def __init__(self, api_url: str, headers: Dict[str, str], model_id: str):
+        self.api_url = api_url
+        self.headers = headers
+        self.model_id = model_id
+
+    async def analyze_batch(self, texts: List[str]) -> List[Dict[str, any]]:
+        # Rate limit, retry (429/5xx) & circuit breaker per provider
+        with metrics.span('huggingface'):
+            return await resilience.get('huggingface').call(lambda: self._post(texts))
+
+    async def _post(self, texts: List[str]) -> List[Dict[str, any]]:
+        session = await http_client.get_session()
+        # Satu text dikirim sebagai string (format lama), banyak text sebagai list
+        payload = {"inputs": texts[0] if len(texts) == 1 else texts}
+        timing = http_client.CallTiming()
+
+        async with session.post(
+            self.api_url,
+            headers=self.headers,
+            json=payload,
+            trace_request_ctx=timing
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                timing.finish_read()
+                raise resilience.ProviderError(
+                    'huggingface',
+                    f"HF Error {response.status}: {error_text}",
+                    status=response.status,
+                    retry_after=resilience.parse_retry_after(response.headers.get('Retry-After')),
+                )
+
+            result = await response.json()
+            timing.finish_read()
+
+        if not isinstance(result, list) or len(result) == 0:
+            raise Exception("Invalid response format from HF")
+
+        # Satu input -> [[...]] atau [...]; banyak input -> [[...], [...]]
+        if not isinstance(result[0], list):
+            result = [result]
+        if len(result) != len(texts):
+            raise Exception(f"HF returned {len(result)} results for {len(texts)} inputs")
+
+        outputs = []
+        for predictions in result:
+            top_prediction = max(predictions, key=lambda x: x['score'])
+            outputs.append({
+                "sentiment": top_prediction['label'].lower(),
+                "score": round(top_prediction['score'], 4)
+            })
+        return outputs
+
+
+class LexiconBackend(SentimentBackend):
+    """
+    Offline, dependency-free scorer using the bundled lexicon. Meant as a
+    stand-in for development and tests, not as a replacement for the model.
+    """
+    name = 'lexicon'
+    model_id = 'lexicon-v1'
+
+    _TOKEN = re.compile(r"[\w'-]+", re.UNICODE)
+    NEUTRAL_PRIOR = 0.6
+
+    def score(self, text: str) -> Dict[str, any]:
+        tokens = self._TOKEN.findall(text.lower())
+        negative, neutral, positive = 0.0, self.NEUTRAL_PRIOR, 0.0
+        last_scored = -1
+
+        for i, token in enumerate(tokens):
+            weight = lexicon.POSITIVE.get(token, 0.0) - lexicon.NEGATIVE.get(token, 0.0)
+            if token in lexicon.NEUTRAL:
+                neutral += lexicon.NEUTRAL[token]
+            if weight == 0.0:
+                continue
+
+            # Negator/intensifier hanya berlaku sampai kata bernilai berikutnya
+            window = tokens[max(last_scored + 1, i - 2):i]
+            last_scored = i
+            if any(t in lexicon.NEGATORS for t in window):
+                weight = -weight * 0.8
+            for t in window:
+                weight *= lexicon.INTENSIFIERS.get(t, 1.0)
+            if i + 1 < len(tokens):
+                weight *= lexicon.POST_INTENSIFIERS.get(tokens[i + 1], 1.0)
+
+            if weight > 0:
+                positive += weight
+            else:
+                negative -= weight
+
+        return _top_label(LABELS, _softmax([negative, neutral, positive]))
+
+    async def analyze_batch(self, texts: List[str]) -> List[Dict[str, any]]:
+        return [self.score(text) for text in texts]
+
+
+class OnnxBackend(SentimentBackend):
+    """
+    Local CPU inference on a quantized ONNX export of the sentiment model.
+
+    The export is produced offline, e.g.::
+
+        optimum-cli export onnx --model cardiffnlp/twitter-xlm-roberta-base-sentiment onnx/
+        python -c "from onnxruntime.quantization import quantize_dynamic, QuantType; \\
+            quantize_dynamic('onnx/model.onnx', 'onnx/model.int8.onnx', weight_type=QuantType.QInt8)"
+
+    The session is loaded once per worker process. Inference runs on a single
+    dedicated thread (so requests never pile up extra sessions) and ONNX
+    Runtime itself is capped at ``threads`` intra-op threads.
+    """
+    name = 'onnx'
+
+    def __init__(self, model_path: str, tokenizer: str, model_id: str,
+                 threads: int = 2, batch_size: int = 16, max_length: int = 256):
+        self.model_path = model_path
+        self.tokenizer_name = tokenizer
+        self.model_id = model_id
+        self.threads = threads
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self._session = None
+        self._tokenizer = None
+        self._input_names = ()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sentiment-onnx')
+
+    def load(self):
+        with self._lock:
+            if self._session is not None:
+                return
+
+            # Import di sini: onnxruntime & tokenizers adalah dependency opsional
+            import onnxruntime
+            from tokenizers import Tokenizer
+
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = self.threads
+            options.inter_op_num_threads = 1
+            options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+            session = onnxruntime.InferenceSession(
+                self.model_path, sess_options=options, providers=['CPUExecutionProvider'])
+
+            if self.tokenizer_name.endswith('.json'):
+                tokenizer = Tokenizer.from_file(self.tokenizer_name)
+            else:
+                tokenizer = Tokenizer.from_pretrained(self.tokenizer_name)
+            tokenizer.enable_truncation(max_length=self.max_length)
+            tokenizer.enable_padding()
+
+            self._input_names = tuple(i.name for i in session.get_inputs())
+            self._tokenizer = tokenizer
+            self._session = session
+
+    def loaded(self) -> bool:
+        return self._session is not None
+
+    def _infer(self, texts: List[str]) -> List[Dict[str, any]]:
+        import numpy as np
+
+        self.load()
+        outputs = []
+        for start in range(0, len(texts), self.batch_size):
+            encodings = self._tokenizer.encode_batch(texts[start:start + self.batch_size])
+            feeds = {
+                'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+                'attention_mask': np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                'token_type_ids': np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+            feeds = {name: feeds[name] for name in self._input_names if name in feeds}
+            logits = self._session.run(None, feeds)[0]
+            for row in logits:
+                outputs.append(_top_label(LABELS, _softmax([float(x) for x in row])))
+        return outputs
+
+    async def analyze_batch(self, texts: List[str]) -> List[Dict[str, any]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._infer, list(texts))
+
+    async def close(self):
+        self._executor.shutdown(wait=False)
+
+
+_backend: Optional[SentimentBackend] = None
+
+
+def build_backend(settings, hf_api_url: str, hf_headers: Dict[str, str],
+                  hf_model_id: str) -> SentimentBackend:
+    """Create the backend named by ``sentiment.backend`` (default: huggingface)."""
+    name = settings.get('sentiment.backend', 'huggingface').strip().lower()
+
+    if name == 'huggingface':
+        return HuggingFaceBackend(hf_api_url, hf_headers, hf_model_id)
+    if name == 'lexicon':
+        return LexiconBackend()
+    if name == 'onnx':
+        return OnnxBackend(
+            model_path=settings['sentiment.onnx.model_path'],
+            tokenizer=settings.get('sentiment.onnx.tokenizer', hf_model_id),
+            model_id=settings.get('sentiment.onnx.model_id', f'{hf_model_id}:onnx-int8'),
+            threads=int(settings.get('sentiment.onnx.threads', 2)),
+            batch_size=int(settings.get('sentiment.onnx.batch_size', 16)),
+            max_length=int(settings.get('sentiment.onnx.max_length', 256)),
+        )
+    raise ValueError(f"Unknown sentiment.backend: {name}")
+
+
+def set_backend(backend: SentimentBackend):
+    global _backend
+    _backend = backend
+
+
+def get_backend() -> Optional[SentimentBackend]:
+    return _backend
@@ -0,0 +1,67 @@
+import datetime
+import decimal
+import json
+
+try:
+    import orjson
+except ImportError:  # dependency opsional: pip install -e ".[json]"
+    orjson = None
+
+JSON_BACKENDS = ('auto', 'orjson', 'stdlib')
+
+# Default serializer JSON, bisa di-override dari development.ini (prefix "json.")
+JSON_SETTINGS = {
+    'backend': 'auto',  # auto (orjson kalau terpasang) | orjson | stdlib
+}
+
+_use_orjson = orjson is not None
+
+
+def configure(settings):
+    """Read the JSON backend (``json.backend``) from the app settings."""
+    global _use_orjson
+    value = settings.get('json.backend', JSON_SETTINGS['backend']).strip().lower()
+    if value not in JSON_BACKENDS:
+        raise ValueError(f"Unknown json.backend: {value}")
+    if value == 'orjson' and orjson is None:
+        raise ValueError('json.backend = orjson needs the orjson package (pip install -e ".[json]")')
+    JSON_SETTINGS['backend'] = value
+    _use_orjson = orjson is not None and value != 'stdlib'
+
+
+def backend() -> str:
+    """Name of the serializer in use."""
+    return 'orjson' if _use_orjson else 'stdlib'
+
+
+def _default(value):
+    # Tipe yang tidak dikenal json stdlib; orjson menangani datetime sendiri
+    # dengan format yang sama dengan isoformat()
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(data) -> bytes:
+    """Serialize ``data`` to UTF-8 JSON bytes; datetimes become ISO 8601 strings."""
+    if _use_orjson:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=_default).encode('utf-8')
+
+
+def renderer_factory(info):
+    """
+    Pyramid renderer using ``dumps``; registered as ``json`` in includeme,
+    so views returning plain data skip the stdlib encoder too.
+    """
+    def _render(value, system):
+        request = system.get('request')
+        if request is not None:
+            response = request.response
+            if response.content_type == response.default_content_type:
+                response.content_type = 'application/json'
+                response.charset = 'UTF-8'
+        return dumps(value)
+    return _render
@@ -1,8 +1,15 @@
-import asyncio
+import logging
+import time
+
 from pyramid.view import view_config
 from pyramid.response import Response
-from ..models import Review
-from ..services.ai_services import analyze_sentiment, extract_key_points
+from sqlalchemy import delete, text
+from ..models import AnalysisJob, Review, read_with_fallback
+from ..services import (aggregates, ai_services, events, http_client, jobs, listing, metrics, resilience,
+                        response_cache)
+from ..services.pipeline import analysis_status, analyze, cache_stats, model_id
+
+log = logging.getLogger(__name__)
 
 
 def add_cors_headers(request, response):
@@ -17,6 +24,69 @@ def add_cors_headers(request, response):
     return response
 
 
+def cached_json_response(request, entry):
+    """200 with the cached body, or 304 when the client's copy is current."""
+    if response_cache.not_modified(entry, request.headers.get('If-None-Match'),
+                                   request.headers.get('If-Modified-Since')):
+        response = Response(status=304)
+    else:
+        response = Response(body=entry.body, content_type='application/json', charset='UTF-8')
+    response.headers.update(response_cache.headers(entry))
+    return response
+
+
+def validate_review_payload(data):
+    """
+    Validate one analyze request body.
+    Returns (product_name, review_text, error); error is None when valid.
+    """
+    if not isinstance(data, dict) or 'product_name' not in data or 'review_text' not in data:
+        return None, None, 'product_name and review_text are required'
+    
+    if not isinstance(data['product_name'], str) or not isinstance(data['review_text'], str):
+        return None, None, 'product_name and review_text must be strings'
+    
+    product_name = data['product_name'].strip()
+    review_text = data['review_text'].strip()
+    
+    if len(product_name) < 1:
+        return None, None, 'product_name cannot be empty'
+    
+    if len(review_text) < 10:
+        return None, None, 'review_text must be at least 10 characters'
+    
+    return product_name, review_text, None
+
+
+def save_review(dbsession, product_name, review_text, result):
+    """Insert an analyzed review, update the per-product rollups and
+    publish a live 'created' event (all in the caller's transaction)."""
+    review = Review(
+        product_name=product_name,
+        review_text=review_text,
+        sentiment=result['sentiment'],
+        sentiment_score=result['score'],
+        key_points=result['key_points'],
+        analysis_status=analysis_status(result),
+        model_version=model_id()
+    )
+    
+    dbsession.add(review)
+    dbsession.flush()  # Flush to get the ID
+    
+    # Update rollup per produk (transaksi yang sama)
+    aggregates.record_added(dbsession, [review])
+    events.publish(dbsession, 'created', [review.id])
+    return review
+
+
+def wants_async(request):
+    """True if the client asked for job mode."""
+    if request.params.get('mode') == 'async':
+        return True
+    return 'respond-async' in request.headers.get('Prefer', '')
+
+
 @view_config(route_name='home', renderer='json')
 def home(request):
     """Root endpoint."""
@@ -24,9 +94,16 @@ def home(request):
         'message': 'Product Review Analyzer API - Pyramid Backend',
         'version': '1.0.0',
         'endpoints': {
-            'health': 'GET /api/health',
+            'health': 'GET /api/health[?mode=ready]',
+            'stats': 'GET /api/stats',
             'analyze': 'POST /api/analyze-review',
+            'analyze_bulk': 'POST /api/analyze-reviews/bulk',
+            'get_job': 'GET /api/jobs/{id}',
+            'product_stats': 'GET /api/products/stats',
+            'product_detail_stats': 'GET /api/products/stats/{product_name}',
             'get_reviews': 'GET /api/reviews',
+            'export_reviews': 'GET /api/reviews/export?format=csv|ndjson|parquet',
+            'review_events': 'GET /api/reviews/events (Server-Sent Events, ASGI server)',
             'get_review': 'GET /api/reviews/{id}',
             'delete_review': 'DELETE /api/reviews/{id}',
         }
@@ -36,12 +113,59 @@ def home(request):
 
 @view_config(route_name='health', renderer='json')
 def health_check(request):
-    """Health check endpoint."""
+    """
+    Health check endpoint. Without parameters a liveness check (the process
+    answers). With ``?mode=ready`` a readiness check: the database is
+    queried and the providers' state reported; 503 when the database is
+    down or warm-up has not finished, "degraded" when a provider is
+    unusable (analyses then get fallback values).
+    """
+    if request.params.get('mode') != 'ready':
+        return add_cors_headers(request, Response(json_body={'status': 'healthy'}))
+
+    started = time.perf_counter()
+    try:
+        with request.registry['dbengine'].connect() as conn:
+            conn.execute(text('SELECT 1'))
+        database = {'status': 'connected', 'seconds': round(time.perf_counter() - started, 4)}
+    except Exception as e:
+        log.error("❌ Readiness: database check failed: %s", e)
+        database = {'status': 'error', 'error': str(e).splitlines()[0][:200]}
+    replica_set = request.registry.get('replica_set')
+    if replica_set is not None:
+        database.update(replica_set.stats())
+
+    providers = ai_services.readiness()
+    warmup = providers['warmup']
+    if database['status'] != 'connected' or (warmup['enabled'] and not warmup['done']):
+        status = 'unavailable'
+    elif (not providers['gemini']['api_key']
+          or 'open' in (providers['sentiment'].get('circuit'), providers['gemini']['circuit'])
+          or providers['sentiment'].get('api_key') is False
+          or any(step.startswith('failed') for step in warmup['steps'].values())):
+        status = 'degraded'
+    else:
+        status = 'ready'
+
+    response = {'status': status, 'database': database, 'ai_services': providers}
+    return add_cors_headers(request, Response(json_body=response, status=503 if status == 'unavailable' else 200))
+
+
+@view_config(route_name='stats', renderer='json', request_method='GET')
+def stats(request):
+    """Runtime statistics for the AI service layer."""
     response = {
-        'status': 'healthy',
-        'database': 'connected',
-        'ai_services': 'ready'
+        'http': http_client.TIMINGS.snapshot(),
+        'cache': cache_stats(),
+        'sentiment_batcher': ai_services.batcher_stats(),
+        'key_points_batcher': ai_services.key_points_batcher_stats(),
+        'providers': resilience.stats(),
+        'response_cache': response_cache.stats(),
+        'events': events.stats(),
     }
+    replica_set = request.registry.get('replica_set')
+    if replica_set is not None:
+        response['database'] = replica_set.stats()
     return add_cors_headers(request, Response(json_body=response))
 
 
@@ -55,79 +179,99 @@ def analyze_review(request):
         "product_name": "Product name",
         "review_text": "Review content"
     }
+    
+    With ?mode=async (or header "Prefer: respond-async") the review is queued
+    and 202 is returned with a job ID; poll GET /api/jobs/{id} for the result.
     """
     try:
         # Get JSON data from request
         json_data = request.json_body
         
-        # Validate required fields
-        if 'product_name' not in json_data or 'review_text' not in json_data:
-            response = Response(
-                json_body={'error': 'product_name and review_text are required'},
-                status=400
-            )
+        # Validate required fields & lengths
+        product_name, review_text, error = validate_review_payload(json_data)
+        if error:
+            response = Response(json_body={'error': error}, status=400)
             return add_cors_headers(request, response)
         
-        product_name = json_data['product_name'].strip()
-        review_text = json_data['review_text'].strip()
+        dbsession = request.dbsession
         
-        # Validate field lengths
-        if len(product_name) < 1:
+        # Mode async: simpan ke antrian, worker yang mengerjakan analisisnya
+        if wants_async(request):
+            job = jobs.enqueue(dbsession, product_name, review_text)
+            log.info("📥 Review queued as job %s", job.id)
             response = Response(
-                json_body={'error': 'product_name cannot be empty'},
-                status=400
+                json_body={
+                    'job_id': job.id,
+                    'status': job.status or 'queued',
+                    'status_url': request.route_url('get_job', id=job.id),
+                },
+                status=202
             )
+            response.location = request.route_url('get_job', id=job.id)
             return add_cors_headers(request, response)
         
-        if len(review_text) < 10:
-            response = Response(
-                json_body={'error': 'review_text must be at least 10 characters'},
-                status=400
-            )
-            return add_cors_headers(request, response)
+        # Step 1: Cek cache dulu; kalau miss, sentiment + key points jalan bersamaan
+        log.info("🔍 Analyzing review for: %s", product_name)
+        result = analyze(dbsession, review_text, product_name)
+        if result['cached']:
+            log.info("⚡ Cache hit (%s)", result['cached'])
         
-        # Run async AI analysis
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        # Step 2: Save to database (+ rollup per produk)
+        review = save_review(dbsession, product_name, review_text, result)
         
-        # Step 1: Analyze sentiment
-        print(f"🔍 Analyzing sentiment for: {product_name}")
-        sentiment_result = loop.run_until_complete(analyze_sentiment(review_text))
+        log.info("✅ Review saved with ID: %s", review.id)
         
-        # Step 2: Extract key points
-        print(f"📝 Extracting key points...")
-        key_points = loop.run_until_complete(extract_key_points(review_text, product_name))
+        # Return response
+        response_data = review.to_dict()
+        with metrics.span('json_serialize'):
+            response = Response(json_body=response_data, status=201)
+        return add_cors_headers(request, response)
         
-        loop.close()
+    except Exception as e:
+        log.exception("❌ Error analyzing review: %s", e)
         
-        # Step 3: Save to database
+        response = Response(
+            json_body={'error': f'Failed to analyze review: {str(e)}'},
+            status=500
+        )
+        return add_cors_headers(request, response)
+
+
+@view_config(route_name='get_job', renderer='json', request_method='GET')
+def get_job(request):
+    """Get the status of an analysis job, with the review once it is done."""
+    try:
+        job_id = int(request.matchdict['id'])
         dbsession = request.dbsession
         
-        review = Review(
-            product_name=product_name,
-            review_text=review_text,
-            sentiment=sentiment_result['sentiment'],
-            sentiment_score=sentiment_result['score'],
-            key_points=key_points
-        )
+        job = dbsession.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
         
-        dbsession.add(review)
-        dbsession.flush()  # Flush to get the ID
+        if not job:
+            response = Response(
+                json_body={'error': 'Job not found'},
+                status=404
+            )
+            return add_cors_headers(request, response)
         
-        print(f"✅ Review saved with ID: {review.id}")
+        response_data = job.to_dict()
+        response_data['review'] = None
+        if job.review_id is not None:
+            review = dbsession.query(Review).filter(Review.id == job.review_id).first()
+            response_data['review'] = review.to_dict() if review else None
         
-        # Return response
-        response_data = review.to_dict()
-        response = Response(json_body=response_data, status=201)
+        response = Response(json_body=response_data)
         return add_cors_headers(request, response)
         
+    except ValueError:
+        response = Response(
+            json_body={'error': 'Invalid job ID'},
+            status=400
+        )
+        return add_cors_headers(request, response)
     except Exception as e:
-        print(f"❌ Error analyzing review: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        
+        log.error("❌ Error fetching job: %s", e)
         response = Response(
-            json_body={'error': f'Failed to analyze review: {str(e)}'},
+            json_body={'error': f'Failed to fetch job: {str(e)}'},
             status=500
         )
         return add_cors_headers(request, response)
@@ -136,42 +280,53 @@ def analyze_review(request):
 @view_config(route_name='get_reviews', renderer='json', request_method='GET')
 def get_reviews(request):
     """
-    Get all reviews with pagination.
+    Get all reviews, newest first.
     
     Query parameters:
     - limit: Maximum number of reviews to return (default: 50)
-    - offset: Number of reviews to skip (default: 0)
+    - cursor: Opaque cursor from a previous page's next_cursor (keyset pagination)
+    - offset: Number of reviews to skip (default: 0; ignored when cursor is given)
+    - total: exact | estimate | cached | none (default: listing.total_mode)
+    - product_name, sentiment, min_score, max_score, created_from, created_to:
+      filters (see services.listing.apply_filters)
+    - q: full-text search over review_text
+    - fields: comma separated columns to return, e.g. id,product_name,sentiment
+    
+    Responses carry ETag / Last-Modified and are cached in-process until a
+    review changes; If-None-Match / If-Modified-Since get 304 Not Modified.
     """
     try:
         # Get query parameters
-        limit = int(request.params.get('limit', 50))
-        offset = int(request.params.get('offset', 0))
-        
-        dbsession = request.dbsession
-        
-        # Get total count
-        total = dbsession.query(Review).count()
-        
-        # Get reviews with pagination
-        reviews = dbsession.query(Review)\
-            .order_by(Review.created_at.desc())\
-            .limit(limit)\
-            .offset(offset)\
-            .all()
+        try:
+            limit, offset, cursor, total_mode = listing.page_params(request.params)
+        except ValueError as e:
+            response = Response(
+                json_body={'error': str(e)},
+                status=400
+            )
+            return add_cors_headers(request, response)
         
-        # Convert to dict
-        review_dicts = [review.to_dict() for review in reviews]
+        # Halaman yang sama disajikan dari cache sampai ada review yang berubah
+        key = response_cache.cache_key('reviews', request.params)
+        entry = response_cache.RESPONSE_CACHE.lookup(key)
+        if entry is None:
+            generation = response_cache.RESPONSE_CACHE.generation
+            # Dibaca dari read replica kalau ada (primary kalau replica mati / tertinggal)
+            response_data = read_with_fallback(
+                request, listing.fetch_page, request.params, limit, offset, cursor, total_mode
+            )
+            entry = response_cache.RESPONSE_CACHE.store(key, response_data, generation)
         
-        response_data = {
-            'reviews': review_dicts,
-            'total': total
-        }
+        return add_cors_headers(request, cached_json_response(request, entry))
         
-        response = Response(json_body=response_data)
+    except ValueError as e:
+        response = Response(
+            json_body={'error': f'Invalid query parameter: {str(e)}'},
+            status=400
+        )
         return add_cors_headers(request, response)
-        
     except Exception as e:
-        print(f"❌ Error fetching reviews: {str(e)}")
+        log.error("❌ Error fetching reviews: %s", e)
         response = Response(
             json_body={'error': f'Failed to fetch reviews: {str(e)}'},
             status=500
@@ -179,24 +334,42 @@ def get_reviews(request):
         return add_cors_headers(request, response)
 
 
+@view_config(route_name='review_events', renderer='json', request_method='GET')
+def review_events(request):
+    """
+    Live review events are streamed by the ASGI app (review_analyzer.asgi),
+    which holds many idle connections without a thread each. Under the WSGI
+    server the client gets 501; EventSource then stops retrying.
+    """
+    response = Response(
+        json_body={'error': 'Live events need the ASGI server (uvicorn review_analyzer.asgi)'},
+        status=501
+    )
+    return add_cors_headers(request, response)
+
+
 @view_config(route_name='get_review', renderer='json', request_method='GET')
 def get_review(request):
-    """Get a single review by ID."""
+    """Get a single review by ID (cached and conditional, like get_reviews)."""
     try:
         review_id = int(request.matchdict['id'])
-        dbsession = request.dbsession
-        
-        review = dbsession.query(Review).filter(Review.id == review_id).first()
-        
-        if not review:
-            response = Response(
-                json_body={'error': 'Review not found'},
-                status=404
-            )
-            return add_cors_headers(request, response)
         
-        response = Response(json_body=review.to_dict())
-        return add_cors_headers(request, response)
+        key = f'review:{review_id}'
+        entry = response_cache.RESPONSE_CACHE.lookup(key)
+        if entry is None:
+            generation = response_cache.RESPONSE_CACHE.generation
+            review = read_with_fallback(request, listing.fetch_review, review_id)
+            
+            if review is None:
+                response = Response(
+                    json_body={'error': 'Review not found'},
+                    status=404
+                )
+                return add_cors_headers(request, response)
+            
+            entry = response_cache.RESPONSE_CACHE.store(key, review, generation)
+        
+        return add_cors_headers(request, cached_json_response(request, entry))
         
     except ValueError:
         response = Response(
@@ -205,7 +378,7 @@ def get_review(request):
         )
         return add_cors_headers(request, response)
     except Exception as e:
-        print(f"❌ Error fetching review: {str(e)}")
+        log.error("❌ Error fetching review: %s", e)
         response = Response(
             json_body={'error': f'Failed to fetch review: {str(e)}'},
             status=500
@@ -220,16 +393,21 @@ def delete_review(request):
         review_id = int(request.matchdict['id'])
         dbsession = request.dbsession
         
-        review = dbsession.query(Review).filter(Review.id == review_id).first()
+        # DELETE ... RETURNING: hanya request yang benar-benar menghapus
+        # yang mengurangi rollup, walau ada delete bersamaan
+        deleted = dbsession.execute(
+            delete(Review).where(Review.id == review_id).returning(*aggregates.ROLLUP_COLUMNS)
+        ).first()
         
-        if not review:
+        if not deleted:
             response = Response(
                 json_body={'error': 'Review not found'},
                 status=404
             )
             return add_cors_headers(request, response)
         
-        dbsession.delete(review)
+        aggregates.record_removed(dbsession, [deleted])
+        events.publish(dbsession, 'deleted', [review_id])
         
         response_data = {
             'success': True,
@@ -246,7 +424,7 @@ def delete_review(request):
         )
         return add_cors_headers(request, response)
     except Exception as e:
-        print(f"❌ Error deleting review: {str(e)}")
+        log.error("❌ Error deleting review: %s", e)
         response = Response(
             json_body={'error': f'Failed to delete review: {str(e)}'},
             status=500
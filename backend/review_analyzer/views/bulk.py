@@ -0,0 +1,172 @@
+import json
+import logging
+from pyramid.view import view_config
+from pyramid.response import Response
+from sqlalchemy import insert
+from ..models import Review
+from ..services import aggregates, events
+from ..services.pipeline import analysis_status, analyze_many, model_id
+from .api import add_cors_headers, validate_review_payload
+
+log = logging.getLogger(__name__)
+
+
+INVALID_JSON = object()
+
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl', 'application/json-lines')
+
+
+def iter_records(request):
+    """
+    Yield (index, record) from the request body.
+    NDJSON is read line by line from the body stream; a JSON array is
+    parsed as a whole. A line that is not valid JSON yields (index, INVALID_JSON).
+    """
+    if request.content_type in NDJSON_TYPES:
+        index = 0
+        for line in request.body_file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield index, json.loads(line)
+            except ValueError:
+                yield index, INVALID_JSON
+            index += 1
+    else:
+        records = request.json_body
+        if not isinstance(records, list):
+            raise ValueError('Body must be a JSON array or NDJSON')
+        for index, record in enumerate(records):
+            yield index, record
+
+
+def iter_chunks(records, chunk_size):
+    chunk = []
+    for item in records:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _line(data):
+    return (json.dumps(data) + '\n').encode('utf-8')
+
+
+def process_chunk(session_factory, chunk, concurrency):
+    """
+    Validate, analyze and insert one chunk in its own transaction.
+    Returns one output record per input record, in input order.
+    """
+    output = {}
+    valid = []
+    for index, record in chunk:
+        if record is INVALID_JSON:
+            output[index] = {'index': index, 'error': 'Invalid JSON'}
+            continue
+        product_name, review_text, error = validate_review_payload(record)
+        if error:
+            output[index] = {'index': index, 'error': error}
+        else:
+            valid.append((index, product_name, review_text))
+
+    if valid:
+        dbsession = session_factory()
+        try:
+            results = analyze_many(
+                dbsession,
+                [(review_text, product_name) for _, product_name, review_text in valid],
+                concurrency=concurrency
+            )
+            rows = [
+                {
+                    'product_name': product_name,
+                    'review_text': review_text,
+                    'sentiment': result['sentiment'],
+                    'sentiment_score': result['score'],
+                    'key_points': result['key_points'],
+                    'analysis_status': analysis_status(result),
+                    'model_version': model_id(),
+                }
+                for (_, product_name, review_text), result in zip(valid, results)
+            ]
+            # Satu multi-row INSERT per chunk
+            reviews = dbsession.scalars(insert(Review).returning(Review, sort_by_parameter_order=True), rows).all()
+            aggregates.record_added(dbsession, reviews)
+            events.publish(dbsession, 'created', [review.id for review in reviews])
+            # to_dict() sebelum commit: setelah commit objek di-expire dan
+            # tiap review akan di-refresh dengan satu SELECT
+            saved = [review.to_dict() for review in reviews]
+            dbsession.commit()
+            for (index, _, _), review in zip(valid, saved):
+                output[index] = {'index': index, 'review': review}
+        except Exception as e:
+            dbsession.rollback()
+            log.error("❌ Error in bulk chunk: %s", e)
+            for index, _, _ in valid:
+                output[index] = {'index': index, 'error': f'Failed to analyze review: {str(e)}'}
+        finally:
+            dbsession.close()
+
+    return [output[index] for index, _ in chunk]
+
+
+@view_config(route_name='analyze_reviews_bulk', request_method='POST')
+def analyze_reviews_bulk(request):
+    """
+    Analyze many reviews in one request.
+
+    Request body: a JSON array, or NDJSON (Content-Type: application/x-ndjson),
+    of {"product_name": "...", "review_text": "..."} records.
+
+    Response: NDJSON, streamed as each chunk is committed. One line per
+    record ({"index", "review"} or {"index", "error"}), then one
+    {"summary": {...}} line.
+    """
+    settings = request.registry.settings
+    chunk_size = int(settings.get('bulk.chunk_size', 100))
+    concurrency = int(settings.get('bulk.concurrency', 8))
+    session_factory = request.registry['dbsession_factory']
+
+    try:
+        records = iter_records(request)
+        first = next(records, None)
+    except ValueError as e:
+        response = Response(json_body={'error': f'Invalid body: {str(e)}'}, status=400)
+        return add_cors_headers(request, response)
+
+    def generate():
+        summary = {'received': 0, 'saved': 0, 'rejected': 0}
+        if first is None:
+            yield _line({'summary': summary})
+            return
+
+        def all_records():
+            yield first
+            yield from records
+
+        try:
+            for chunk in iter_chunks(all_records(), chunk_size):
+                for item in process_chunk(session_factory, chunk, concurrency):
+                    summary['received'] += 1
+                    summary['saved' if 'review' in item else 'rejected'] += 1
+                    yield _line(item)
+        except Exception as e:
+            log.error("❌ Error in bulk analysis: %s", e)
+            yield _line({'error': f'Bulk analysis aborted: {str(e)}'})
+
+        log.info("✅ Bulk analysis done: %s", summary)
+        yield _line({'summary': summary})
+
+    # Commit dilakukan per chunk di generator (bukan oleh pyramid_tm),
+    # karena body baru dikirim setelah view ini selesai.
+    response = Response(
+        app_iter=generate(),
+        content_type='application/x-ndjson',
+        charset=None,
+        status=200
+    )
+    return add_cors_headers(request, response)
@@ -0,0 +1,49 @@
+import logging
+
+from pyramid.view import view_config
+from pyramid.response import Response
+from ..models import read_session_factory
+from ..services import export
+from .api import add_cors_headers
+
+log = logging.getLogger(__name__)
+
+
+@view_config(route_name='export_reviews', request_method='GET')
+def export_reviews(request):
+    """
+    Stream all matching reviews as one file.
+    
+    Query parameters:
+    - format: csv | ndjson | parquet (default: csv)
+    - fields: comma separated columns (default: all)
+    - product_name, sentiment, min_score, max_score, created_from, created_to,
+      q, analysis_status: same filters as GET /api/reviews
+    
+    Rows are read from a server-side cursor in chunks and written to the
+    body as they arrive, so memory use does not grow with the table.
+    """
+    try:
+        fmt = export.check_format(request.params.get('format'))
+        query, fields = export.export_query(request.params)
+    except ValueError as e:
+        response = Response(
+            json_body={'error': f'Invalid query parameter: {str(e)}'},
+            status=400
+        )
+        return add_cors_headers(request, response)
+    
+    content_type, extension = export.FORMATS[fmt]
+    chunk_size = int(request.registry.settings.get('export.chunk_size', export.CHUNK_SIZE))
+    log.info("📤 Exporting reviews as %s", fmt)
+    
+    # Body dibuat oleh generator dengan session sendiri (bukan request.dbsession),
+    # karena baru dibaca setelah view ini selesai; dari read replica kalau ada
+    response = Response(
+        app_iter=export.stream(read_session_factory(request), query, fields, fmt, chunk_size),
+        content_type=content_type,
+        charset='utf-8' if fmt != 'parquet' else None,
+        status=200
+    )
+    response.content_disposition = f'attachment; filename="reviews.{extension}"'
+    return add_cors_headers(request, response)
@@ -0,0 +1,15 @@
+from pyramid.response import Response
+from pyramid.view import view_config
+
+from ..services import metrics as metrics_service
+
+
+@view_config(route_name='metrics', request_method='GET')
+def metrics(request):
+    """Prometheus text exposition of this process' metrics."""
+    if not metrics_service.METRICS_SETTINGS['enabled']:
+        return Response(json_body={'error': 'Metrics are disabled (metrics.enabled)'}, status=404)
+    response = Response(body=metrics_service.render().encode('utf-8'))
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
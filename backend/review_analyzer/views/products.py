@@ -0,0 +1,138 @@
+import datetime
+import logging
+from pyramid.view import view_config
+from pyramid.response import Response
+from ..models import ProductDailyVolume, ProductKeyPoint, ProductStats, read_with_fallback
+from ..services import listing
+from .api import add_cors_headers
+
+log = logging.getLogger(__name__)
+
+
+def load_products(dbsession, limit, offset):
+    """One page of product_stats rows as dicts, most reviewed first."""
+    # Index: ix_product_stats_review_count
+    products = dbsession.query(ProductStats)\
+        .order_by(ProductStats.review_count.desc(), ProductStats.product_name)\
+        .offset(offset).limit(limit).all()
+    return [product.to_dict() for product in products]
+
+
+def load_product_detail(dbsession, product_name, since, top):
+    """Stats, daily volume since ``since`` and top key points of one product; None if unknown."""
+    stats = dbsession.get(ProductStats, product_name)
+    if not stats:
+        return None
+    
+    volume = dbsession.query(ProductDailyVolume.day, ProductDailyVolume.review_count)\
+        .filter(ProductDailyVolume.product_name == product_name, ProductDailyVolume.day >= since)\
+        .order_by(ProductDailyVolume.day).all()
+    
+    # Index: ix_product_key_points_top
+    key_points = dbsession.query(ProductKeyPoint.key_point, ProductKeyPoint.occurrences)\
+        .filter(ProductKeyPoint.product_name == product_name)\
+        .order_by(ProductKeyPoint.occurrences.desc(), ProductKeyPoint.key_point)\
+        .limit(top).all()
+    
+    response_data = stats.to_dict()
+    response_data['daily_volume'] = [
+        {'day': row.day.isoformat(), 'count': row.review_count} for row in volume
+    ]
+    response_data['top_key_points'] = [
+        {'key_point': row.key_point, 'count': row.occurrences} for row in key_points
+    ]
+    return response_data
+
+
+@view_config(route_name='product_stats', renderer='json', request_method='GET')
+def product_stats(request):
+    """
+    Sentiment aggregates for all products, most reviewed first.
+    Read from the product_stats rollup, never from reviews.
+    
+    Query parameters:
+    - limit: Maximum number of products to return (default: 50)
+    - offset: Number of products to skip (default: 0)
+    """
+    try:
+        limit = min(int(request.params.get('limit', 50)), listing.LISTING_SETTINGS['max_limit'])
+        offset = int(request.params.get('offset', 0))
+        
+        if limit < 1 or offset < 0:
+            response = Response(
+                json_body={'error': 'Invalid pagination parameters'},
+                status=400
+            )
+            return add_cors_headers(request, response)
+        
+        # Dibaca dari read replica kalau ada
+        response_data = {
+            'products': read_with_fallback(request, load_products, limit, offset),
+        }
+        
+        response = Response(json_body=response_data)
+        return add_cors_headers(request, response)
+        
+    except ValueError:
+        response = Response(
+            json_body={'error': 'Invalid pagination parameters'},
+            status=400
+        )
+        return add_cors_headers(request, response)
+    except Exception as e:
+        log.error("❌ Error fetching product stats: %s", e)
+        response = Response(
+            json_body={'error': f'Failed to fetch product stats: {str(e)}'},
+            status=500
+        )
+        return add_cors_headers(request, response)
+
+
+@view_config(route_name='product_detail_stats', renderer='json', request_method='GET')
+def product_detail_stats(request):
+    """
+    Sentiment aggregates for one product: distribution, mean score,
+    daily volume and most frequent key points.
+    
+    Query parameters:
+    - days: Number of days of daily volume to return, up to today (default: 30, max: 366)
+    - top: Number of key points to return (default: 10, max: 100)
+    """
+    try:
+        product_name = request.matchdict['product_name'].strip()
+        days = int(request.params.get('days', 30))
+        top = int(request.params.get('top', 10))
+        
+        if not 1 <= days <= 366 or not 1 <= top <= 100:
+            response = Response(
+                json_body={'error': 'days must be 1-366 and top must be 1-100'},
+                status=400
+            )
+            return add_cors_headers(request, response)
+        
+        since = datetime.datetime.now(datetime.timezone.utc).date() - datetime.timedelta(days=days - 1)
+        response_data = read_with_fallback(request, load_product_detail, product_name, since, top)
+        
+        if response_data is None:
+            response = Response(
+                json_body={'error': 'Product not found'},
+                status=404
+            )
+            return add_cors_headers(request, response)
+        
+        response = Response(json_body=response_data)
+        return add_cors_headers(request, response)
+        
+    except ValueError:
+        response = Response(
+            json_body={'error': 'Invalid query parameter'},
+            status=400
+        )
+        return add_cors_headers(request, response)
+    except Exception as e:
+        log.error("❌ Error fetching product stats: %s", e)
+        response = Response(
+            json_body={'error': f'Failed to fetch product stats: {str(e)}'},
+            status=500
+        )
+        return add_cors_headers(request, response)
@@ -15,7 +15,7 @@ requires = [
     'alembic==1.12.1',
     'python-dotenv==1.0.0',
     'aiohttp==3.9.1',
-    'google-generativeai==0.3.1',
+    'google-generativeai==0.8.3',
     'pyramid-default-cors',
 ]
 
@@ -44,11 +44,35 @@ setup(
     zip_safe=False,
     extras_require={
         'testing': tests_require,
+        'onnx': [
+            'onnxruntime',
+            'tokenizers',
+            'numpy',
+        ],
+        'asgi': [
+            'uvicorn',
+            'asyncpg',
+            'a2wsgi',
+        ],
+        'parquet': [
+            'pyarrow',
+        ],
+        'json': [
+            'orjson',
+        ],
     },
     install_requires=requires,
     entry_points={
         'paste.app_factory': [
             'main = review_analyzer:main',
         ],
+        'console_scripts': [
+            'review_analyzer_worker = review_analyzer.scripts.worker:main',
+            'review_analyzer_rebuild_aggregates = review_analyzer.scripts.rebuild_aggregates:main',
+            'review_analyzer_backfill = review_analyzer.scripts.backfill:main',
+            'review_analyzer_export = review_analyzer.scripts.export:main',
+            'review_analyzer_import = review_analyzer.scripts.import_reviews:main',
+            'review_analyzer_partitions = review_analyzer.scripts.partitions:main',
+        ],
     },
 )
@@ -0,0 +1,136 @@
+import contextlib
+import os
+
+import alembic.command
+import alembic.config
+import pytest
+import webtest
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import close_all_sessions
+
+from review_analyzer import main
+from review_analyzer.models import get_engine, get_session_factory
+from review_analyzer.services import ai_services, pipeline, response_cache
+from review_analyzer.services.cache import CACHE_SETTINGS
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tabel yang dikosongkan sebelum setiap test database (alembic_version tidak)
+TABLES = ('reviews', 'analysis_jobs', 'analysis_cache', 'review_events',
+          'product_stats', 'product_daily_volume', 'product_key_points')
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--database-url', default=os.getenv('TEST_DATABASE_URL'),
+        help='Scratch PostgreSQL database for the db tests (default: $TEST_DATABASE_URL). '
+             'Its public schema is dropped and re-created by alembic.',
+    )
+
+
+@pytest.fixture(scope='session')
+def database_url(request):
+    url = request.config.getoption('--database-url')
+    if not url:
+        pytest.skip('needs a scratch database: set TEST_DATABASE_URL or --database-url')
+    # Skema dihapus total: jangan sampai jalan di database development
+    if 'test' not in (make_url(url).database or ''):
+        pytest.exit(f'Refusing to reset {make_url(url).database!r}: the test database name must contain "test"')
+    return url
+
+
+@contextlib.contextmanager
+def database_url_env(url):
+    """Point DATABASE_URL (which overrides sqlalchemy.url) at ``url`` for a while."""
+    previous = os.environ.get('DATABASE_URL')
+    os.environ['DATABASE_URL'] = url
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop('DATABASE_URL', None)
+        else:
+            os.environ['DATABASE_URL'] = previous
+
+
+@pytest.fixture(scope='session')
+def dbengine(database_url):
+    """Engine on a freshly migrated schema (alembic upgrade head)."""
+    engine = get_engine({'sqlalchemy.url': database_url})
+    with engine.begin() as conn:
+        conn.execute(text('DROP SCHEMA public CASCADE'))
+        conn.execute(text('CREATE SCHEMA public'))
+
+    # alembic/env.py membaca DATABASE_URL
+    with database_url_env(database_url):
+        config = alembic.config.Config(os.path.join(HERE, 'alembic.ini'))
+        config.set_main_option('script_location', os.path.join(HERE, 'alembic'))
+        alembic.command.upgrade(config, 'head')
+
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(dbengine):
+    """Session factory on empty tables."""
+    with dbengine.begin() as conn:
+        conn.execute(text("SET LOCAL lock_timeout = '10s'"))
+        conn.execute(text(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE"))
+    yield get_session_factory(dbengine)
+    # Session yang tertinggal (mis. assert gagal di tengah test) jangan sampai menahan lock
+    close_all_sessions()
+
+
+@pytest.fixture(scope='session')
+def wsgi_app(database_url, dbengine):
+    """The Pyramid app on the test database, without warm-up or real providers."""
+    settings = {
+        'sqlalchemy.url': database_url,
+        'sentiment.backend': 'lexicon',
+        'warmup.enabled': 'false',
+        'logging.queue': 'false',
+    }
+    with database_url_env(database_url):
+        return main({}, **settings)
+
+
+@pytest.fixture
+def testapp(wsgi_app, session_factory):
+    # Tabel baru dikosongkan lewat TRUNCATE: response cache proses ini ikut dikosongkan
+    response_cache.RESPONSE_CACHE.invalidate()
+    return webtest.TestApp(wsgi_app)
+
+
+class FakeProviders:
+    """
+    Stand-ins for the sentiment and key-point providers, patched into the
+    pipeline. ``degraded = True`` makes both return their fallbacks, like
+    an outage or a missing API key.
+    """
+
+    def __init__(self):
+        self.degraded = False
+        self.calls = 0
+
+    async def analyze_sentiment(self, text):
+        self.calls += 1
+        if self.degraded:
+            return ai_services.SentimentFallback(ai_services.SENTIMENT_FALLBACK)
+        return {'sentiment': 'positive', 'score': 0.9}
+
+    async def extract_key_points(self, text, product_name):
+        if self.degraded:
+            return ai_services.KeyPointsFallback(ai_services.MISSING_KEY_FALLBACK)
+        return ['Bagus', 'awet']
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    fake = FakeProviders()
+    # Tanpa cache analisis: setiap analisis benar-benar memanggil provider palsu
+    monkeypatch.setitem(CACHE_SETTINGS, 'enabled', False)
+    monkeypatch.setattr(pipeline, 'analyze_sentiment', fake.analyze_sentiment)
+    monkeypatch.setattr(pipeline, 'extract_key_points', fake.extract_key_points)
+    return fake
@@ -0,0 +1,125 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete, text
+
+from review_analyzer.models import Review
+from review_analyzer.services import aggregates
+from review_analyzer.views.api import save_review
+
+pytestmark = pytest.mark.db
+
+SNAPSHOT_SQL = [
+    "SELECT product_name, review_count, positive_count, negative_count, neutral_count, "
+    "round(score_sum::numeric, 6) FROM product_stats ORDER BY 1",
+    "SELECT product_name, day, review_count FROM product_daily_volume ORDER BY 1, 2",
+    "SELECT product_name, key_point, occurrences FROM product_key_points ORDER BY 1, 2",
+]
+
+
+def snapshot(dbsession):
+    return [dbsession.execute(text(sql)).all() for sql in SNAPSHOT_SQL]
+
+
+def result(sentiment='positive', score=0.9, key_points=('Bagus',), degraded=False):
+    return {'sentiment': sentiment, 'score': score, 'key_points': list(key_points), 'degraded': degraded}
+
+
+def remove(dbsession, review_id):
+    """Same as views.api.delete_review."""
+    deleted = dbsession.execute(
+        delete(Review).where(Review.id == review_id).returning(*aggregates.ROLLUP_COLUMNS)
+    ).first()
+    aggregates.record_removed(dbsession, [deleted])
+
+
+def add_mixed_reviews(dbsession):
+    reviews = [
+        save_review(dbsession, 'Kamera X', 'gambar tajam sekali', result(key_points=['Tajam', ' tajam ', 'Ringan'])),
+        save_review(dbsession, 'Kamera X', 'biasa saja menurut saya', result('neutral', 0.6, [])),
+        save_review(dbsession, 'Headset Y', 'suara jernih dan bass mantap', result(score=0.95, key_points=['Suara jernih'])),
+        save_review(dbsession, 'Headset Y', 'analisis gagal untuk ini',
+                    result('neutral', 0.5, ['Analysis unavailable (Missing API Key)'], degraded=True)),
+    ]
+    # Satu review dari hari lain (created_at harus sudah benar sebelum masuk rollup)
+    older = Review(product_name='Kamera X', review_text='baterai boros banget', sentiment='negative',
+                   sentiment_score=0.8, key_points=['Baterai boros'], analysis_status='complete',
+                   created_at=datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=3))
+    dbsession.add(older)
+    dbsession.flush()
+    aggregates.record_added(dbsession, [older])
+    return reviews + [older]
+
+
+def test_removing_what_was_added_leaves_no_rollups(session_factory):
+    dbsession = session_factory()
+    reviews = add_mixed_reviews(dbsession)
+    dbsession.commit()
+    assert all(snapshot(dbsession))
+
+    for review_id in [review.id for review in reviews]:
+        remove(dbsession, review_id)
+    dbsession.commit()
+
+    assert snapshot(dbsession) == [[], [], []]
+    dbsession.close()
+
+
+def test_incremental_rollups_match_a_full_rebuild(session_factory):
+    dbsession = session_factory()
+    reviews = add_mixed_reviews(dbsession)
+    remove(dbsession, reviews[0].id)
+    save_review(dbsession, 'Kamera X', 'lensa bagus tapi berat', result(key_points=['Ringan', 'Lensa bagus']))
+    dbsession.commit()
+
+    incremental = snapshot(dbsession)
+    aggregates.rebuild(dbsession)
+    assert snapshot(dbsession) == incremental
+    dbsession.rollback()
+    dbsession.close()
+
+
+def test_key_points_count_once_per_review_after_normalizing(session_factory):
+    dbsession = session_factory()
+    save_review(dbsession, 'Kamera X', 'gambar tajam sekali', result(key_points=['Tajam', '  TAJAM ', 'Ringan']))
+    save_review(dbsession, 'Kamera X', 'ringan dibawa kemana', result(key_points=['ringan']))
+    dbsession.commit()
+
+    points = dict(dbsession.execute(text("SELECT key_point, occurrences FROM product_key_points")).all())
+    assert points == {'tajam': 1, 'ringan': 2}
+    dbsession.close()
+
+
+def test_degraded_reviews_only_count_toward_daily_volume(session_factory):
+    dbsession = session_factory()
+    save_review(dbsession, 'Headset Y', 'suara jernih dan bass mantap', result(score=0.9, key_points=['Suara jernih']))
+    degraded = save_review(dbsession, 'Headset Y', 'analisis gagal untuk ini',
+                           result('neutral', 0.5, ['Analysis unavailable (Missing API Key)'], degraded=True))
+    dbsession.commit()
+
+    stats, volume, points = snapshot(dbsession)
+    assert [tuple(row) for row in stats] == [('Headset Y', 1, 1, 0, 0, pytest.approx(Decimal('0.9')))]
+    assert sum(row.review_count for row in volume) == 2
+    assert [row.key_point for row in points] == ['suara jernih']
+
+    # Backfill: hasil degraded diganti hasil baru lewat remove + add
+    remove(dbsession, degraded.id)
+    save_review(dbsession, 'Headset Y', 'analisis gagal untuk ini', result('negative', 0.7, ['Mudah rusak']))
+    dbsession.commit()
+    stats, _, points = snapshot(dbsession)
+    assert [tuple(row)[:5] for row in stats] == [('Headset Y', 2, 1, 1, 0)]
+    assert sorted(row.key_point for row in points) == ['mudah rusak', 'suara jernih']
+    dbsession.close()
+
+
+def test_pending_reviews_are_left_out(session_factory):
+    dbsession = session_factory()
+    pending = Review(product_name='Kamera X', review_text='belum dianalisis', analysis_status='pending')
+    dbsession.add(pending)
+    dbsession.flush()
+    aggregates.record_added(dbsession, [pending])
+    dbsession.commit()
+
+    assert snapshot(dbsession) == [[], [], []]
+    dbsession.close()
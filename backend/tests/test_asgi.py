@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip('a2wsgi')
+pytest.importorskip('asyncpg')
+
+from review_analyzer import asgi  # noqa: E402
+from review_analyzer.services import events  # noqa: E402
+from review_analyzer.services.response_cache import ResponseCache  # noqa: E402
+
+
+class FakeWSGI:
+    """Pyramid stand-in: records the paths that fell through to WSGI."""
+
+    def __init__(self):
+        self.registry = {}
+        self.paths = []
+
+    def __call__(self, environ, start_response):
+        self.paths.append(environ['PATH_INFO'])
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return [b'wsgi']
+
+
+def call(app, method, path, headers=()):
+    """Send one HTTP request through ``app``; returns (status, headers, body)."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'root_path': '', 'query_string': b'', 'headers': list(headers),
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 1234),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = messages[0]
+    body = b''.join(m.get('body', b'') for m in messages[1:])
+    return start['status'], dict(start['headers']), body
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setitem(events.EVENTS_SETTINGS, 'enabled', False)
+
+    async def native(self, scope, receive, send, **kwargs):
+        await asgi.send_json(send, {'handler': 'native', **kwargs})
+
+    # Handler asli butuh database: diganti sebelum route dibuat di __init__
+    for name in ('analyze_review', 'get_reviews', 'get_review'):
+        monkeypatch.setattr(asgi.AsyncApp, name, native)
+    wsgi = FakeWSGI()
+    app = asgi.AsyncApp(wsgi, {'sqlalchemy.url': 'postgresql://review_user@localhost/review_analyzer_test'})
+    app.wsgi_paths = wsgi.paths
+    return app
+
+
+@pytest.mark.parametrize('method, path, expected', [
+    ('GET', '/api/reviews', {'handler': 'native'}),
+    ('GET', '/api/reviews/12', {'handler': 'native', 'id': '12'}),
+    ('POST', '/api/analyze-review', {'handler': 'native'}),
+])
+def test_hot_routes_are_served_natively(app, method, path, expected):
+    status, _, body = call(app, method, path)
+    assert status == 200
+    assert json.loads(body) == expected
+    assert app.wsgi_paths == []
+
+
+@pytest.mark.parametrize('method, path', [
+    ('GET', '/api/reviews/export'),
+    ('GET', '/api/reviews/events'),
+    ('GET', '/api/reviews/abc'),
+    ('GET', '/api/reviews/12/extra'),
+    ('DELETE', '/api/reviews/12'),
+    ('GET', '/api/products/stats'),
+])
+def test_other_routes_fall_through_to_wsgi(app, method, path):
+    status, _, body = call(app, method, path)
+    assert (status, body) == (200, b'wsgi')
+    assert app.wsgi_paths == [path]
+
+
+def test_send_cached_answers_304_to_a_current_etag():
+    entry = ResponseCache(max_entries=1, ttl=60).store('review:1', {'id': 1}, 0)
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'headers': [(b'if-none-match', f'"{entry.etag}"'.encode())]}
+    asyncio.run(asgi.send_cached(send, scope, entry))
+    assert messages[0]['status'] == 304
+    assert messages[1]['body'] == b''
+
+    messages.clear()
+    asyncio.run(asgi.send_cached(send, {'headers': []}, entry))
+    assert messages[0]['status'] == 200
+    assert messages[1]['body'] == entry.body
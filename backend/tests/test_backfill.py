@@ -0,0 +1,113 @@
+import pytest
+from sqlalchemy import delete, text
+
+from review_analyzer.models import Review
+from review_analyzer.scripts import backfill
+from review_analyzer.services import aggregates
+from review_analyzer.services.pipeline import model_id
+from review_analyzer.views.api import save_review
+
+pytestmark = pytest.mark.db
+
+SNAPSHOT_SQL = [
+    'SELECT product_name, review_count, positive_count, negative_count, neutral_count FROM product_stats ORDER BY 1',
+    'SELECT product_name, day, review_count FROM product_daily_volume ORDER BY 1, 2',
+    'SELECT product_name, key_point, occurrences FROM product_key_points ORDER BY 1, 2',
+]
+
+DEGRADED = {'sentiment': 'neutral', 'score': 0.5, 'key_points': ['Gagal melakukan analisis'], 'degraded': True}
+
+
+def snapshot(dbsession):
+    return [dbsession.execute(text(sql)).all() for sql in SNAPSHOT_SQL]
+
+
+def assert_rollups_match_rebuild(session_factory):
+    dbsession = session_factory()
+    incremental = snapshot(dbsession)
+    aggregates.rebuild(dbsession)
+    assert snapshot(dbsession) == incremental
+    dbsession.rollback()
+    dbsession.close()
+
+
+def read_rows(session_factory, scope='outdated'):
+    """The batch as the backfill's cursor sees it."""
+    dbsession = session_factory()
+    rows = dbsession.execute(backfill.select_rows(scope, model_id(), 0)).all()
+    dbsession.close()
+    return rows
+
+
+def test_degraded_reviews_are_reanalyzed(session_factory, providers):
+    dbsession = session_factory()
+    review_id = save_review(dbsession, 'Kamera X', 'baterai awet dan ringan', DEGRADED).id
+    dbsession.commit()
+    dbsession.close()
+
+    assert backfill.reanalyze_batch(session_factory, read_rows(session_factory, 'degraded'), 4) == (1, 0)
+
+    dbsession = session_factory()
+    review = dbsession.get(Review, review_id)
+    assert (review.analysis_status, review.sentiment) == ('complete', 'positive')
+    assert snapshot(dbsession)[0] == [('Kamera X', 1, 1, 0, 0)]
+    dbsession.close()
+    assert_rollups_match_rebuild(session_factory)
+
+
+def test_review_deleted_after_it_was_read_is_skipped(session_factory, providers):
+    dbsession = session_factory()
+    kept = save_review(dbsession, 'Kamera X', 'baterai awet dan ringan', DEGRADED).id
+    deleted = save_review(dbsession, 'Kamera X', 'layar retak setelah seminggu', DEGRADED).id
+    dbsession.commit()
+    rows = read_rows(session_factory)
+
+    removed = dbsession.execute(
+        delete(Review).where(Review.id == deleted).returning(*aggregates.ROLLUP_COLUMNS)).first()
+    aggregates.record_removed(dbsession, [removed])
+    dbsession.commit()
+    dbsession.close()
+
+    assert backfill.reanalyze_batch(session_factory, rows, 4) == (1, 0)
+
+    dbsession = session_factory()
+    assert dbsession.get(Review, kept).analysis_status == 'complete'
+    dbsession.close()
+    assert_rollups_match_rebuild(session_factory)
+
+
+def test_pending_review_finished_after_it_was_read_is_counted_once(session_factory, providers):
+    dbsession = session_factory()
+    pending = Review(product_name='Kamera X', review_text='belum dianalisis sama sekali', analysis_status='pending')
+    dbsession.add(pending)
+    dbsession.commit()
+    rows = read_rows(session_factory)
+
+    # Job worker menyelesaikannya sebelum backfill menulis
+    pending.sentiment, pending.sentiment_score, pending.key_points = 'negative', 0.8, ['Mahal']
+    pending.analysis_status, pending.model_version = 'complete', 'model-lama'
+    dbsession.flush()
+    aggregates.record_added(dbsession, [pending])
+    dbsession.commit()
+    dbsession.close()
+
+    assert backfill.reanalyze_batch(session_factory, rows, 4) == (1, 0)
+
+    dbsession = session_factory()
+    assert snapshot(dbsession)[0] == [('Kamera X', 1, 1, 0, 0)]
+    dbsession.close()
+    assert_rollups_match_rebuild(session_factory)
+
+
+def test_still_degraded_results_are_left_untouched(session_factory, providers):
+    dbsession = session_factory()
+    review_id = save_review(dbsession, 'Kamera X', 'baterai awet dan ringan', DEGRADED).id
+    dbsession.commit()
+    dbsession.close()
+    providers.degraded = True
+
+    assert backfill.reanalyze_batch(session_factory, read_rows(session_factory), 4) == (0, 1)
+
+    dbsession = session_factory()
+    assert dbsession.get(Review, review_id).analysis_status == 'degraded'
+    dbsession.close()
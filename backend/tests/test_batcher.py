@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from review_analyzer.services.batcher import MicroBatcher
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class RecordingHandler:
+    """Batch handler that records each batch and echoes ``item * 10``."""
+
+    def __init__(self, delay=0.0, fail=None, short=False):
+        self.batches = []
+        self.delay = delay
+        self.fail = fail
+        self.short = short
+
+    async def __call__(self, items):
+        self.batches.append(list(items))
+        await asyncio.sleep(self.delay)
+        if self.fail is not None:
+            raise self.fail
+        results = [item * 10 for item in items]
+        return results[:-1] if self.short else results
+
+
+def test_each_caller_gets_its_own_result():
+    handler = RecordingHandler()
+
+    async def scenario():
+        batcher = MicroBatcher(handler, max_batch_size=4, max_wait_ms=50)
+        results = await asyncio.gather(*[batcher.submit(i) for i in range(10)])
+        await batcher.close()
+        return results
+
+    assert run(scenario()) == [i * 10 for i in range(10)]
+    assert [len(batch) for batch in handler.batches] == [4, 4, 2]
+    assert sorted(item for batch in handler.batches for item in batch) == list(range(10))
+
+
+def test_partial_batch_is_sent_after_max_wait():
+    handler = RecordingHandler()
+
+    async def scenario():
+        batcher = MicroBatcher(handler, max_batch_size=16, max_wait_ms=20)
+        result = await asyncio.wait_for(batcher.submit(3), timeout=1)
+        await batcher.close()
+        return result
+
+    assert run(scenario()) == 30
+    assert handler.batches == [[3]]
+
+
+def test_handler_error_reaches_every_caller_in_the_batch():
+    handler = RecordingHandler(fail=RuntimeError('provider down'))
+
+    async def scenario():
+        batcher = MicroBatcher(handler, max_batch_size=8, max_wait_ms=20)
+        results = await asyncio.gather(*[batcher.submit(i) for i in range(3)], return_exceptions=True)
+        stats = batcher.stats()
+        await batcher.close()
+        return results, stats
+
+    results, stats = run(scenario())
+    assert all(isinstance(r, RuntimeError) and str(r) == 'provider down' for r in results)
+    assert stats['failed_batches'] == 1
+
+
+def test_result_count_mismatch_fails_the_batch():
+    handler = RecordingHandler(short=True)
+
+    async def scenario():
+        batcher = MicroBatcher(handler, max_batch_size=8, max_wait_ms=20)
+        results = await asyncio.gather(*[batcher.submit(i) for i in range(3)], return_exceptions=True)
+        await batcher.close()
+        return results
+
+    results = run(scenario())
+    # Hasil tidak boleh digeser ke caller yang salah
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_cancelled_caller_is_not_dispatched():
+    handler = RecordingHandler()
+
+    async def scenario():
+        batcher = MicroBatcher(handler, max_batch_size=8, max_wait_ms=50)
+        cancelled = asyncio.ensure_future(batcher.submit(1))
+        kept = asyncio.ensure_future(batcher.submit(2))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        result = await kept
+        await batcher.close()
+        return result
+
+    assert run(scenario()) == 20
+    assert handler.batches == [[2]]
+
+
+def test_next_batch_is_collected_while_one_is_in_flight():
+    handler = RecordingHandler(delay=0.1)
+
+    async def scenario():
+        batcher = MicroBatcher(handler, max_batch_size=2, max_wait_ms=5)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await asyncio.gather(*[batcher.submit(i) for i in range(6)])
+        elapsed = loop.time() - started
+        await batcher.close()
+        return results, elapsed
+
+    results, elapsed = run(scenario())
+    assert results == [i * 10 for i in range(6)]
+    # Tiga batch berjalan bersamaan, bukan 3 x 0.1 detik berurutan
+    assert elapsed < 0.25
+
+
+@pytest.mark.parametrize('size', [0, -3])
+def test_batch_size_is_at_least_one(size):
+    assert MicroBatcher(RecordingHandler(), max_batch_size=size).max_batch_size == 1
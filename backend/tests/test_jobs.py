@@ -0,0 +1,164 @@
+import datetime
+
+import pytest
+from sqlalchemy import func, select, update
+
+from review_analyzer.models import AnalysisJob, Review
+from review_analyzer.services import jobs
+
+
+@pytest.fixture
+def job_settings(monkeypatch):
+    monkeypatch.setitem(jobs.JOB_SETTINGS, 'max_attempts', 3)
+    monkeypatch.setitem(jobs.JOB_SETTINGS, 'retry_base_delay', 5.0)
+    monkeypatch.setitem(jobs.JOB_SETTINGS, 'retry_max_delay', 300.0)
+    return jobs.JOB_SETTINGS
+
+
+def enqueue(session_factory, *texts):
+    dbsession = session_factory()
+    ids = [jobs.enqueue(dbsession, 'Kamera X', text).id for text in texts]
+    dbsession.commit()
+    dbsession.close()
+    return ids
+
+
+def make_runnable(session_factory):
+    """Skip the backoff wait of every queued job."""
+    dbsession = session_factory()
+    dbsession.execute(update(AnalysisJob).values(run_after=func.now()))
+    dbsession.commit()
+    dbsession.close()
+
+
+def load_job(session_factory, job_id):
+    dbsession = session_factory()
+    job = dbsession.get(AnalysisJob, job_id)
+    dbsession.expunge(job)
+    dbsession.close()
+    return job
+
+
+def test_retry_delay_grows_exponentially_with_jitter(job_settings):
+    for attempts, full in [(1, 5.0), (2, 10.0), (3, 20.0), (10, 300.0)]:
+        for _ in range(50):
+            assert full / 2 <= jobs.retry_delay(attempts) <= full
+
+
+@pytest.mark.db
+def test_results_are_stored_on_the_job_they_belong_to(session_factory, providers, job_settings):
+    texts = [f'ulasan nomor {i} untuk kamera ini' for i in range(5)]
+    job_ids = enqueue(session_factory, *texts)
+
+    assert jobs.process_batch(session_factory) == 5
+
+    dbsession = session_factory()
+    for job_id, text in zip(job_ids, texts):
+        job = dbsession.get(AnalysisJob, job_id)
+        assert job.status == 'done'
+        assert dbsession.get(Review, job.review_id).review_text == text
+    dbsession.close()
+
+
+@pytest.mark.db
+def test_degraded_result_is_retried_with_backoff(session_factory, providers, job_settings):
+    [job_id] = enqueue(session_factory, 'baterai cepat habis dalam sehari')
+    providers.degraded = True
+
+    jobs.process_batch(session_factory)
+
+    job = load_job(session_factory, job_id)
+    assert job.status == 'queued'
+    assert job.attempts == 1
+    assert job.review_id is None
+    assert 'degraded' in job.last_error
+    assert job.run_after > datetime.datetime.now(datetime.timezone.utc)
+    dbsession = session_factory()
+    assert dbsession.scalar(select(func.count()).select_from(Review)) == 0
+    dbsession.close()
+
+    # Belum waktunya: tidak di-claim lagi
+    assert jobs.process_batch(session_factory) == 0
+
+    providers.degraded = False
+    make_runnable(session_factory)
+    jobs.process_batch(session_factory)
+
+    job = load_job(session_factory, job_id)
+    assert job.status == 'done'
+    assert job.attempts == 2
+    dbsession = session_factory()
+    assert dbsession.get(Review, job.review_id).analysis_status == 'complete'
+    dbsession.close()
+
+
+@pytest.mark.db
+def test_degraded_result_is_kept_on_the_last_attempt(session_factory, providers, job_settings):
+    [job_id] = enqueue(session_factory, 'baterai cepat habis dalam sehari')
+    providers.degraded = True
+
+    for _ in range(job_settings['max_attempts']):
+        jobs.process_batch(session_factory)
+        make_runnable(session_factory)
+
+    job = load_job(session_factory, job_id)
+    assert job.status == 'done'
+    assert job.attempts == job_settings['max_attempts']
+    dbsession = session_factory()
+    assert dbsession.get(Review, job.review_id).analysis_status == 'degraded'
+    dbsession.close()
+    assert providers.calls == job_settings['max_attempts']
+
+
+@pytest.mark.db
+def test_failing_batch_is_retried_then_marked_failed(session_factory, providers, job_settings, monkeypatch):
+    [job_id] = enqueue(session_factory, 'layar retak setelah seminggu')
+
+    def broken(dbsession, items, concurrency):
+        raise RuntimeError('database hiccup')
+
+    monkeypatch.setattr(jobs, 'analyze_many', broken)
+    for attempt in range(1, job_settings['max_attempts'] + 1):
+        jobs.process_batch(session_factory)
+        job = load_job(session_factory, job_id)
+        assert job.attempts == attempt
+        assert job.last_error == 'database hiccup'
+        make_runnable(session_factory)
+
+    assert job.status == 'failed'
+    assert job.finished_at is not None
+    assert jobs.process_batch(session_factory) == 0
+
+
+@pytest.mark.db
+def test_stale_jobs_are_requeued_until_attempts_run_out(session_factory, job_settings):
+    retry_id, exhausted_id = enqueue(session_factory, 'masih bisa dicoba lagi', 'sudah habis percobaan')
+    dbsession = session_factory()
+    long_ago = func.now() - datetime.timedelta(seconds=job_settings['lock_timeout'] + 60)
+    dbsession.execute(update(AnalysisJob).where(AnalysisJob.id == retry_id)
+                      .values(status='running', attempts=1, locked_at=long_ago))
+    dbsession.execute(update(AnalysisJob).where(AnalysisJob.id == exhausted_id)
+                      .values(status='running', attempts=job_settings['max_attempts'], locked_at=long_ago))
+    dbsession.commit()
+
+    assert jobs.requeue_stale(dbsession) == 1
+    dbsession.commit()
+    dbsession.close()
+
+    assert load_job(session_factory, retry_id).status == 'queued'
+    exhausted = load_job(session_factory, exhausted_id)
+    assert exhausted.status == 'failed'
+    assert exhausted.finished_at is not None
+
+
+@pytest.mark.db
+def test_running_job_within_lock_timeout_is_left_alone(session_factory, job_settings):
+    [job_id] = enqueue(session_factory, 'worker masih mengerjakan ini')
+    dbsession = session_factory()
+    dbsession.execute(update(AnalysisJob).values(status='running', attempts=1, locked_at=func.now()))
+    dbsession.commit()
+
+    assert jobs.requeue_stale(dbsession) == 0
+    dbsession.commit()
+    dbsession.close()
+    assert load_job(session_factory, job_id).status == 'running'
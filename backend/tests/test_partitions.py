@@ -0,0 +1,79 @@
+import csv
+import datetime
+import gzip
+import io
+
+import pytest
+from sqlalchemy import func, select, text
+
+from review_analyzer.models import Review
+from review_analyzer.services import aggregates, partitions
+from review_analyzer.services.partitions import add_months, month_start
+
+pytestmark = pytest.mark.db
+
+NOW = datetime.datetime.now(datetime.timezone.utc)
+OLD_MONTH = add_months(month_start(NOW), -14)
+
+
+def add_review(dbsession, created_at, text, sentiment='positive', key_points=('Bagus',)):
+    review = Review(product_name='Kamera X', review_text=text, sentiment=sentiment, sentiment_score=0.9,
+                    key_points=list(key_points), analysis_status='complete', created_at=created_at)
+    dbsession.add(review)
+    dbsession.flush()
+    aggregates.record_added(dbsession, [review])
+    return review
+
+
+def test_month_arithmetic_crosses_years():
+    month = datetime.datetime(2025, 11, 1, tzinfo=datetime.timezone.utc)
+    assert add_months(month, 3) == datetime.datetime(2026, 2, 1, tzinfo=datetime.timezone.utc)
+    assert add_months(month, -11) == datetime.datetime(2024, 12, 1, tzinfo=datetime.timezone.utc)
+    assert partitions.partition_name(month) == 'reviews_p2025_11'
+
+
+def test_old_rows_get_their_own_partition_and_are_archived(session_factory, monkeypatch, tmp_path):
+    monkeypatch.setitem(partitions.PARTITION_SETTINGS, 'retention_months', 12)
+    dbsession = session_factory()
+    old_ids = [add_review(dbsession, OLD_MONTH + datetime.timedelta(days=day), f'ulasan lama nomor {day}').id
+               for day in (2, 10)]
+    add_review(dbsession, NOW, 'ulasan baru bulan ini', 'negative', ['Mahal'])
+    dbsession.commit()
+
+    # Bulan lama masuk DEFAULT dulu; ensure_partitions memindahkannya ke partisi sendiri
+    created = partitions.ensure_partitions(dbsession, NOW)
+    dbsession.commit()
+    old = partitions.Partition(partitions.partition_name(OLD_MONTH), OLD_MONTH, add_months(OLD_MONTH, 1))
+    assert old in created
+    assert dbsession.execute(text(f'SELECT count(*) FROM {partitions.DEFAULT_PARTITION}')).scalar() == 0
+    assert dbsession.execute(text(f'SELECT count(*) FROM {old.name}')).scalar() == 2
+    # Sudah lengkap: tidak ada yang dibuat lagi
+    assert partitions.ensure_partitions(dbsession, NOW) == []
+
+    assert partitions.expired_partitions(dbsession, NOW) == [old]
+
+    path, count = partitions.archive_partition(dbsession, old, str(tmp_path))
+    dbsession.commit()
+
+    assert count == 2
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        rows = list(csv.DictReader(io.StringIO(f.read())))
+    assert [int(row['id']) for row in rows] == old_ids
+    assert {'product_name', 'review_text', 'created_at'} <= set(rows[0])
+    assert not list(tmp_path.glob('*.partial'))
+
+    assert old.name not in [p.name for p in partitions.list_partitions(dbsession)]
+    assert dbsession.scalar(select(func.count()).select_from(Review)) == 1
+    stats = dbsession.execute(text(
+        'SELECT review_count, positive_count, negative_count FROM product_stats')).one()
+    assert tuple(stats) == (1, 0, 1)
+    assert dbsession.execute(text('SELECT key_point FROM product_key_points')).scalars().all() == ['mahal']
+    assert dbsession.execute(text('SELECT sum(review_count) FROM product_daily_volume')).scalar() == 1
+    dbsession.close()
+
+
+def test_nothing_expires_without_retention(session_factory, monkeypatch):
+    monkeypatch.setitem(partitions.PARTITION_SETTINGS, 'retention_months', 0)
+    dbsession = session_factory()
+    assert partitions.expired_partitions(dbsession, NOW + datetime.timedelta(days=3650)) == []
+    dbsession.close()
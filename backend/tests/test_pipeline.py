@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from review_analyzer.services import ai_services, pipeline
+
+
+def analyze(monkeypatch, sentiment, key_points):
+    async def analyze_sentiment(text):
+        return sentiment
+
+    async def extract_key_points(text, product_name):
+        return key_points
+
+    monkeypatch.setattr(pipeline, 'analyze_sentiment', analyze_sentiment)
+    monkeypatch.setattr(pipeline, 'extract_key_points', extract_key_points)
+    return asyncio.run(pipeline.run_analysis('biasa saja, tidak bagus tidak jelek', 'Kamera X'))
+
+
+def test_real_neutral_result_is_not_degraded(monkeypatch):
+    # Sama persis dengan nilai fallback, tapi memang hasil provider
+    result = analyze(monkeypatch, dict(ai_services.SENTIMENT_FALLBACK), list(ai_services.KEY_POINTS_FALLBACK))
+    assert result['degraded'] is False
+    assert (result['sentiment'], result['score']) == ('neutral', 0.5)
+    assert pipeline.analysis_status(result) == 'complete'
+
+
+@pytest.mark.parametrize('sentiment, key_points', [
+    (ai_services.SentimentFallback(ai_services.SENTIMENT_FALLBACK), ['Bagus']),
+    ({'sentiment': 'positive', 'score': 0.9}, ai_services.KeyPointsFallback(ai_services.KEY_POINTS_FALLBACK)),
+    ({'sentiment': 'positive', 'score': 0.9}, ai_services.KeyPointsFallback(ai_services.MISSING_KEY_FALLBACK)),
+])
+def test_fallback_from_either_stage_degrades_the_result(monkeypatch, sentiment, key_points):
+    result = analyze(monkeypatch, sentiment, key_points)
+    assert result['degraded'] is True
+    assert pipeline.analysis_status(result) == 'degraded'
+    # Hasil tetap bertipe biasa (dict/list), siap disimpan & diserialisasi
+    assert type(result['key_points']) is list
+
+
+def test_stage_timeout_degrades_the_result(monkeypatch):
+    monkeypatch.setitem(pipeline.TIMEOUTS, 'key_points', 0.01)
+
+    async def slow_key_points(text, product_name):
+        await asyncio.sleep(10)
+
+    async def analyze_sentiment(text):
+        return {'sentiment': 'positive', 'score': 0.9}
+
+    monkeypatch.setattr(pipeline, 'analyze_sentiment', analyze_sentiment)
+    monkeypatch.setattr(pipeline, 'extract_key_points', slow_key_points)
+    result = asyncio.run(pipeline.run_analysis('baterai awet dan ringan', 'Kamera X'))
+    assert result['degraded'] is True
+    assert result['timed_out'] == ['key_points']
+    assert result['key_points'] == ai_services.KEY_POINTS_FALLBACK
+
+
+def test_failing_sentiment_backend_returns_a_marked_fallback(monkeypatch):
+    class Broken:
+        async def analyze(self, text):
+            raise ValueError('Invalid response format from HF')
+
+    monkeypatch.setattr(ai_services, '_sentiment_batcher', None)
+    monkeypatch.setattr(ai_services, 'get_sentiment_backend', lambda: Broken())
+    result = asyncio.run(ai_services.analyze_sentiment('baterai awet dan ringan'))
+    assert ai_services.is_fallback(result)
+    assert result == ai_services.SENTIMENT_FALLBACK
+
+
+def test_missing_gemini_key_returns_a_marked_fallback(monkeypatch):
+    monkeypatch.setattr(ai_services, 'GEMINI_API_KEY', None)
+    assert ai_services.is_fallback(asyncio.run(ai_services.extract_key_points('baterai awet', 'Kamera X')))
+    assert all(ai_services.is_fallback(points) for points in
+               asyncio.run(ai_services.extract_key_points_batch([('baterai awet', 'Kamera X')])))
@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+
+from review_analyzer.services import resilience
+from review_analyzer.services.resilience import CircuitBreaker, CircuitOpenError, Provider, ProviderError
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def make_provider(**overrides):
+    settings = dict(resilience.DEFAULTS, rate=1000.0, burst=1000, failure_threshold=1,
+                    reset_timeout=0.0, max_retries=0, retry_base_delay=0.001)
+    settings.update(overrides)
+    return Provider('test', settings)
+
+
+def returns(value):
+    async def fn():
+        return value
+    return fn
+
+
+def raises(error):
+    async def fn():
+        raise error
+    return fn
+
+
+def open_circuit(provider):
+    with pytest.raises(ProviderError):
+        run(provider.call(raises(ProviderError('test', 'Server error', status=503))))
+    assert provider.breaker.state == 'open'
+
+
+def test_breaker_opens_after_threshold_and_probes_after_reset_timeout():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60.0)
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.reset_timeout = 0.0
+    assert breaker.before_call() is True
+    assert breaker.state == 'half_open'
+    # Hanya satu probe sekaligus
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.before_call() is False
+
+
+def test_successful_probe_closes_the_circuit():
+    provider = make_provider()
+    open_circuit(provider)
+
+    assert run(provider.call(returns('ok'))) == 'ok'
+    assert provider.breaker.state == 'closed'
+
+
+def test_failed_probe_reopens_the_circuit():
+    provider = make_provider(reset_timeout=60.0)
+    open_circuit(provider)
+    provider.breaker.reset_timeout = 0.0
+
+    with pytest.raises(ProviderError):
+        run(provider.call(raises(ProviderError('test', 'Server error', status=503))))
+    assert provider.breaker.state == 'open'
+    provider.breaker.reset_timeout = 60.0
+    with pytest.raises(CircuitOpenError):
+        run(provider.call(returns('ok')))
+
+
+def test_probe_ending_in_a_non_provider_error_counts_as_a_failure():
+    provider = make_provider()
+    open_circuit(provider)
+
+    with pytest.raises(ValueError):
+        run(provider.call(raises(ValueError('Invalid response format'))))
+    assert provider.breaker.state == 'open'
+
+    # Probe berikutnya tetap boleh jalan
+    assert run(provider.call(returns('ok'))) == 'ok'
+    assert provider.breaker.state == 'closed'
+
+
+def test_cancelled_probe_lets_the_next_call_probe():
+    provider = make_provider()
+    open_circuit(provider)
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    with pytest.raises(asyncio.TimeoutError):
+        run(asyncio.wait_for(provider.call(slow), timeout=0.01))
+    assert provider.breaker.state == 'half_open'
+
+    assert run(provider.call(returns('ok'))) == 'ok'
+    assert provider.breaker.state == 'closed'
+
+
+def test_non_provider_errors_are_not_retried():
+    provider = make_provider(failure_threshold=5, max_retries=3)
+    calls = []
+
+    async def broken():
+        calls.append(1)
+        raise ValueError('Invalid response format')
+
+    with pytest.raises(ValueError):
+        run(provider.call(broken))
+    assert len(calls) == 1
+    assert provider.breaker.failures == 1
+
+
+def test_retryable_errors_are_retried_until_success():
+    provider = make_provider(failure_threshold=5, max_retries=3)
+    outcomes = [ProviderError('test', 'Too many requests', status=429, retry_after=0.0),
+                ProviderError('test', 'Server error', status=503)]
+
+    async def flaky():
+        if outcomes:
+            raise outcomes.pop(0)
+        return 'ok'
+
+    assert run(provider.call(flaky)) == 'ok'
+    assert provider.stats()['retries'] == 2
+    assert provider.stats()['throttled'] == 1
+    assert provider.breaker.state == 'closed'
+
+
+def test_client_errors_do_not_open_the_circuit():
+    provider = make_provider()
+
+    with pytest.raises(ProviderError):
+        run(provider.call(raises(ProviderError('test', 'Bad request', status=400))))
+    assert provider.breaker.state == 'closed'
+    assert provider.stats()['retries'] == 0
@@ -0,0 +1,108 @@
+import datetime
+from email.utils import format_datetime
+
+import pytest
+
+from review_analyzer.services import response_cache
+from review_analyzer.services.response_cache import CachedResponse, ResponseCache, cache_key, not_modified
+
+MODIFIED = datetime.datetime(2026, 5, 1, 12, 0, tzinfo=datetime.timezone.utc)
+ENTRY = CachedResponse(body=b'{}', etag='abc123', last_modified=MODIFIED)
+
+
+@pytest.mark.parametrize('if_none_match, expected', [
+    ('"abc123"', True),
+    ('W/"abc123"', True),
+    ('"old", "abc123"', True),
+    ('*', True),
+    ('"old"', False),
+])
+def test_if_none_match(if_none_match, expected):
+    assert not_modified(ENTRY, if_none_match, None) is expected
+
+
+def test_if_none_match_wins_over_if_modified_since():
+    later = format_datetime(MODIFIED + datetime.timedelta(hours=1), usegmt=True)
+    assert not not_modified(ENTRY, '"old"', later)
+
+
+@pytest.mark.parametrize('if_modified_since, expected', [
+    (format_datetime(MODIFIED, usegmt=True), True),
+    (format_datetime(MODIFIED + datetime.timedelta(days=1), usegmt=True), True),
+    (format_datetime(MODIFIED - datetime.timedelta(seconds=1), usegmt=True), False),
+    ('bukan tanggal', False),
+])
+def test_if_modified_since(if_modified_since, expected):
+    assert not_modified(ENTRY, None, if_modified_since) is expected
+
+
+def test_unconditional_request_is_never_not_modified():
+    assert not not_modified(ENTRY, None, None)
+
+
+def test_cache_key_ignores_parameter_order():
+    assert cache_key('reviews', {'limit': '10', 'sentiment': 'positive'}) == \
+        cache_key('reviews', {'sentiment': 'positive', 'limit': '10'})
+
+
+def test_response_read_before_an_invalidation_is_not_stored():
+    cache = ResponseCache(max_entries=10, ttl=60)
+    generation = cache.generation
+    # Review berubah selagi response ini dibaca dari database
+    cache.invalidate()
+
+    entry = cache.store('reviews?', [{'id': 1}], generation)
+    assert entry.body
+    assert cache.lookup('reviews?') is None
+
+    cache.store('reviews?', [{'id': 1}], cache.generation)
+    assert cache.lookup('reviews?') == entry
+
+
+def test_invalidate_drops_every_entry():
+    cache = ResponseCache(max_entries=10, ttl=60)
+    cache.store('review:1', {'id': 1}, cache.generation)
+    cache.store('review:2', {'id': 2}, cache.generation)
+
+    cache.invalidate()
+
+    assert cache.lookup('review:1') is None
+    assert cache.lookup('review:2') is None
+
+
+def analyze(testapp, text):
+    return testapp.post_json('/api/analyze-review', {'product_name': 'Kamera X', 'review_text': text},
+                             status=201).json
+
+
+@pytest.mark.db
+def test_get_answers_304_to_a_current_etag(testapp, providers):
+    review = analyze(testapp, 'gambar tajam dan warnanya bagus')
+
+    for url in ['/api/reviews', f"/api/reviews/{review['id']}"]:
+        first = testapp.get(url, status=200)
+        assert first.headers['Cache-Control'] == 'no-cache'
+        etag = first.headers['ETag']
+
+        again = testapp.get(url, headers={'If-None-Match': etag}, status=304)
+        assert again.headers['ETag'] == etag
+        assert not again.body
+        testapp.get(url, headers={'If-Modified-Since': first.headers['Last-Modified']}, status=304)
+
+
+@pytest.mark.db
+def test_writes_invalidate_cached_reviews(testapp, providers):
+    first = analyze(testapp, 'gambar tajam dan warnanya bagus')
+    listed = testapp.get('/api/reviews', status=200)
+    assert [review['id'] for review in listed.json['reviews']] == [first['id']]
+    testapp.get(f"/api/reviews/{first['id']}", status=200)
+
+    second = analyze(testapp, 'baterai cepat habis dalam sehari')
+    after_post = testapp.get('/api/reviews', headers={'If-None-Match': listed.headers['ETag']}, status=200)
+    assert sorted(review['id'] for review in after_post.json['reviews']) == [first['id'], second['id']]
+
+    testapp.delete(f"/api/reviews/{first['id']}", status=200)
+    testapp.get(f"/api/reviews/{first['id']}", status=404)
+    after_delete = testapp.get('/api/reviews', status=200)
+    assert [review['id'] for review in after_delete.json['reviews']] == [second['id']]
+    assert response_cache.RESPONSE_CACHE.invalidations >= 2
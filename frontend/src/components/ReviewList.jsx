@@ -1,6 +1,6 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { RefreshCw, AlertTriangle, Ghost, History, Layers } from 'lucide-react';
-import { getReviews } from '../services/api';
+import { getReviews, subscribeReviewEvents } from '../services/api';
 import ReviewCard from './ReviewCard';
 
 // Skeleton Loading yang lebih halus
@@ -28,6 +28,8 @@ const ReviewList = ({ refreshTrigger }) => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [isRefreshing, setIsRefreshing] = useState(false);
+  const [live, setLive] = useState(false);
+  const liveRef = useRef(false);
 
   const fetchReviews = async (showLoading = true) => {
     if (showLoading) setLoading(true);
@@ -47,9 +49,28 @@ const ReviewList = ({ refreshTrigger }) => {
   };
 
   useEffect(() => {
+    // Selama stream live aktif, review baru sudah masuk lewat event
+    if (refreshTrigger > 0 && liveRef.current) return;
     fetchReviews();
   }, [refreshTrigger]);
 
+  useEffect(() => {
+    const close = subscribeReviewEvents({
+      onCreated: (review) => setReviews((prev) =>
+        prev.some((r) => r.id === review.id) ? prev : [review, ...prev].slice(0, 50)),
+      onUpdated: (review) => setReviews((prev) =>
+        prev.map((r) => (r.id === review.id ? review : r))),
+      onDeleted: ({ id }) => setReviews((prev) => prev.filter((r) => r.id !== id)),
+      // Terlalu banyak event terlewat: muat ulang daftar
+      onReset: () => fetchReviews(false),
+      onStatus: (connected) => {
+        liveRef.current = connected;
+        setLive(connected);
+      },
+    });
+    return close;
+  }, []);
+
   const handleRefresh = () => {
     fetchReviews(false); 
   };
@@ -71,6 +92,12 @@ const ReviewList = ({ refreshTrigger }) => {
             <span className="text-[10px] font-bold text-slate-400 uppercase tracking-widest">
               {reviews.length > 0 ? `${reviews.length} Ulasan` : 'Menunggu'}
             </span>
+            {live && (
+              <span className="ml-2 inline-flex items-center gap-1 text-[10px] font-bold text-emerald-500 uppercase tracking-widest">
+                <span className="w-1.5 h-1.5 rounded-full bg-emerald-500 animate-pulse"></span>
+                Live
+              </span>
+            )}
           </div>
         </div>
 
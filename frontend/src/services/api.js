@@ -87,4 +87,32 @@ export const deleteReview = async (id) => {
   return response.data;
 };
 
+// Live review events (SSE). EventSource reconnects sendiri dan mengirim
+// Last-Event-ID, jadi event yang terlewat diputar ulang oleh server.
+// Returns a function that closes the stream.
+export const subscribeReviewEvents = ({ onCreated, onUpdated, onDeleted, onReset, onStatus } = {}) => {
+  if (typeof EventSource === 'undefined') {
+    onStatus?.(false);
+    return () => {};
+  }
+
+  const source = new EventSource(`${API_URL}/api/reviews/events`);
+  const listen = (name, handler) => {
+    source.addEventListener(name, (event) => {
+      if (handler) handler(JSON.parse(event.data));
+    });
+  };
+
+  listen('review_created', onCreated);
+  listen('review_updated', onUpdated);
+  listen('review_deleted', onDeleted);
+  listen('reset', onReset);
+
+  source.onopen = () => onStatus?.(true);
+  // CLOSED = server menolak (mis. 501 di WSGI, 503 kalau penuh); selain itu browser mencoba lagi
+  source.onerror = () => onStatus?.(false, source.readyState === EventSource.CLOSED);
+
+  return () => source.close();
+};
+
 export default api;